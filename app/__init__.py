@@ -1,14 +1,33 @@
 from flask import Flask
 from config import Config
 
+from app.commands import register_commands
+from app.repositories.backend import init_catalog_backend
+from app.repositories.catalog_snapshot import init_catalog_snapshot
 from app.routes import register_blueprints
+from app.services.catalog_service import init_section_cache
+from app.services.search_engine import init_search_engine
+from app.services.similarity_engine import init_similarity_engine
+from app.utils.json_response import init_json_response
+from app.utils.metrics import init_metrics
+from db.neo4j.driver import neo4j_driver
 from db.neo4j.neomodel_config import init_neomodel
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    init_neomodel(app)
+    init_metrics(app)
+    init_catalog_backend(app)
+    if app.config["CATALOG_BACKEND"] == "neo4j":
+        init_neomodel(app)
+        neo4j_driver.warm_up(app.config["NEO4J_POOL_WARMUP"])
+    init_catalog_snapshot(app)
+    init_section_cache(app)
+    init_similarity_engine(app)
+    init_search_engine(app)
+    init_json_response(app)
     register_blueprints(app)
+    register_commands(app)
 
     return app
@@ -0,0 +1,217 @@
+"""
+ASGI entry point (``uvicorn asgi:app``).
+
+The catalog reads — ``/api/catalog``, ``/api/catalog/search`` and
+``/api/catalog/sections`` — are served on the event loop through
+AsyncCatalogService, so one worker keeps many requests' queries in flight
+at once instead of parking a thread on each round trip. The responses are
+byte for byte the Flask ones.
+
+Every other route is passed to the Flask app, run in the loop's default
+thread pool.
+"""
+import asyncio
+import io
+import sys
+import time
+import traceback
+from urllib.parse import parse_qsl
+
+from werkzeug.http import parse_accept_header
+
+from app import create_app
+from app.exceptions.api_error import APIError
+from app.middleware.instrumentation import endpoint_name, log_entry
+from app.repositories.backend import catalog_backend
+from app.services.async_catalog_service import AsyncCatalogService
+from app.utils import json_response
+from app.utils.json_response import catalog_body, compress, dumps, search_body, sections_body
+from app.utils.metrics import metrics
+from app.utils.request_parser import parse_cursors, parse_limit, parse_sections, parse_view
+
+
+async def get_catalog(args):
+    projection = parse_view(args.get("view"))
+    limit = parse_limit(args.get("limit"))
+
+    cursors = parse_cursors(args.get("cursors"))
+    if cursors:
+        sections = list(cursors)
+    else:
+        sections = parse_sections(args.get("sections"), await AsyncCatalogService.available_sections())
+
+    raw_nodes = await AsyncCatalogService.get_catalog_sections(
+        sections, projection=projection, limit=limit, cursors=cursors
+    )
+    return catalog_body(raw_nodes, view=projection, limit=limit, cursors=cursors)
+
+
+async def list_sections(args):
+    return sections_body(await AsyncCatalogService.available_sections())
+
+
+async def search_and_recommend(args):
+    result = await AsyncCatalogService.get_search_and_recommendations(
+        search_query=args.get("q", ""),
+        projection=parse_view(args.get("view")),
+    )
+    return search_body(result)
+
+
+# Path -> (handler, the Flask rule it mirrors, which names it in metrics).
+ROUTES = {
+    "/api/catalog": (get_catalog, "/api/catalog/"),
+    "/api/catalog/": (get_catalog, "/api/catalog/"),
+    "/api/catalog/sections": (list_sections, "/api/catalog/sections"),
+    "/api/catalog/search": (search_and_recommend, "/api/catalog/search"),
+}
+
+
+def error_body(error, error_type, path):
+    """The error handler's JSON, as jsonify writes it."""
+    return dumps({"success": False, "error": error, "type": error_type, "path": path})
+
+
+async def send_json(send, body, status=200, accept_encoding=""):
+    body += b"\n"
+    headers = [(b"content-type", b"application/json"), (b"vary", b"Accept-Encoding")]
+
+    if json_response.compression_min_size and len(body) >= json_response.compression_min_size:
+        encoding = json_response.preferred_encoding(parse_accept_header(accept_encoding))
+        if encoding is not None:
+            body = compress(body, encoding)
+            headers.append((b"content-encoding", encoding.encode("ascii")))
+
+    headers.append((b"content-length", str(len(body)).encode("ascii")))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class WSGIBridge:
+    """Runs one request through a WSGI app in the event loop's thread pool."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    async def __call__(self, scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        environ = self.environ(scope, body)
+        loop = asyncio.get_running_loop()
+        status, headers, chunks = await loop.run_in_executor(None, self.run, environ)
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"".join(chunks)})
+
+    @staticmethod
+    def environ(scope, body):
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope["query_string"].decode("latin-1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f'HTTP/{scope.get("http_version", "1.1")}',
+            "REMOTE_ADDR": client[0],
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = value
+            elif name != "CONTENT_LENGTH":
+                key = f"HTTP_{name}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def run(self, environ):
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers
+            ]
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            chunks = list(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return started["status"], started["headers"], chunks
+
+
+def create_asgi_app(flask_app=None):
+    flask_app = flask_app or create_app()
+    bridge = WSGIBridge(flask_app.wsgi_app)
+    request_log = flask_app.extensions.get("request_log")
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        route = ROUTES.get(scope["path"])
+        if route is None or scope["method"] != "GET":
+            await bridge(scope, receive, send)
+            return
+
+        handler, rule = route
+        started = time.perf_counter()
+        token = metrics.begin_request()
+        path = scope["path"]
+        args = {}
+        for name, value in parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True):
+            args.setdefault(name, value)
+        headers = dict(scope.get("headers", []))
+        accept_encoding = headers.get(b"accept-encoding", b"").decode("latin-1")
+
+        try:
+            body, status = await handler(args), 200
+        except APIError as e:
+            body, status = error_body(str(e), "APIError", path), e.status_code
+        except (ValueError, KeyError, TypeError) as e:
+            body, status = error_body(str(e), e.__class__.__name__, path), 400
+        except Exception as e:
+            traceback.print_exc()
+            body, status = error_body("An internal server error occurred.", e.__class__.__name__, path), 500
+
+        await send_json(send, body, status, accept_encoding)
+        metrics.end_request(token, endpoint_name("GET", rule), status)
+        if request_log is not None:
+            request_log.write(log_entry(path, scope["query_string"], status, started))
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if catalog_backend.name == "neo4j":
+                    await catalog_backend.async_repository.warm_up(flask_app.config["NEO4J_POOL_WARMUP"])
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if catalog_backend.async_repository is not None:
+                    await catalog_backend.async_repository.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    app.flask_app = flask_app
+    return app
@@ -0,0 +1,23 @@
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.repositories.catalog_snapshot import build_snapshot
+
+catalog_cli = AppGroup("catalog", help="Catalog maintenance commands.")
+
+
+@catalog_cli.command("build-snapshot")
+@click.option("--path", default=None, help="Output file (default: CATALOG_SNAPSHOT_PATH).")
+def build_snapshot_command(path):
+    """Write the memory-mapped catalog snapshot from the graph."""
+    path = path or current_app.config["CATALOG_SNAPSHOT_PATH"]
+    started = time.perf_counter()
+    count = build_snapshot(path)
+    click.echo(f"Wrote {count} movies to {path} in {time.perf_counter() - started:.1f}s")
+
+
+def register_commands(app):
+    app.cli.add_command(catalog_cli)
@@ -1,3 +1,5 @@
+# Sections with a live query (CatalogRepository.SECTION_MAPPINGS). Every
+# precomputed SectionList in the graph is allowed as well.
 ALLOWED_SECTIONS = {
     "popular",
     "trending",
@@ -6,3 +8,18 @@ ALLOWED_SECTIONS = {
     "comedy",
     "drama"
 }
+
+# Movies per section page (?limit=), and the largest page a client may ask
+# for: precomputed section lists hold 100 movies.
+SECTION_PAGE_SIZE = 20
+SECTION_PAGE_MAX = 100
+
+# Per-section cache TTLs in seconds; other sections use SECTION_CACHE_TTL.
+SECTION_CACHE_TTLS = {
+    "trending": 120,
+    "topRated": 3600,
+}
+
+# SIMILAR_TO edges written with --quantize store score_q = score * scale.
+# The seed scripts keep their own copy, SCORE_SCALE in scripts/similarity/pruning.py.
+SIMILARITY_SCORE_SCALE = 1_000_000
@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+
+from flask import g, request
+
+from app.utils.metrics import metrics
+
+
+class RequestLog:
+    """
+    Appends every GET /api/ request to a JSONL file, one
+    ``{"ts", "method", "path", "query", "status", "ms"}`` object per line,
+    for scripts/benchmark_api.py to replay.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    def write(self, entry):
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, "a", encoding="utf-8")
+            self.file.write(line)
+            self.file.flush()
+
+
+def endpoint_name(method, rule):
+    """'GET /api/catalog/similar/<int:movie_id>': requests are grouped by route, not by URL."""
+    return f"{method} {rule or '<unmatched>'}"
+
+
+def log_entry(path, query_string, status, started=None):
+    return {
+        "ts": time.time(),
+        "method": "GET",
+        "path": path,
+        "query": query_string.decode("latin-1"),
+        "status": status,
+        "ms": None if started is None else round((time.perf_counter() - started) * 1e3, 3),
+    }
+
+
+def register_instrumentation(app):
+
+    request_log = RequestLog(app.config["REQUEST_LOG_PATH"]) if app.config["REQUEST_LOG_PATH"] else None
+    app.extensions["request_log"] = request_log
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_token = metrics.begin_request()
+        g.started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        # Error responses from the error handlers pass through here too.
+        token = g.pop("metrics_token", None)
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        metrics.end_request(token, endpoint_name(request.method, rule), response.status_code)
+
+        if request_log is not None and request.method == "GET" and request.path.startswith("/api/"):
+            request_log.write(log_entry(
+                request.path, request.query_string, response.status_code, g.pop("started", None)
+            ))
+        return response
+
+    return app
@@ -0,0 +1,60 @@
+class MovieProjection:
+    """
+    A fixed subset of Movie properties, read straight from Cypher as a
+    list instead of hydrating a neomodel node.
+
+    FIELDS are the properties returned, in order; SNIPPETS cut long text
+    properties to at most that many characters.
+    """
+    __slots__ = ()
+    FIELDS = ()
+    SNIPPETS = {}
+
+    def __init__(self, *values):
+        for name, value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def cypher(cls, var="m"):
+        """Cypher list expression returning the fields of node ``var``."""
+        columns = [
+            f"left({var}.{name}, {cls.SNIPPETS[name]})" if name in cls.SNIPPETS else f"{var}.{name}"
+            for name in cls.FIELDS
+        ]
+        return "[" + ", ".join(columns) + "]"
+
+    @classmethod
+    def from_properties(cls, properties):
+        """Projects a full property dict, e.g. a catalog snapshot row."""
+        values = []
+        for name in cls.FIELDS:
+            value = properties.get(name)
+            if value is not None and name in cls.SNIPPETS:
+                value = value[:cls.SNIPPETS[name]]
+            values.append(value)
+        return cls(*values)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class MovieCard(MovieProjection):
+    """What a grid thumbnail shows: poster, title, rating, votes, year, a short overview."""
+    __slots__ = FIELDS = (
+        "movie_id", "title", "poster_url", "vote_average", "vote_count", "release_year", "overview",
+    )
+    SNIPPETS = {"overview": 80}
+
+
+class MovieDetail(MovieProjection):
+    """Every stored Movie property."""
+    __slots__ = FIELDS = (
+        "movie_id", "title", "overview", "popularity", "vote_average",
+        "vote_count", "release_year", "runtime", "poster_url",
+    )
+
+
+PROJECTIONS = {
+    "card": MovieCard,
+    "detail": MovieDetail,
+}
@@ -0,0 +1,151 @@
+import logging
+import time
+
+from neo4j import AsyncGraphDatabase, READ_ACCESS, RoutingControl
+from neo4j.exceptions import DriverError, Neo4jError
+
+from app.repositories.catalog_repository import CatalogRepository, to_movie, to_movies
+from app.utils.metrics import timed_query
+from db.neo4j.driver import PoolMetrics, instrument_pool, pool_state
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCatalogRepository:
+    """
+    The CatalogRepository reads behind the async API, on the neo4j async
+    driver. Queries are the same Cypher (CatalogRepository's *_query
+    builders), awaited instead of holding a thread for the round trip, so
+    concurrent sections and searches overlap on the network.
+
+    The driver is created on first use, inside the serving event loop, with
+    ``options`` (db.neo4j.driver.driver_options) and an instrumented pool.
+    """
+
+    def __init__(self, uri, database=None, **options):
+        self.uri = uri
+        self.database = database
+        self.options = options
+        self.metrics = PoolMetrics()
+        self._driver = None
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = AsyncGraphDatabase.driver(self.uri, **self.options)
+            instrument_pool(self._driver, self.metrics)
+        return self._driver
+
+    async def close(self):
+        if self._driver is not None:
+            await self._driver.close()
+            self._driver = None
+
+    async def warm_up(self, connections):
+        """See ManagedDriver.warm_up."""
+        if connections <= 0:
+            return 0
+        started = time.perf_counter()
+        sessions = []
+        try:
+            for _ in range(connections):
+                session = self.driver.session(database=self.database, default_access_mode=READ_ACCESS)
+                sessions.append(session)
+                transaction = await session.begin_transaction()
+                await (await transaction.run("RETURN 1")).consume()
+        except (DriverError, Neo4jError, OSError) as e:
+            logger.warning("Neo4j async pool warm-up failed after %d connections: %s", len(sessions) - 1, e)
+            return max(len(sessions) - 1, 0)
+        finally:
+            for session in sessions:
+                await session.close()
+        logger.info("Opened %d async Neo4j connections in %.0f ms",
+                    connections, (time.perf_counter() - started) * 1e3)
+        return connections
+
+    def pool_state(self):
+        if self._driver is None:
+            return None
+        return pool_state(self._driver, self.metrics, self.options.get("max_connection_pool_size"))
+
+    async def run(self, name, query, params=None):
+        """
+        Runs read query ``name``, timed like catalog_repository.run_query;
+        returns its rows as lists, like db.cypher_query.
+        """
+        with timed_query(name) as timer:
+            records, _, _ = await self.driver.execute_query(
+                query, params or {}, database_=self.database, routing_=RoutingControl.READ
+            )
+            timer["rows"] = len(records)
+        return [record.values() for record in records]
+
+    @property
+    def SECTION_MAPPINGS(self):
+        return CatalogRepository.SECTION_MAPPINGS
+
+    async def section_lists(self):
+        results = await self.run("section_lists", CatalogRepository.SECTION_LISTS_QUERY)
+        return {name: title for name, title in results}
+
+    async def stored_section(self, name: str, limit=20, projection=None):
+        results = await self.run(
+            "stored_section", *CatalogRepository.stored_section_query(name, limit, projection)
+        )
+        return CatalogRepository.stored_movies(results, projection)
+
+    async def stored_section_ids(self, name: str, limit=20):
+        results = await self.run(
+            "stored_section_ids", CatalogRepository.STORED_SECTION_IDS_QUERY, {"name": name, "limit": limit}
+        )
+        return results[0][0] if results else None
+
+    async def section_page(self, name: str, after=None, limit=20, projection=None):
+        results = await self.run(
+            "section_page", *CatalogRepository.section_page_query(name, after, limit, projection)
+        )
+        return to_movies(results, projection)
+
+    async def get_section(self, name: str, projection=None, limit=20):
+        """The precomputed list, else the live query of a SECTION_MAPPINGS section, else None."""
+        movies = await self.stored_section(name, limit, projection)
+        if movies is None and name in CatalogRepository.SECTION_MAPPINGS:
+            movies = await self.section_page(name, limit=limit, projection=projection)
+        return movies
+
+    async def popular(self, limit=20, projection=None):
+        return await self.section_page("popular", limit=limit, projection=projection)
+
+    async def catalog_version(self):
+        results = await self.run("catalog_version", CatalogRepository.CATALOG_VERSION_QUERY)
+        return results[0][0] if results else None
+
+    async def search_movies_scored(self, query: str, limit=5, projection=None):
+        if not query:
+            return []
+        results = await self.run(
+            "search_movies_scored", *CatalogRepository.search_movies_query(query, limit, projection)
+        )
+        return [(to_movie(row[0], projection), row[1]) for row in results]
+
+    async def movies_by_ids(self, movie_ids: list[int], projection=None):
+        if not movie_ids:
+            return []
+        results = await self.run(
+            "movies_by_ids", *CatalogRepository.movies_by_ids_query(movie_ids, projection)
+        )
+        return to_movies(results, projection)
+
+    async def recommend(self, seeds: dict[int, float], limit=10, projection=None):
+        if not seeds:
+            return []
+        results = await self.run("recommend", *CatalogRepository.recommend_query(seeds, limit, projection))
+        return to_movies(results, projection)
+
+    async def search_and_recommend(self, query: str, search_limit=5, rec_limit=10, projection=None):
+        if not query:
+            return [], []
+        results = await self.run("search_and_recommend", *CatalogRepository.search_and_recommend_query(
+            query, search_limit, rec_limit, projection
+        ))
+        return CatalogRepository.hits_and_recommendations(results, projection)
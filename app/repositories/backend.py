@@ -0,0 +1,56 @@
+"""
+The catalog store the app reads from, chosen by ``CATALOG_BACKEND``:
+
+* ``neo4j``: CatalogRepository (neomodel, blocking) and
+  AsyncCatalogRepository (async driver) on the configured database;
+* ``memory``: a MemoryCatalog built from ``CATALOG_DATA_DIR``'s seed CSVs
+  behind both interfaces, each call delayed by ``CATALOG_MEMORY_LATENCY``
+  seconds to stand in for the round trip.
+
+Services read ``catalog_backend.repository`` (or ``async_repository``)
+rather than importing a repository, so either backend serves every path.
+"""
+from app.repositories.async_catalog_repository import AsyncCatalogRepository
+from app.repositories.catalog_repository import CatalogRepository
+from app.repositories.memory_catalog_repository import (
+    AsyncMemoryCatalogRepository, MemoryCatalog, MemoryCatalogRepository
+)
+from db.neo4j.driver import driver_options, neo4j_uri
+
+BACKENDS = ("neo4j", "memory")
+
+
+class CatalogBackend:
+
+    def __init__(self):
+        self.name = "neo4j"
+        self.repository = CatalogRepository
+        self.async_repository = None
+
+    def configure(self, name, repository, async_repository):
+        self.name = name
+        self.repository = repository
+        self.async_repository = async_repository
+
+
+catalog_backend = CatalogBackend()
+
+
+def init_catalog_backend(app):
+    name = app.config["CATALOG_BACKEND"]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown CATALOG_BACKEND '{name}'; use one of: {', '.join(BACKENDS)}")
+
+    if name == "memory":
+        catalog = MemoryCatalog.from_csv(app.config["CATALOG_DATA_DIR"])
+        latency = app.config["CATALOG_MEMORY_LATENCY"]
+        catalog_backend.configure(
+            name, MemoryCatalogRepository(catalog, latency), AsyncMemoryCatalogRepository(catalog, latency)
+        )
+        return
+
+    catalog_backend.configure(name, CatalogRepository, AsyncCatalogRepository(
+        neo4j_uri(app.config),
+        database=app.config["NEO4J_DATABASE"] or None,
+        **driver_options(app.config),
+    ))
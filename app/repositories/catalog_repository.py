@@ -1,56 +1,208 @@
 from neomodel import db
+from app.constants.catalogs import SIMILARITY_SCORE_SCALE
 from app.models.movie import Movie
+from app.utils.metrics import timed_query
+
+
+# Every method returning movies takes an optional ``projection`` (see
+# app.models.projections): without one it returns hydrated Movie nodes,
+# with one only the projection's fields are read, as projection records.
+
+def movie_column(var, projection):
+    """Cypher returning movie ``var``: the node itself or the projection's fields."""
+    return var if projection is None else projection.cypher(var)
+
+
+def run_query(name, query, params=None):
+    """db.cypher_query, timed and counted as query ``name`` (app.utils.metrics)."""
+    with timed_query(name) as timer:
+        results, meta = db.cypher_query(query, params)
+        timer["rows"] = len(results)
+    return results, meta
+
+
+def to_movie(value, projection):
+    return Movie.inflate(value) if projection is None else projection(*value)
+
+
+def to_movies(results, projection):
+    """Movies of rows whose first column is movie_column(...)."""
+    return [to_movie(row[0], projection) for row in results]
 
 
 class CatalogRepository:
 
     SECTION_MAPPINGS = {
-        "popular": lambda: CatalogRepository.popular(),
-        "trending": lambda: CatalogRepository.trending(),
-        "topRated": lambda: CatalogRepository.top_rated(),
+        "popular": lambda projection=None, limit=20: CatalogRepository.popular(limit, projection),
+        "trending": lambda projection=None, limit=20: CatalogRepository.trending(limit, projection),
+        "topRated": lambda projection=None, limit=20: CatalogRepository.top_rated(limit, projection),
 
         # Genre-based
-        "action": lambda: CatalogRepository.by_genre("Action"),
-        "comedy": lambda: CatalogRepository.by_genre("Comedy"),
-        "drama": lambda: CatalogRepository.by_genre("Drama"),
+        "action": lambda projection=None, limit=20: CatalogRepository.by_genre("Action", limit, projection),
+        "comedy": lambda projection=None, limit=20: CatalogRepository.by_genre("Comedy", limit, projection),
+        "drama": lambda projection=None, limit=20: CatalogRepository.by_genre("Drama", limit, projection),
     }
 
+    # Live sections ordered by a property, highest first, ties by movie_id:
+    # name -> (pattern binding m, filter, sort property).
+    SECTION_ORDERS = {
+        "popular": ("(m:Movie)", None, "popularity"),
+        "trending": ("(m:Movie)", "m.release_year >= 2020", "popularity"),
+        "topRated": ("(m:Movie)", "m.vote_count > 500", "vote_average"),
+    }
+
+    # Genre sections with a live query even without a stored list.
+    LIVE_GENRES = {"action": "Action", "comedy": "Comedy", "drama": "Drama"}
+
+    # Every query below is built by a *_query method returning
+    # (cypher, params), shared with AsyncCatalogRepository; the other
+    # methods run them through neomodel.
+
+    @staticmethod
+    def ranked_page_query(pattern, where, sort_key, after, limit, projection, params=None, prefix=""):
+        """
+        One page of ``pattern`` ordered by m.<sort_key> DESC, m.movie_id.
+
+        With ``after`` (a movie id) the page starts right after that movie,
+        found by its sort key: a range seek on the index, so a deep page
+        costs the same as the first one (no SKIP).
+        """
+        conditions = [f"m.{sort_key} IS NOT NULL"]
+        if where:
+            conditions.append(where)
+        anchor = ""
+        if after is not None:
+            anchor = "MATCH (a:Movie {movie_id: $after})"
+            conditions.append(f"m.{sort_key} <= a.{sort_key}")
+            conditions.append(f"(m.{sort_key} < a.{sort_key} OR m.movie_id > a.movie_id)")
+
+        query = """
+        %s
+        %s
+        MATCH %s
+        WHERE %s
+        RETURN %s ORDER BY m.%s DESC, m.movie_id LIMIT $limit
+        """ % (
+            anchor, prefix, pattern, " AND ".join(conditions),
+            movie_column("m", projection), sort_key,
+        )
+        return query, {**(params or {}), "after": after, "limit": limit}
+
+    @staticmethod
+    def section_page_query(name: str, after=None, limit=20, projection=None):
+        if name in CatalogRepository.SECTION_ORDERS:
+            pattern, where, sort_key = CatalogRepository.SECTION_ORDERS[name]
+            return CatalogRepository.ranked_page_query(pattern, where, sort_key, after, limit, projection)
+
+        return CatalogRepository.ranked_page_query(
+            "(:Genre {name: genre})<-[:HAS_GENRE]-(m:Movie)", None, "popularity",
+            after, limit, projection,
+            {"name": name, "genre": CatalogRepository.LIVE_GENRES.get(name)},
+            prefix="""OPTIONAL MATCH (s:SectionList {name: $name})
+        WITH %scoalesce(s.genre, $genre) AS genre""" % ("a, " if after is not None else ""),
+        )
+
     @staticmethod
-    def popular(limit=20):
+    def popular(limit=20, projection=None):
         """Returns movies ordered by simple popularity score."""
-        return list(Movie.nodes.order_by("-popularity")[:limit])
+        return CatalogRepository.section_page("popular", limit=limit, projection=projection)
 
     @staticmethod
-    def trending(limit=20):
+    def trending(limit=20, projection=None):
         """Returns recently released movies ordered by popularity."""
-        return list(
-            Movie.nodes.filter(release_year__gte=2020)
-            .order_by("-popularity")[:limit]
-        )
+        return CatalogRepository.section_page("trending", limit=limit, projection=projection)
 
     @staticmethod
-    def top_rated(limit=20):
+    def top_rated(limit=20, projection=None):
         """Returns highly-rated movies with a minimum vote count."""
-        return list(
-            Movie.nodes.filter(vote_count__gt=500)
-            .order_by("-vote_average")[:limit]
+        return CatalogRepository.section_page("topRated", limit=limit, projection=projection)
+
+    @staticmethod
+    def by_genre(genre_name, limit=20, projection=None):
+        query, params = CatalogRepository.ranked_page_query(
+            "(:Genre {name: $genre})<-[:HAS_GENRE]-(m:Movie)", None, "popularity",
+            None, limit, projection, {"genre": genre_name},
         )
+        results, _ = run_query("by_genre", query, params)
+        return to_movies(results, projection)
+
+    @staticmethod
+    def section_page(name: str, after=None, limit=20, projection=None):
+        """
+        Returns up to ``limit`` movies of a section, live, in the order of
+        its precomputed list, starting after movie id ``after`` (keyset
+        pagination). Genre sections are found through their SectionList,
+        or LIVE_GENRES.
+        """
+        query, params = CatalogRepository.section_page_query(name, after, limit, projection)
+        results, _ = run_query("section_page", query, params)
+        return to_movies(results, projection)
+
+    @staticmethod
+    def section_lists():
+        """
+        Returns { name: title } of every precomputed section list
+        (scripts/section_lists.py), in their stored order.
+        """
+        results, _ = run_query("section_lists", CatalogRepository.SECTION_LISTS_QUERY)
+        return {name: title for name, title in results}
+
+    SECTION_LISTS_QUERY = """
+        MATCH (s:SectionList)
+        RETURN s.name, s.title ORDER BY s.position
+    """
+
+    @staticmethod
+    def stored_section(name: str, limit=20, projection=None):
+        """
+        Returns the first movies of a precomputed section list in rank
+        order, or None when there is no such list.
+        """
+        query, params = CatalogRepository.stored_section_query(name, limit, projection)
+        results, _ = run_query("stored_section", query, params)
+        return CatalogRepository.stored_movies(results, projection)
 
     @staticmethod
-    def by_genre(genre_name, limit=20):
+    def stored_section_query(name: str, limit=20, projection=None):
         query = """
-        MATCH (g:Genre {name: $genre})
-        MATCH (m:Movie)-[:HAS_GENRE]->(g)
-        RETURN m ORDER BY m.popularity DESC LIMIT $limit
+        MATCH (s:SectionList {name: $name})
+        RETURN [id IN s.movie_ids[..$limit] | head([(m:Movie {movie_id: id}) | %s])]
+        """ % movie_column("m", projection)
+        return query, {"name": name, "limit": limit}
+
+    @staticmethod
+    def stored_movies(results, projection=None):
+        if not results:
+            return None
+        return [to_movie(value, projection) for value in results[0][0] if value is not None]
+
+    @staticmethod
+    def stored_section_ids(name: str, limit=20):
+        """Returns the first movie ids of a precomputed section list, or None."""
+        results, _ = run_query(
+            "stored_section_ids", CatalogRepository.STORED_SECTION_IDS_QUERY, {"name": name, "limit": limit}
+        )
+        return results[0][0] if results else None
+
+    STORED_SECTION_IDS_QUERY = """
+        MATCH (s:SectionList {name: $name})
+        RETURN s.movie_ids[..$limit]
+    """
+
+    @staticmethod
+    def get_section(name: str, projection=None, limit=20):
         """
-        results, _ = db.cypher_query(query, {
-            "genre": genre_name, "limit": limit
-        })
-        return [Movie.inflate(row[0]) for row in results]
-    
+        Returns one section's first ``limit`` movies: from the precomputed
+        list when there is one, else the live query from SECTION_MAPPINGS,
+        else None.
+        """
+        movies = CatalogRepository.stored_section(name, limit=limit, projection=projection)
+        if movies is None and name in CatalogRepository.SECTION_MAPPINGS:
+            movies = CatalogRepository.SECTION_MAPPINGS[name](projection=projection, limit=limit)
+        return movies
 
     @staticmethod
-    def get_sections(section_list: list[str]):
+    def get_sections(section_list: list[str], projection=None):
         """
         Returns sections as dict: { section_name: movie_list }
         Only loads the sections requested.
@@ -58,72 +210,213 @@ class CatalogRepository:
         result = {}
         for name in section_list:
             key = name.strip()
-            if key in CatalogRepository.SECTION_MAPPINGS:
-                result[key] = CatalogRepository.SECTION_MAPPINGS[key]()
+            movies = CatalogRepository.get_section(key, projection=projection)
+            if movies is not None:
+                result[key] = movies
 
         return result
 
     @staticmethod
-    def search_movies(query: str, limit=5):
+    def catalog_version():
+        """Returns the version stamp the seed scripts bump, or None if unset."""
+        results, _ = run_query("catalog_version", CatalogRepository.CATALOG_VERSION_QUERY)
+        return results[0][0] if results else None
+
+    CATALOG_VERSION_QUERY = "MATCH (c:CatalogMeta {name: 'catalog'}) RETURN c.version"
+
+    @staticmethod
+    def search_movies(query: str, limit=5, projection=None):
+        return [
+            movie for movie, _ in CatalogRepository.search_movies_scored(query, limit, projection)
+        ]
+
+    @staticmethod
+    def search_movies_scored(query: str, limit=5, projection=None):
+        """Returns (movie, score) pairs, best match first."""
         if not query:
             return []
 
+        cypher, params = CatalogRepository.search_movies_query(query, limit, projection)
+        results, _ = run_query("search_movies_scored", cypher, params)
+        return [(to_movie(row[0], projection), row[1]) for row in results]
+
+    @staticmethod
+    def search_movies_query(query: str, limit=5, projection=None):
         search_term = query.strip() + "*"
 
         cypher = """
         CALL db.index.fulltext.queryNodes('movieSearch', $term)
         YIELD node AS m, score AS ft_score
         WITH m, ft_score + (m.vote_average * 0.03) AS score
-        RETURN m ORDER BY score DESC LIMIT $limit
+        RETURN %s, score ORDER BY score DESC LIMIT $limit
+        """ % movie_column("m", projection)
+        return cypher, {"term": search_term, "limit": limit}
+
+    @staticmethod
+    def movies_by_ids(movie_ids: list[int], projection=None):
+        """Returns the movies with these ids in the same order, skipping unknown ids."""
+        if not movie_ids:
+            return []
+
+        query, params = CatalogRepository.movies_by_ids_query(movie_ids, projection)
+        results, _ = run_query("movies_by_ids", query, params)
+        return to_movies(results, projection)
+
+    @staticmethod
+    def movies_by_ids_query(movie_ids: list[int], projection=None):
+        query = """
+        UNWIND range(0, size($ids) - 1) AS i
+        MATCH (m:Movie {movie_id: $ids[i]})
+        RETURN %s ORDER BY i
+        """ % movie_column("m", projection)
+        return query, {"ids": movie_ids}
+
+    @staticmethod
+    def movie_properties(batch=5000):
+        """
+        Yields the properties of every Movie, as MovieTransformer returns
+        them, in lists of ``batch`` movies ordered by movie_id.
+        """
+        query = """
+        MATCH (m:Movie) WHERE m.movie_id > $after
+        WITH m ORDER BY m.movie_id LIMIT $batch
+        RETURN m ORDER BY m.movie_id
         """
+        after = None
+        while True:
+            results, _ = run_query("movie_properties", query, {
+                "after": after if after is not None else -1, "batch": batch
+            })
+            if not results:
+                return
+            movies = [dict(Movie.inflate(row[0]).__properties__) for row in results]
+            yield movies
+            after = movies[-1]["movie_id"]
 
-        results, _ = db.cypher_query(cypher, {
-            "term": search_term,
-            "limit": limit
-        })
-        return [Movie.inflate(row[0]) for row in results]
+    @staticmethod
+    def similarity_edges(batch=2000):
+        """
+        Yields every SIMILAR_TO edge as lists of
+        (movie_id, [neighbour ids], [scores]) rows, ``batch`` source movies
+        at a time in movie_id order. Quantized scores are scaled back.
+        """
+        query = """
+        MATCH (m:Movie) WHERE m.movie_id > $after
+        WITH m ORDER BY m.movie_id LIMIT $batch
+        RETURN m.movie_id AS movie_id, [(m)-[s:SIMILAR_TO]->(rec:Movie) |
+            [rec.movie_id, coalesce(toFloat(s.score_q) / $scale, s.score, 0.0)]]
+        ORDER BY movie_id
+        """
+        after = -1
+        while True:
+            results, _ = run_query("similarity_edges", query, {
+                "after": after, "batch": batch, "scale": SIMILARITY_SCORE_SCALE
+            })
+            if not results:
+                return
+            yield [
+                (movie_id, [e[0] for e in edges], [e[1] for e in edges])
+                for movie_id, edges in results if edges
+            ]
+            after = results[-1][0]
 
     @staticmethod
-    def similar_movies(movie_id: int, limit=10):
+    def similar_movies(movie_id: int, limit=10, projection=None):
         """
         USES THE PYTHON-COMPUTED SIMILAR_TO edges.
         Fast, accurate, no Cypher scoring needed.
+        Edges may carry a float `score` or a quantized integer `score_q`.
         """
         query = """
         MATCH (m:Movie {movie_id: $id})-[s:SIMILAR_TO]->(rec:Movie)
-        RETURN rec ORDER BY s.score DESC LIMIT $limit
-        """
+        RETURN %s ORDER BY coalesce(s.score_q, s.score * $scale) DESC LIMIT $limit
+        """ % movie_column("rec", projection)
 
-        results, _ = db.cypher_query(query, {
+        results, _ = run_query("similar_movies", query, {
             "id": movie_id,
-            "limit": limit
+            "limit": limit,
+            "scale": SIMILARITY_SCORE_SCALE
         })
 
-        return [Movie.inflate(row[0]) for row in results]
+        return to_movies(results, projection)
 
     @staticmethod
-    def search_and_recommend(query: str, search_limit=5, rec_limit=10):
+    def recommend(seeds: dict[int, float], limit=10, projection=None):
+        """
+        SIMILAR_TO recommendations for scored seed movies (movie_id: score),
+        ranked as search_and_recommend ranks them. Seeds are never recommended.
         """
-        1. Full-text search movies
-        2. For each search result, fetch similar movies via SIMILAR_TO
-        3. Merge + dedupe results
+        if not seeds:
+            return []
+
+        query, params = CatalogRepository.recommend_query(seeds, limit, projection)
+        results, _ = run_query("recommend", query, params)
+        return to_movies(results, projection)
+
+    @staticmethod
+    def recommend_query(seeds: dict[int, float], limit=10, projection=None):
+        query = """
+        UNWIND $seeds AS seed
+        MATCH (:Movie {movie_id: seed.movie_id})-[s:SIMILAR_TO]->(rec:Movie)
+        WHERE NOT rec.movie_id IN $seed_ids
+        WITH rec, sum(seed.score * coalesce(toFloat(s.score_q) / $scale, s.score)) AS rec_score
+        ORDER BY rec_score DESC, rec.popularity DESC LIMIT $limit
+        RETURN %s
+        """ % movie_column("rec", projection)
+        return query, {
+            "seeds": [{"movie_id": movie_id, "score": score} for movie_id, score in seeds.items()],
+            "seed_ids": list(seeds),
+            "limit": limit,
+            "scale": SIMILARITY_SCORE_SCALE
+        }
+
+    @staticmethod
+    def search_and_recommend(query: str, search_limit=5, rec_limit=10, projection=None):
         """
-        search_results = CatalogRepository.search_movies(query, limit=search_limit)
+        Full-text search and SIMILAR_TO recommendations in one round trip.
 
-        if not search_results:
+        Every recommendation is scored across all seeds as
+        sum(seed score * similarity), the seed score being the same
+        full-text score search_movies ranks by. Seeds are never recommended.
+        """
+        if not query:
             return [], []
 
-        seed_ids = [m.movie_id for m in search_results]
+        cypher, params = CatalogRepository.search_and_recommend_query(
+            query, search_limit, rec_limit, projection
+        )
+        results, _ = run_query("search_and_recommend", cypher, params)
+        return CatalogRepository.hits_and_recommendations(results, projection)
+
+    @staticmethod
+    def search_and_recommend_query(query: str, search_limit=5, rec_limit=10, projection=None):
+        cypher = """
+        CALL db.index.fulltext.queryNodes('movieSearch', $term)
+        YIELD node AS m, score AS ft_score
+        WITH m, ft_score + (m.vote_average * 0.03) AS score
+        ORDER BY score DESC LIMIT $search_limit
+        WITH collect(m) AS hits, collect(score) AS scores
+        UNWIND range(0, size(hits) - 1) AS i
+        WITH hits, hits[i] AS seed, scores[i] AS seed_score
+        OPTIONAL MATCH (seed)-[s:SIMILAR_TO]->(rec:Movie)
+        WHERE NOT rec IN hits
+        WITH hits, rec,
+             sum(seed_score * coalesce(toFloat(s.score_q) / $scale, s.score)) AS rec_score
+        ORDER BY rec_score DESC, rec.popularity DESC
+        RETURN [h IN hits | %s], [r IN collect(rec)[..$rec_limit] | %s]
+        """ % (movie_column("h", projection), movie_column("r", projection))
 
-        all_recs = []
-        for sid in seed_ids:
-            all_recs.extend(CatalogRepository.similar_movies(sid, limit=rec_limit))
+        return cypher, {
+            "term": query.strip() + "*",
+            "search_limit": search_limit,
+            "rec_limit": rec_limit,
+            "scale": SIMILARITY_SCORE_SCALE
+        }
 
-        seen = set(seed_ids)
-        unique_recs = []
-        for m in all_recs:
-            if m.movie_id not in seen:
-                unique_recs.append(m)
-                seen.add(m.movie_id)
+    @staticmethod
+    def hits_and_recommendations(results, projection=None):
+        if not results:
+            return [], []
 
-        return search_results, unique_recs[:rec_limit]
+        hits, recs = results[0]
+        return [to_movie(h, projection) for h in hits], [to_movie(r, projection) for r in recs]
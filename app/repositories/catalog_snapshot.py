@@ -0,0 +1,261 @@
+"""
+Read-only, memory-mapped snapshot of every Movie's properties.
+
+Worker processes ``mmap`` the same file, so the OS keeps one copy of it in
+the page cache however many workers run, and loading it only reads a small
+JSON header. Layout:
+
+    b"CATSNAP1" | header length (uint64) | JSON header | arrays, 64-byte aligned
+
+Every property is a column: ``<name>`` holds int64 or float64 values and,
+for text, ``<name>.offsets`` (int64, one per row plus one) delimit each
+row's UTF-8 bytes in ``<name>.heap``. ``<name>.null`` (uint8) marks rows
+without a value. Rows are sorted by movie_id, which is looked up by binary
+search.
+
+The header records the catalog version stamp the snapshot was built
+from; a snapshot is only used while the graph still has that version.
+Build it with ``flask catalog build-snapshot`` after every reseed.
+"""
+import json
+import logging
+import mmap
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.repositories.backend import catalog_backend
+from app.utils.reloader import BackgroundReloader
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CATSNAP1"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+# Property -> column kind, in MovieTransformer.transform order.
+COLUMNS = {
+    "movie_id": "int",
+    "title": "str",
+    "overview": "str",
+    "popularity": "float",
+    "vote_average": "float",
+    "vote_count": "int",
+    "release_year": "int",
+    "runtime": "int",
+    "poster_url": "str",
+    "element_id_property": "str",
+}
+
+
+def _column_arrays(name, kind, values):
+    """Yields (array name, numpy array) for one column."""
+    nulls = np.fromiter((v is None for v in values), dtype=np.uint8, count=len(values))
+    if kind == "str":
+        encoded = [b"" if v is None else str(v).encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        yield f"{name}.offsets", offsets
+        yield f"{name}.heap", np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    else:
+        dtype = np.int64 if kind == "int" else np.float64
+        yield name, np.array([0 if v is None else v for v in values], dtype=dtype)
+    if nulls.any():
+        yield f"{name}.null", nulls
+
+
+def write_snapshot(path, rows, catalog_version=None):
+    """
+    Writes ``rows`` (property dicts) to ``path``, replacing it atomically
+    so processes that still map the old file keep reading it.
+
+    Returns:
+        int: Number of movies written.
+    """
+    rows = sorted(rows, key=lambda row: row["movie_id"])
+    arrays = {}
+    for name, kind in COLUMNS.items():
+        arrays.update(_column_arrays(name, kind, [row.get(name) for row in rows]))
+
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGN) * ALIGN
+        layout[name] = [array.dtype.str, offset, len(array)]
+        offset += array.nbytes
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "catalog_version": catalog_version,
+        "count": len(rows),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "arrays": layout,
+    }).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(np.uint64(len(header)).tobytes())
+            f.write(header)
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name][1])
+                f.write(array.tobytes())
+            # Pad, so empty trailing arrays still start inside the file.
+            f.truncate(data_start + -(-offset // ALIGN) * ALIGN + ALIGN)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    return len(rows)
+
+
+def build_snapshot(path, batch=5000):
+    """Writes a snapshot of every Movie in the graph; returns the count."""
+    version = catalog_backend.repository.catalog_version()
+    rows = [row for chunk in catalog_backend.repository.movie_properties(batch=batch) for row in chunk]
+    return write_snapshot(path, rows, catalog_version=version)
+
+
+class CatalogSnapshot:
+    """A mapped snapshot file. Lookups return transform-ready dicts."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        header_len = int(np.frombuffer(self._map, dtype=np.uint64, count=1, offset=len(MAGIC))[0])
+        start = len(MAGIC) + 8
+        header = json.loads(self._map[start:start + header_len])
+        if header["format"] != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format {header['format']}, expected {FORMAT_VERSION}")
+
+        data_start = -(-(start + header_len) // ALIGN) * ALIGN
+        self.catalog_version = header["catalog_version"]
+        self.count = header["count"]
+        self._arrays = {
+            name: np.frombuffer(self._map, dtype=np.dtype(dtype), count=length, offset=data_start + offset)
+            for name, (dtype, offset, length) in header["arrays"].items()
+        }
+        self.movie_ids = self._arrays["movie_id"]
+        # (name, values or heap, offsets, nulls) per column, resolved once.
+        self._columns = [
+            (
+                name,
+                self._arrays[f"{name}.heap" if kind == "str" else name],
+                self._arrays.get(f"{name}.offsets"),
+                self._arrays.get(f"{name}.null"),
+            )
+            for name, kind in COLUMNS.items()
+        ]
+
+    def _row(self, i):
+        movie = {}
+        for name, values, offsets, nulls in self._columns:
+            if nulls is not None and nulls[i]:
+                movie[name] = None
+            elif offsets is not None:
+                movie[name] = values[offsets[i]:offsets[i + 1]].tobytes().decode("utf-8")
+            else:
+                movie[name] = values[i].item()
+        return movie
+
+    def get(self, movie_id: int):
+        """Returns one movie's properties, or None when it is not in the snapshot."""
+        i = int(np.searchsorted(self.movie_ids, movie_id))
+        if i == self.count or self.movie_ids[i] != movie_id:
+            return None
+        return self._row(i)
+
+    def movies(self, movie_ids):
+        """Returns the movies in ``movie_ids`` order, skipping unknown ids."""
+        movies = (self.get(movie_id) for movie_id in movie_ids)
+        return [movie for movie in movies if movie is not None]
+
+    def column(self, name):
+        """Returns every movie's ``name`` property as a list, in movie_id order."""
+        _, values, offsets, nulls = next(column for column in self._columns if column[0] == name)
+        if offsets is not None:
+            heap = values.tobytes()
+            column = [heap[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self.count)]
+        else:
+            column = values.tolist()
+        if nulls is not None:
+            column = [None if null else value for value, null in zip(column, nulls.tolist())]
+        return column
+
+
+class SnapshotStore:
+    """
+    Maps the snapshot file and remaps it when it is rebuilt. ``current()``
+    returns None while the file is missing or older than the graph; the
+    file and the graph's version stamp are checked in the background
+    every ``check_interval`` seconds.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.check_interval = 30
+        self._snapshot = None
+        self._usable = False
+        self._stat = None
+        self._reloader = BackgroundReloader(
+            self.check, name="catalog-snapshot", description="Checking the catalog snapshot",
+            interval=self.check_interval,
+        )
+
+    def configure(self, path, check_interval):
+        self.path = path or None
+        self.check_interval = check_interval
+        self._reloader.interval = check_interval
+
+    def current(self):
+        if self.path is None:
+            return None
+        self._reloader.poke()
+        return self._snapshot if self._usable else None
+
+    def check(self):
+        """Remaps a rebuilt file and rechecks its version against the graph."""
+        try:
+            stat = os.stat(self.path)
+            key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            remapped = key != self._stat
+            if remapped:
+                self._snapshot = CatalogSnapshot(self.path)
+                self._stat = key
+                logger.info("Mapped catalog snapshot %s (%d movies)", self.path, self._snapshot.count)
+        except FileNotFoundError:
+            self._snapshot, self._usable, self._stat = None, False, None
+            return
+
+        usable = self._snapshot.catalog_version == catalog_backend.repository.catalog_version()
+        if not usable and (remapped or self._usable):
+            logger.warning("Catalog snapshot %s is older than the graph; rebuild it", self.path)
+        self._usable = usable
+
+
+catalog_snapshot = SnapshotStore()
+
+
+def init_catalog_snapshot(app):
+    catalog_snapshot.configure(
+        app.config["CATALOG_SNAPSHOT_PATH"], app.config["CATALOG_SNAPSHOT_CHECK"]
+    )
+    if catalog_snapshot.path is not None:
+        # Mapped before the first request; later checks run in the background.
+        catalog_snapshot._reloader.defer(catalog_snapshot.check_interval)
+        try:
+            catalog_snapshot.check()
+        except Exception:
+            logger.warning("Catalog snapshot not loaded at startup", exc_info=True)
@@ -0,0 +1,299 @@
+"""
+In-memory stand-in for the Neo4j catalog, built from the seed CSVs.
+
+``MemoryCatalog`` answers every CatalogRepository read from ``movies.csv``
+and ``genres.csv`` with the same section lists, orderings and keyset
+pages as the graph; full-text search is a word-prefix match and
+SIMILAR_TO is approximated by shared genres. It is deterministic and needs
+no database, for benchmarks, load tests and local work
+(``CATALOG_BACKEND=memory``).
+
+``MemoryCatalogRepository`` and ``AsyncMemoryCatalogRepository`` wrap it
+with the repository interfaces; each call first waits ``latency`` seconds,
+standing in for a database round trip, and is timed as a query named after
+the method.
+"""
+import asyncio
+import bisect
+import csv
+from collections import defaultdict
+from functools import lru_cache
+import os
+import re
+import time
+
+from app.repositories.catalog_repository import CatalogRepository
+from app.utils.metrics import result_rows, timed_query
+
+SECTION_LIST_SIZE = 100
+
+INT_COLUMNS = ("movie_id", "vote_count", "release_year", "runtime")
+FLOAT_COLUMNS = ("popularity", "vote_average")
+TEXT_COLUMNS = ("title", "overview", "poster_url")
+
+WORD = re.compile(r"\w+")
+
+
+def section_slug(genre):
+    """'Science Fiction' -> 'scienceFiction', as scripts/section_lists.py names sections."""
+    words = [w for w in re.split(r"[^0-9A-Za-z]+", genre) if w]
+    if not words:
+        return None
+    return words[0].lower() + "".join(w[:1].upper() + w[1:].lower() for w in words[1:])
+
+
+def read_movies(path):
+    movies = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            movie = {}
+            for name in INT_COLUMNS:
+                value = row.get(name)
+                movie[name] = int(float(value)) if value else None
+            for name in FLOAT_COLUMNS:
+                value = row.get(name)
+                movie[name] = float(value) if value else None
+            for name in TEXT_COLUMNS:
+                movie[name] = row.get(name) or None
+            if movie["movie_id"] is not None:
+                movies[movie["movie_id"]] = movie
+    return movies
+
+
+def read_genres(path, movies):
+    genres = defaultdict(set)
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            movie_id = int(float(row["movie_id"]))
+            if row.get("genre") and movie_id in movies:
+                genres[row["genre"]].add(movie_id)
+    return genres
+
+
+class MemoryCatalog:
+    """Every catalog read, answered from movie property dicts."""
+
+    def __init__(self, movies: dict, genres: dict, version=1):
+        self.movies = movies
+        self.genres = genres
+        self.version = version
+        self.genres_of = defaultdict(list)
+        for genre, movie_ids in sorted(genres.items()):
+            for movie_id in movie_ids:
+                self.genres_of[movie_id].append(genre)
+
+        # name -> (title, genre, ranking); a ranking is the sorted
+        # (-sort value, movie_id) keys of every movie in the section.
+        self.sections = {
+            "popular": ("Popular", None, self._ranking(movies, "popularity")),
+            "trending": ("Trending", None, self._ranking(
+                [m for m in movies if (movies[m]["release_year"] or 0) >= 2020], "popularity")),
+            "topRated": ("Top Rated", None, self._ranking(
+                [m for m in movies if (movies[m]["vote_count"] or 0) > 500], "vote_average")),
+        }
+        for genre in sorted(genres):
+            slug = section_slug(genre)
+            if slug is not None and slug not in self.sections:
+                self.sections[slug] = (genre, genre, self._ranking(genres[genre], "popularity"))
+
+        # Sorted vocabulary of title and overview words, for prefix search.
+        self._words = defaultdict(lambda: (set(), set()))
+        for movie_id, movie in movies.items():
+            for field, text in enumerate((movie["title"], movie["overview"])):
+                for word in WORD.findall((text or "").lower()):
+                    self._words[word][field].add(movie_id)
+        self._vocabulary = sorted(self._words)
+
+    @classmethod
+    def from_csv(cls, data_dir):
+        movies = read_movies(os.path.join(data_dir, "movies.csv"))
+        genres = read_genres(os.path.join(data_dir, "genres.csv"), movies)
+        return cls(movies, genres)
+
+    def _ranking(self, movie_ids, sort_key):
+        return sorted(
+            (-self.movies[m][sort_key], m) for m in movie_ids if self.movies[m][sort_key] is not None
+        )
+
+    def _project(self, movie_ids, projection):
+        movies = [self.movies[m] for m in movie_ids if m in self.movies]
+        if projection is None:
+            return movies
+        return [projection.from_properties(movie) for movie in movies]
+
+    @property
+    def SECTION_MAPPINGS(self):
+        return CatalogRepository.SECTION_MAPPINGS
+
+    def section_lists(self):
+        return {name: title for name, (title, _, _) in self.sections.items()}
+
+    def stored_section_ids(self, name, limit=20):
+        if name not in self.sections:
+            return None
+        ranking = self.sections[name][2]
+        return [movie_id for _, movie_id in ranking[:min(limit, SECTION_LIST_SIZE)]]
+
+    def stored_section(self, name, limit=20, projection=None):
+        movie_ids = self.stored_section_ids(name, limit)
+        return None if movie_ids is None else self._project(movie_ids, projection)
+
+    def section_page(self, name, after=None, limit=20, projection=None):
+        if name not in self.sections:
+            return []
+        title, genre, ranking = self.sections[name]
+        start = 0
+        if after is not None:
+            anchor = self.movies.get(after)
+            sort_key = "vote_average" if name == "topRated" else "popularity"
+            if anchor is None or anchor[sort_key] is None:
+                return []
+            start = bisect.bisect_right(ranking, (-anchor[sort_key], after))
+        return self._project([movie_id for _, movie_id in ranking[start:start + limit]], projection)
+
+    def get_section(self, name, projection=None, limit=20):
+        return self.stored_section(name, limit, projection)
+
+    def get_sections(self, section_list, projection=None):
+        sections = {name.strip(): self.get_section(name.strip(), projection) for name in section_list}
+        return {name: movies for name, movies in sections.items() if movies is not None}
+
+    def popular(self, limit=20, projection=None):
+        return self.section_page("popular", limit=limit, projection=projection)
+
+    def trending(self, limit=20, projection=None):
+        return self.section_page("trending", limit=limit, projection=projection)
+
+    def top_rated(self, limit=20, projection=None):
+        return self.section_page("topRated", limit=limit, projection=projection)
+
+    def by_genre(self, genre_name, limit=20, projection=None):
+        return self.section_page(section_slug(genre_name), limit=limit, projection=projection)
+
+    def catalog_version(self):
+        return self.version
+
+    def search_movies_scored(self, query, limit=5, projection=None):
+        """
+        Every query word matches title and overview words it prefixes, as
+        the `term*` full-text query does; a title match counts double.
+        """
+        scores = defaultdict(float)
+        for term in WORD.findall((query or "").lower()):
+            i = bisect.bisect_left(self._vocabulary, term)
+            while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+                in_title, in_overview = self._words[self._vocabulary[i]]
+                for movie_id in in_title:
+                    scores[movie_id] += 2.0
+                for movie_id in in_overview:
+                    scores[movie_id] += 1.0
+                i += 1
+
+        ranked = sorted(
+            ((score + (self.movies[m]["vote_average"] or 0) * 0.03, m) for m, score in scores.items()),
+            key=lambda item: (-item[0], item[1]),
+        )[:limit]
+        movies = self._project([m for _, m in ranked], projection)
+        return list(zip(movies, [score for score, _ in ranked]))
+
+    def search_movies(self, query, limit=5, projection=None):
+        return [movie for movie, _ in self.search_movies_scored(query, limit, projection)]
+
+    def movies_by_ids(self, movie_ids, projection=None):
+        return self._project(movie_ids, projection)
+
+    def movie_properties(self, batch=5000):
+        movie_ids = sorted(self.movies)
+        for i in range(0, len(movie_ids), batch):
+            yield [dict(self.movies[m]) for m in movie_ids[i:i + batch]]
+
+    @lru_cache(maxsize=4096)
+    def _similar(self, movie_id, limit):
+        """Movies sharing the most genres, then the most popular."""
+        shared = defaultdict(int)
+        for genre in self.genres_of.get(movie_id, ()):
+            for other in self.genres[genre]:
+                if other != movie_id:
+                    shared[other] += 1
+        ranked = sorted(
+            shared.items(), key=lambda item: (-item[1], -(self.movies[item[0]]["popularity"] or 0), item[0])
+        )[:limit]
+        return tuple((other, count / max(len(self.genres_of[movie_id]), 1)) for other, count in ranked)
+
+    def similarity_edges(self, batch=2000):
+        movie_ids = sorted(self.movies)
+        for i in range(0, len(movie_ids), batch):
+            rows = []
+            for movie_id in movie_ids[i:i + batch]:
+                edges = self._similar(movie_id, 20)
+                if edges:
+                    rows.append((movie_id, [e[0] for e in edges], [e[1] for e in edges]))
+            yield rows
+
+    def similar_movies(self, movie_id, limit=10, projection=None):
+        return self._project([other for other, _ in self._similar(movie_id, limit)], projection)
+
+    def search_and_recommend(self, query, search_limit=5, rec_limit=10, projection=None):
+        if not query:
+            return [], []
+        scored = self.search_movies_scored(query, search_limit)
+        seeds = {movie["movie_id"]: score for movie, score in scored}
+        return self._project(list(seeds), projection), self.recommend(seeds, rec_limit, projection)
+
+    def recommend(self, seeds, limit=10, projection=None):
+        totals = defaultdict(float)
+        for seed, seed_score in seeds.items():
+            for other, similarity in self._similar(seed, 20):
+                if other not in seeds:
+                    totals[other] += seed_score * similarity
+        recs = sorted(
+            totals, key=lambda m: (-totals[m], -(self.movies[m]["popularity"] or 0), m)
+        )[:limit]
+        return self._project(recs, projection)
+
+
+class MemoryCatalogRepository:
+    """MemoryCatalog behind the CatalogRepository interface, with a simulated round trip."""
+
+    def __init__(self, catalog: MemoryCatalog, latency=0.0):
+        self.catalog = catalog
+        self.latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self.catalog, name)
+        if not callable(attr):
+            return attr
+
+        def query(*args, **kwargs):
+            with timed_query(name) as timer:
+                if self.latency:
+                    time.sleep(self.latency)
+                result = attr(*args, **kwargs)
+                timer["rows"] = result_rows(result)
+            return result
+        return query
+
+
+class AsyncMemoryCatalogRepository:
+    """MemoryCatalog behind the AsyncCatalogRepository interface."""
+
+    def __init__(self, catalog: MemoryCatalog, latency=0.0):
+        self.catalog = catalog
+        self.latency = latency
+
+    def __getattr__(self, name):
+        attr = getattr(self.catalog, name)
+        if not callable(attr):
+            return attr
+
+        async def query(*args, **kwargs):
+            with timed_query(name) as timer:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                result = attr(*args, **kwargs)
+                timer["rows"] = result_rows(result)
+            return result
+        return query
+
+    async def close(self):
+        pass
@@ -1,8 +1,14 @@
 from app.routes.api.catalog_controller import catalog_api
+from app.routes.api.health_controller import health_api
+from app.routes.api.metrics_controller import metrics_api
 from app.routes.ui import ui
 from app.middleware.error_handler import register_error_handlers
+from app.middleware.instrumentation import register_instrumentation
 
 def register_blueprints(app):
     register_error_handlers(app)
+    register_instrumentation(app)
     app.register_blueprint(catalog_api)
+    app.register_blueprint(health_api)
+    app.register_blueprint(metrics_api)
     app.register_blueprint(ui)
@@ -1,37 +1,53 @@
-from flask import Blueprint, request, jsonify
-from app.utils.request_parser import parse_sections
+from flask import Blueprint, request
+from app.utils.json_response import (
+    catalog_body, json_response, search_body, sections_body, similar_body
+)
+from app.utils.request_parser import parse_cursors, parse_limit, parse_sections, parse_view
 from app.services.catalog_service import CatalogService
-from app.transformers.movie_transformer import MovieTransformer
 
 catalog_api = Blueprint("catalog", __name__, url_prefix="/api/catalog")
 
 @catalog_api.get("/")
 def get_catalog():
 
-    sections_param = request.args.get("sections")
-    sections = parse_sections(sections_param)
+    projection = parse_view(request.args.get("view"))
+    limit = parse_limit(request.args.get("limit"))
 
-    raw_nodes = CatalogService.get_catalog_sections(sections)
+    # With cursors, only the sections they continue are returned.
+    cursors = parse_cursors(request.args.get("cursors"))
+    if cursors:
+        sections = list(cursors)
+    else:
+        sections_param = request.args.get("sections")
+        sections = parse_sections(sections_param, CatalogService.available_sections())
 
-    response_data = {
-        "sections": {
-            section: [MovieTransformer.transform(node) for node in nodes]
-            for section, nodes in raw_nodes.items()
-        }
-    }
+    raw_nodes = CatalogService.get_catalog_sections(
+        sections, projection=projection, limit=limit, cursors=cursors
+    )
+
+    body = catalog_body(raw_nodes, view=projection, limit=limit, cursors=cursors)
 
-    return jsonify(response_data), 200
+    return json_response(body, 200)
+
+@catalog_api.get("/sections")
+def list_sections():
+    body = sections_body(CatalogService.available_sections())
+    return json_response(body, 200)
 
 @catalog_api.get("/search")
 def search_and_recommend():
     search_query = request.args.get("q", "")
+    projection = parse_view(request.args.get("view"))
     result = CatalogService.get_search_and_recommendations(
-        search_query=search_query
+        search_query=search_query,
+        projection=projection
     )
 
-    response_data = {
-        "search_results": [MovieTransformer.transform(node) for node in result["search_results"]],
-        "recommendations": [MovieTransformer.transform(node) for node in result["recommendations"]],
-    }
-    return jsonify(response_data), 200
+    return json_response(search_body(result), 200)
+
+@catalog_api.get("/similar/<int:movie_id>")
+def similar_movies(movie_id):
+    projection = parse_view(request.args.get("view"))
+    nodes = CatalogService.get_similar_movies(movie_id, projection=projection)
 
+    return json_response(similar_body(nodes), 200)
@@ -0,0 +1,9 @@
+from flask import Blueprint, jsonify
+
+from app.services.health_service import HealthService
+
+health_api = Blueprint("health", __name__, url_prefix="/api/health")
+
+@health_api.get("/")
+def health():
+    return jsonify(HealthService.status()), 200
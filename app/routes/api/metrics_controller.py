@@ -0,0 +1,9 @@
+from flask import Blueprint, jsonify
+
+from app.utils.metrics import metrics
+
+metrics_api = Blueprint("metrics", __name__, url_prefix="/api/metrics")
+
+@metrics_api.get("/")
+def get_metrics():
+    return jsonify(metrics.snapshot()), 200
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+
+from app.constants.catalogs import SECTION_CACHE_TTLS, SECTION_PAGE_SIZE
+from app.repositories.backend import catalog_backend
+from app.repositories.catalog_snapshot import catalog_snapshot
+from app.services import catalog_service
+from app.services.catalog_service import (
+    SECTION_INDEX_KEY, load_section_index, project, section_cache, section_cache_key,
+    section_index, section_loader, split_movies,
+)
+from app.services.search_engine import search_engine
+from app.services.similarity_engine import similarity_engine
+from app.transformers.movie_transformer import MovieTransformer
+from app.utils.ttl_cache import MISSING
+
+logger = logging.getLogger(__name__)
+
+# Cache key -> task loading it, so concurrent misses share one query.
+_inflight: dict = {}
+
+
+async def cached(key, load, ttl=None, fallback=None):
+    """
+    Reads ``key`` from the shared section cache, awaiting ``load()`` on a
+    miss. A stale entry is returned at once and refreshed in the cache's
+    background thread with ``fallback``, the blocking loader.
+    """
+    value = section_cache.peek(key, fallback, ttl=ttl)
+    if value is not MISSING:
+        return value
+
+    task = _inflight.get(key)
+    if task is None:
+        task = _inflight[key] = asyncio.ensure_future(_load(key, load, ttl))
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded: a caller that times out does not cancel the others' load.
+    return await asyncio.shield(task)
+
+
+async def _load(key, load, ttl):
+    generation = section_cache.generation
+    value = await load()
+    section_cache.put(key, value, ttl=ttl, generation=generation)
+    return value
+
+
+async def movies_by_ids(movie_ids, projection=None):
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        return project(snapshot.movies(movie_ids), projection)
+    return await catalog_backend.async_repository.movies_by_ids(movie_ids, projection=projection)
+
+
+async def load_section(key, projection=None, limit=SECTION_PAGE_SIZE):
+    repository = catalog_backend.async_repository
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        movie_ids = await repository.stored_section_ids(key, limit=limit)
+        if movie_ids is not None:
+            return project(snapshot.movies(movie_ids), projection)
+    return await repository.get_section(key, projection=projection, limit=limit)
+
+
+async def load_section_index_async():
+    return section_index(await catalog_backend.async_repository.section_lists())
+
+
+class AsyncCatalogService:
+    """
+    CatalogService for the ASGI app: the same results and the same section
+    cache, with every query awaited on the async repository.
+    """
+
+    @staticmethod
+    async def available_sections():
+        return await cached(SECTION_INDEX_KEY, load_section_index_async, fallback=load_section_index)
+
+    @staticmethod
+    async def get_catalog_sections(sections: list[str], projection=None, limit=SECTION_PAGE_SIZE,
+                                   cursors=None):
+        """
+        See CatalogService.get_catalog_sections. Every section missing from
+        the cache is awaited at once; one still loading after
+        SECTION_FETCH_TIMEOUT seconds is left out of the response.
+        """
+        cursors = cursors or {}
+        keys = [name.strip() for name in sections]
+        available = await AsyncCatalogService.available_sections()
+        keys = [key for key in dict.fromkeys(keys) if key in available]
+
+        repository = catalog_backend.async_repository
+        tasks = {}
+        for key in keys:
+            if key in cursors:
+                coro = repository.section_page(key, cursors[key], limit, projection)
+            else:
+                coro = cached(
+                    section_cache_key(key, projection, limit),
+                    lambda key=key: load_section(key, projection, limit),
+                    ttl=SECTION_CACHE_TTLS.get(key),
+                    fallback=section_loader(key, projection, limit),
+                )
+            tasks[key] = asyncio.ensure_future(coro)
+
+        result = {}
+        if tasks:
+            done, late = await asyncio.wait(tasks.values(), timeout=catalog_service.section_timeout)
+            for task in late:
+                task.cancel()
+            if late:
+                logger.warning(
+                    "Catalog sections %s timed out after %ss; returning partial results",
+                    ", ".join(key for key, task in tasks.items() if task in late),
+                    catalog_service.section_timeout,
+                )
+            result = {key: task.result() for key, task in tasks.items() if task in done}
+
+        return {key: result[key] for key in keys if result.get(key) is not None}
+
+    @staticmethod
+    async def get_search_and_recommendations(search_query: str, search_limit: int = 5,
+                                             rec_limit: int = 10, projection=None):
+        """See CatalogService.get_search_and_recommendations."""
+        repository = catalog_backend.async_repository
+        search_index = search_engine.current()
+        index = similarity_engine.current()
+        if search_index is not None:
+            seeds = dict(search_index.search(search_query, limit=search_limit))
+            if index is not None:
+                rec_ids = index.recommend(seeds, limit=rec_limit)
+                search_results, recommendations = split_movies(
+                    await movies_by_ids(list(seeds) + rec_ids, projection), seeds, rec_ids
+                )
+            else:
+                search_results = await movies_by_ids(list(seeds), projection)
+                recommendations = await repository.recommend(seeds, limit=rec_limit, projection=projection)
+        elif index is not None:
+            scored = await repository.search_movies_scored(
+                search_query, limit=search_limit, projection=projection
+            )
+            search_results = [movie for movie, _ in scored]
+            rec_ids = index.recommend(
+                {MovieTransformer.movie_id(movie): score for movie, score in scored}, limit=rec_limit
+            )
+            recommendations = await movies_by_ids(rec_ids, projection)
+        else:
+            search_results, recommendations = await repository.search_and_recommend(
+                search_query, search_limit=search_limit, rec_limit=rec_limit, projection=projection
+            )
+
+        if not search_results:
+            return {
+                "search_results": [],
+                "recommendations": await repository.popular(limit=rec_limit, projection=projection)
+            }
+
+        return {
+            "search_results": search_results,
+            "recommendations": recommendations
+        }
@@ -1,39 +1,248 @@
-from app.repositories.catalog_repository import CatalogRepository
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
+from functools import partial
+
+from app.constants.catalogs import SECTION_CACHE_TTLS, SECTION_PAGE_SIZE
+from app.repositories.backend import catalog_backend
+from app.repositories.catalog_snapshot import catalog_snapshot
+from app.services.search_engine import search_engine
+from app.services.similarity_engine import similarity_engine
+from app.transformers.movie_transformer import MovieTransformer
+from app.utils.ttl_cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Shared by every request in the process; configured by init_section_cache.
+section_cache = TTLCache()
+
+# Sections missing from the cache are fetched concurrently on this pool.
+# Without it (create_app not run) they are fetched one after another.
+section_pool = None
+section_timeout = None
+
+# Cache key of the { name: title } map of available sections.
+SECTION_INDEX_KEY = ("section-index",)
+
+
+def init_section_cache(app):
+    global section_pool, section_timeout
+
+    section_cache.configure(
+        enabled=app.config["SECTION_CACHE_ENABLED"],
+        ttl=app.config["SECTION_CACHE_TTL"],
+        stale_ttl=app.config["SECTION_CACHE_STALE_TTL"],
+        max_entries=app.config["SECTION_CACHE_MAX_ENTRIES"],
+    )
+    if app.config["SECTION_CACHE_VERSION_CHECK"] > 0:
+        section_cache.watch_version(
+            lambda: catalog_backend.repository.catalog_version(),
+            app.config["SECTION_CACHE_VERSION_CHECK"],
+        )
+
+    if section_pool is None:
+        section_pool = ThreadPoolExecutor(
+            max_workers=app.config["SECTION_FETCH_WORKERS"], thread_name_prefix="catalog-section"
+        )
+    section_timeout = app.config["SECTION_FETCH_TIMEOUT"] or None
+
+
+def project(movies, projection):
+    """Snapshot rows as projection records (or as they are, without one)."""
+    if projection is None:
+        return movies
+    return [projection.from_properties(movie) for movie in movies]
+
+
+def movies_by_ids(movie_ids, projection=None):
+    """Movies in ``movie_ids`` order, from the catalog snapshot when mapped."""
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        return project(snapshot.movies(movie_ids), projection)
+    return catalog_backend.repository.movies_by_ids(movie_ids, projection=projection)
+
+
+def split_movies(movies, *id_lists):
+    """Splits one movies_by_ids result back into the id lists it was fetched for."""
+    by_id = {MovieTransformer.movie_id(movie): movie for movie in movies}
+    return [[by_id[movie_id] for movie_id in ids if movie_id in by_id] for ids in id_lists]
+
+
+def load_section(key, projection=None, limit=SECTION_PAGE_SIZE):
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        movie_ids = catalog_backend.repository.stored_section_ids(key, limit=limit)
+        if movie_ids is not None:
+            return project(snapshot.movies(movie_ids), projection)
+    return catalog_backend.repository.get_section(key, projection=projection, limit=limit)
+
+
+def section_loader(key, projection=None, limit=SECTION_PAGE_SIZE):
+    return lambda: load_section(key, projection, limit)
+
+
+def section_cache_key(key, projection=None, limit=SECTION_PAGE_SIZE):
+    parts = (key,)
+    if projection is not None:
+        parts += (projection.__name__,)
+    if limit != SECTION_PAGE_SIZE:
+        parts += (limit,)
+    return key if len(parts) == 1 else parts
+
+
+def section_index(stored):
+    """Stored section lists ({ name: title }), then the live-only sections."""
+    live = {name: name for name in catalog_backend.repository.SECTION_MAPPINGS if name not in stored}
+    return {**stored, **live}
+
+
+def load_section_index():
+    return section_index(catalog_backend.repository.section_lists())
+
 
 class CatalogService:
 
     @staticmethod
-    def get_catalog_sections(sections: list[str]):
+    def available_sections():
         """
-        Returns Neo4j nodes grouped by section.
+        Returns { name: title } of every section that can be requested:
+        each precomputed section list, then the live-only sections.
         """
-        return CatalogRepository.get_sections(sections)
+        return section_cache.get(SECTION_INDEX_KEY, load_section_index)
 
     @staticmethod
-    def get_search_and_recommendations(search_query: str, search_limit: int = 5, rec_limit: int = 10):
+    def get_catalog_sections(sections: list[str], projection=None, limit=SECTION_PAGE_SIZE, cursors=None):
+        """
+        Returns Neo4j nodes (or ``projection`` records) grouped by section,
+        at most ``limit`` per section.
+
+        First pages are read through the process-wide section cache. A
+        section in ``cursors`` ({ section: last movie_id seen }) returns the
+        page after that movie instead, straight from a keyset query.
+
+        Cache misses and later pages are fetched concurrently. A section
+        still loading after SECTION_FETCH_TIMEOUT seconds is left out of the
+        response; a first page keeps loading into the cache for later requests.
+        """
+        cursors = cursors or {}
+        keys = [name.strip() for name in sections]
+        available = CatalogService.available_sections()
+        keys = [key for key in dict.fromkeys(keys) if key in available]
+
+        result = {}
+        pending = {}
+        for key in keys:
+            if key in cursors:
+                page = partial(
+                    catalog_backend.repository.section_page, key, cursors[key], limit, projection
+                )
+                if section_pool is None:
+                    result[key] = page()
+                else:
+                    pending[key] = section_pool.submit(copy_context().run, page)
+                continue
+
+            cache_key = section_cache_key(key, projection, limit)
+            loader = section_loader(key, projection, limit)
+            ttl = SECTION_CACHE_TTLS.get(key)
+            value = section_cache.peek(cache_key, loader, ttl=ttl)
+            if value is not MISSING:
+                result[key] = value
+            elif section_pool is None:
+                result[key] = section_cache.get(cache_key, loader, ttl=ttl)
+            else:
+                # In the request's context, so its queries count towards it.
+                pending[key] = section_pool.submit(
+                    copy_context().run, section_cache.get, cache_key, loader, ttl
+                )
+
+        if pending:
+            wait(pending.values(), timeout=section_timeout)
+            late = []
+            for key, future in pending.items():
+                if future.done():
+                    result[key] = future.result()
+                else:
+                    future.cancel()
+                    late.append(key)
+            if late:
+                logger.warning(
+                    "Catalog sections %s timed out after %ss; returning partial results",
+                    ", ".join(late), section_timeout,
+                )
+
+        return {key: result[key] for key in keys if result.get(key) is not None}
+
+    @staticmethod
+    def get_search_and_recommendations(search_query: str, search_limit: int = 5, rec_limit: int = 10,
+                                       projection=None):
         """
         Args:
             search_query (str): The text the user entered.
             search_limit (int): Max number of direct search results.
             rec_limit (int): Max number of recommendations.
+            projection (type): Optional MovieProjection to return instead of nodes.
             
         Returns:
             dict: Dictionary containing 'search_results' and 'recommendations'.
         """
-        
-        search_results, recommendations = CatalogRepository.search_and_recommend(
-            query=search_query,
-            search_limit=search_limit,
-            rec_limit=rec_limit
-        )
+        search_index = search_engine.current()
+        index = similarity_engine.current()
+        if search_index is not None:
+            # Seeds from the in-process index, so only movies (and maybe
+            # neighbours) are fetched.
+            seeds = dict(search_index.search(search_query, limit=search_limit))
+            if index is not None:
+                rec_ids = index.recommend(seeds, limit=rec_limit)
+                search_results, recommendations = split_movies(
+                    movies_by_ids(list(seeds) + rec_ids, projection), seeds, rec_ids
+                )
+            else:
+                search_results = movies_by_ids(list(seeds), projection)
+                recommendations = catalog_backend.repository.recommend(
+                    seeds, limit=rec_limit, projection=projection
+                )
+        elif index is not None:
+            # Seeds from the full-text index, neighbours from memory.
+            scored = catalog_backend.repository.search_movies_scored(
+                search_query, limit=search_limit, projection=projection
+            )
+            search_results = [movie for movie, _ in scored]
+            rec_ids = index.recommend(
+                {MovieTransformer.movie_id(movie): score for movie, score in scored}, limit=rec_limit
+            )
+            recommendations = movies_by_ids(rec_ids, projection)
+        else:
+            search_results, recommendations = catalog_backend.repository.search_and_recommend(
+                query=search_query,
+                search_limit=search_limit,
+                rec_limit=rec_limit,
+                projection=projection
+            )
 
         if not search_results:
             return {
                 "search_results": [],
-                "recommendations": CatalogRepository.popular(limit=rec_limit)
+                "recommendations": catalog_backend.repository.popular(limit=rec_limit, projection=projection)
             }
 
         return {
             "search_results": search_results,
             "recommendations": recommendations
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def get_similar_movies(movie_id: int, limit: int = 10, projection=None):
+        """
+        Args:
+            movie_id (int): The movie to find neighbours for.
+            limit (int): Max number of similar movies.
+            projection (type): Optional MovieProjection to return instead of nodes.
+
+        Returns:
+            list: Movie nodes, most similar first.
+        """
+        index = similarity_engine.current()
+        if index is None:
+            return catalog_backend.repository.similar_movies(movie_id, limit=limit, projection=projection)
+        return movies_by_ids(index.similar(movie_id, limit=limit), projection)
@@ -0,0 +1,26 @@
+from app.repositories.backend import catalog_backend
+from db.neo4j.driver import neo4j_driver
+
+
+class HealthService:
+
+    @staticmethod
+    def status():
+        """
+        The catalog backend and, on Neo4j, the state of each driver's
+        connection pool (the async one once the ASGI app has used it).
+
+        Returns:
+            dict: { status, backend, pools: { sync, async } }; a pool is
+            ``saturated`` while every connection is in use.
+        """
+        pools = {}
+        if catalog_backend.name == "neo4j":
+            pools["sync"] = neo4j_driver.state()
+            if catalog_backend.async_repository is not None:
+                pools["async"] = catalog_backend.async_repository.pool_state()
+        for pool in pools.values():
+            if pool is not None:
+                pool["saturated"] = pool["in_use"] >= pool["max_size"]
+
+        return {"status": "ok", "backend": catalog_backend.name, "pools": pools}
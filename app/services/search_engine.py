@@ -0,0 +1,231 @@
+import logging
+import math
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+
+from app.repositories.backend import catalog_backend
+from app.repositories.catalog_snapshot import catalog_snapshot
+from app.utils.reloader import BackgroundReloader
+
+logger = logging.getLogger(__name__)
+
+# Movies fetched per query while loading from the graph.
+LOAD_BATCH = 5000
+
+# Lucene's BM25 defaults.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Same boost as the movieSearch query: score + vote_average * 0.03.
+VOTE_BOOST = 0.03
+
+# Words the last query word completes to that are scored, most frequent first.
+MAX_EXPANSIONS = 64
+MAX_QUERY_TERMS = 16
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return WORD.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """
+    Inverted index of every movie's title and overview, scored like the
+    movieSearch full-text index: BM25 per field, summed, plus
+    ``vote_average * 0.03``.
+
+    * ``terms``: the sorted vocabulary. The words a prefix completes to are
+      one contiguous range of it, found by binary search, which is the
+      prefix structure typeahead needs;
+    * ``offsets[t]:offsets[t + 1]``: term t's slice of the postings below;
+    * ``rows`` / ``weights``: the movies (row numbers) holding each term and
+      the term's precomputed BM25 weight in each, title and overview summed;
+    * ``movie_ids`` / ``boosts``: movie id and vote boost of every row,
+      rows being in movie_id order.
+
+    No query word is required: as with `word word*` in Lucene, a movie
+    matching any of them is a hit. The last word also matches every word it
+    prefixes, scoring the best of them, so "incep" finds Inception while
+    the user types.
+    """
+
+    def __init__(self, movie_ids, boosts, terms, offsets, rows, weights, version=None):
+        self.movie_ids = movie_ids
+        self.boosts = boosts
+        self.terms = terms
+        self.offsets = offsets
+        self.rows = rows
+        self.weights = weights
+        self.version = version
+        self.term_of = {term: i for i, term in enumerate(terms)}
+        self.doc_freqs = np.diff(offsets)
+
+    @classmethod
+    def build(cls, movie_ids, titles, overviews, vote_averages, version=None):
+        """Builds the index from parallel per-movie lists."""
+        order = sorted(range(len(movie_ids)), key=movie_ids.__getitem__)
+        movie_ids, titles, overviews, vote_averages = (
+            [values[i] for i in order] for values in (movie_ids, titles, overviews, vote_averages)
+        )
+        count = len(movie_ids)
+        postings = {}
+        for texts in (titles, overviews):
+            counts = [Counter(tokenize(text)) for text in texts]
+            lengths = [sum(c.values()) for c in counts]
+            average = (sum(lengths) / count) if count and sum(lengths) else 1.0
+            doc_freq = Counter(term for c in counts for term in c)
+            idf = {
+                term: math.log(1 + (count - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()
+            }
+            for row, (c, length) in enumerate(zip(counts, lengths)):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+                for term, tf in c.items():
+                    term_postings = postings.setdefault(term, {})
+                    term_postings[row] = term_postings.get(row, 0.0) + idf[term] * tf / (tf + norm)
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(postings[term]) for term in terms], out=offsets[1:])
+        rows = np.fromiter(
+            (row for term in terms for row in postings[term]), dtype=np.int32, count=offsets[-1]
+        )
+        weights = np.fromiter(
+            (w for term in terms for w in postings[term].values()), dtype=np.float32, count=offsets[-1]
+        )
+        boosts = np.array([(v or 0.0) * VOTE_BOOST for v in vote_averages], dtype=np.float64)
+        return cls(np.asarray(movie_ids, dtype=np.int64), boosts, terms, offsets, rows, weights, version)
+
+    @property
+    def nbytes(self):
+        return self.movie_ids.nbytes + self.boosts.nbytes + self.offsets.nbytes + self.rows.nbytes \
+            + self.weights.nbytes
+
+    def completions(self, prefix):
+        """
+        Postings (rows, weights) of the words ``prefix`` completes to, the
+        MAX_EXPANSIONS most frequent ones when there are more.
+        """
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + "\U0010ffff", start)
+        if end - start <= MAX_EXPANSIONS:
+            # Neighbouring terms' postings are contiguous.
+            span = slice(self.offsets[start], self.offsets[end])
+            return self.rows[span], self.weights[span]
+        found = start + np.argpartition(-self.doc_freqs[start:end], MAX_EXPANSIONS)[:MAX_EXPANSIONS]
+        spans = [slice(self.offsets[term], self.offsets[term + 1]) for term in found]
+        return (
+            np.concatenate([self.rows[span] for span in spans]),
+            np.concatenate([self.weights[span] for span in spans]),
+        )
+
+    def search(self, query: str, limit=5):
+        """
+        Returns the best ``limit`` (movie id, score) pairs for ``query``,
+        best first; ties go to the lower movie id.
+        """
+        words = tokenize(query)[:MAX_QUERY_TERMS]
+        if not words:
+            return []
+
+        scores = np.zeros(len(self.movie_ids), dtype=np.float64)
+        for word in words[:-1]:
+            term = self.term_of.get(word)
+            if term is not None:
+                start, end = self.offsets[term], self.offsets[term + 1]
+                scores[self.rows[start:end]] += self.weights[start:end]
+
+        # float32 like the weights: ufunc.at is only fast without casting.
+        best = np.zeros(len(self.movie_ids), dtype=np.float32)
+        np.maximum.at(best, *self.completions(words[-1]))
+        scores += best
+
+        hits = np.flatnonzero(scores)
+        if not len(hits):
+            return []
+        ranked = scores[hits] + self.boosts[hits]
+        if len(hits) > limit:
+            # Everything above the limit-th score, then the lowest rows
+            # (movie ids) among those tied with it.
+            kth = np.partition(ranked, len(ranked) - limit)[len(ranked) - limit]
+            above = np.flatnonzero(ranked > kth)
+            top = np.concatenate([above, np.flatnonzero(ranked == kth)[:limit - len(above)]])
+            hits, ranked = hits[top], ranked[top]
+        order = np.lexsort((hits, -ranked))
+        return [(int(self.movie_ids[hits[i]]), float(ranked[i])) for i in order]
+
+
+class SearchEngine:
+    """
+    Holds the current SearchIndex and swaps in a new one, built in a
+    background thread, whenever the catalog version stamp changes. The
+    index is built from the catalog snapshot when one is mapped, else from
+    the graph. Searches never wait for a build; ``index`` is None until the
+    first one has finished.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.version_check = 60
+        self.index = None
+        self._reloader = BackgroundReloader(
+            self._reload, name="search-engine", description="Building the search index", interval=self.version_check
+        )
+
+    def configure(self, enabled, version_check):
+        self.enabled = enabled
+        self.version_check = version_check
+        self._reloader.interval = version_check
+
+    def current(self):
+        """Returns the built index, or None while disabled or building."""
+        if not self.enabled:
+            return None
+        self._reloader.poke()
+        return self.index
+
+    def start(self):
+        """Builds the first index in the background."""
+        self._reloader.run_soon()
+
+    def _reload(self):
+        version = catalog_backend.repository.catalog_version()
+        if self.index is not None and version == self.index.version:
+            return
+
+        started = time.perf_counter()
+        snapshot = catalog_snapshot.current()
+        if snapshot is not None:
+            columns = [snapshot.column(name) for name in ("movie_id", "title", "overview", "vote_average")]
+            source = "snapshot"
+        else:
+            rows = [row for batch in catalog_backend.repository.movie_properties(batch=LOAD_BATCH)
+                    for row in batch]
+            columns = [[row.get(name) for row in rows]
+                       for name in ("movie_id", "title", "overview", "vote_average")]
+            source = "graph"
+
+        index = SearchIndex.build(*columns, version=version)
+        self.index = index
+        logger.info(
+            "Built the search index of %d movies, %d terms (%.1f MB) from the %s in %.2fs",
+            len(index.movie_ids), len(index.terms), index.nbytes / 2**20, source,
+            time.perf_counter() - started,
+        )
+
+
+search_engine = SearchEngine()
+
+
+def init_search_engine(app):
+    search_engine.configure(
+        enabled=app.config["SEARCH_ENGINE_ENABLED"],
+        version_check=app.config["SEARCH_ENGINE_VERSION_CHECK"],
+    )
+    if search_engine.enabled:
+        search_engine.start()
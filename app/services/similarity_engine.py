@@ -0,0 +1,171 @@
+import heapq
+import logging
+from operator import itemgetter
+import time
+
+import numpy as np
+
+from app.repositories.backend import catalog_backend
+from app.utils.reloader import BackgroundReloader
+
+logger = logging.getLogger(__name__)
+
+# Source movies fetched per query while loading SIMILAR_TO edges.
+LOAD_BATCH = 2000
+
+
+class SimilarityIndex:
+    """
+    Every SIMILAR_TO edge as a read-only CSR adjacency list:
+
+    * ``movie_ids[row]``: movie id of every row (sorted),
+    * ``offsets[row]:offsets[row + 1]``: the row's slice of the arrays below,
+    * ``neighbours``: row numbers of the targets, best score first,
+    * ``scores``: float32 similarity of each edge,
+    * ``row_of``: movie id -> row.
+    """
+
+    def __init__(self, movie_ids, offsets, neighbours, scores, version=None):
+        self.movie_ids = movie_ids
+        self.offsets = offsets
+        self.neighbours = neighbours
+        self.scores = scores
+        self.version = version
+        self.row_of = dict(zip(movie_ids.tolist(), range(len(movie_ids))))
+
+    @classmethod
+    def from_edges(cls, sources, targets, scores, version=None):
+        """Builds the index from parallel edge arrays in any order."""
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        scores = np.asarray(scores, dtype=np.float32)
+
+        movie_ids = np.unique(np.concatenate([sources, targets]))
+        source_rows = np.searchsorted(movie_ids, sources)
+        target_rows = np.searchsorted(movie_ids, targets)
+
+        # By source row, then best score first.
+        order = np.lexsort((-scores, source_rows))
+        offsets = np.zeros(len(movie_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source_rows, minlength=len(movie_ids)), out=offsets[1:])
+
+        return cls(
+            movie_ids, offsets, target_rows[order].astype(np.int32), scores[order], version
+        )
+
+    @property
+    def edges(self):
+        return len(self.neighbours)
+
+    @property
+    def nbytes(self):
+        return self.movie_ids.nbytes + self.offsets.nbytes + self.neighbours.nbytes + self.scores.nbytes
+
+    def similar(self, movie_id: int, limit=10):
+        """Returns the ids of the ``limit`` most similar movies, best first."""
+        row = self.row_of.get(movie_id)
+        if row is None:
+            return []
+        start = self.offsets[row]
+        end = min(self.offsets[row + 1], start + limit)
+        return self.movie_ids[self.neighbours[start:end]].tolist()
+
+    def recommend(self, seeds: dict[int, float], limit=10):
+        """
+        Merges the neighbours of several seeds, scoring each candidate as
+        sum(seed weight * similarity). Seeds themselves are never returned.
+
+        Args:
+            seeds (dict): Seed movie id -> weight.
+            limit (int): Max number of ids returned.
+
+        Returns:
+            list: Movie ids, best first.
+        """
+        # A few hundred candidates at most: a dict beats numpy set operations.
+        totals = {}
+        for movie_id, weight in seeds.items():
+            row = self.row_of.get(movie_id)
+            if row is None:
+                continue
+            start, end = self.offsets[row], self.offsets[row + 1]
+            for neighbour, score in zip(
+                self.neighbours[start:end].tolist(), self.scores[start:end].tolist()
+            ):
+                totals[neighbour] = totals.get(neighbour, 0.0) + weight * score
+
+        best = heapq.nlargest(
+            limit + len(seeds), totals.items(), key=itemgetter(1)
+        )
+        ids = [int(self.movie_ids[row]) for row, _ in best]
+        return [movie_id for movie_id in ids if movie_id not in seeds][:limit]
+
+
+class SimilarityEngine:
+    """
+    Holds the current SimilarityIndex and swaps in a new one, loaded in a
+    background thread, whenever the catalog version stamp changes.
+    Lookups never wait for a load; ``index`` is None until the first one
+    has finished.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.version_check = 60
+        self.index = None
+        self._reloader = BackgroundReloader(
+            self._reload, name="similarity-engine", description="Loading the similarity index", interval=self.version_check
+        )
+
+    def configure(self, enabled, version_check):
+        self.enabled = enabled
+        self.version_check = version_check
+        self._reloader.interval = version_check
+
+    def current(self):
+        """Returns the loaded index, or None while disabled or loading."""
+        if not self.enabled:
+            return None
+        self._reloader.poke()
+        return self.index
+
+    def start(self):
+        """Loads the first index in the background."""
+        self._reloader.run_soon()
+
+    def _reload(self):
+        version = catalog_backend.repository.catalog_version()
+        if self.index is not None and version == self.index.version:
+            return
+
+        started = time.perf_counter()
+        sources, targets, scores = [], [], []
+        for batch in catalog_backend.repository.similarity_edges(batch=LOAD_BATCH):
+            for source, neighbour_ids, neighbour_scores in batch:
+                sources.append(np.full(len(neighbour_ids), source, dtype=np.int64))
+                targets.append(np.asarray(neighbour_ids, dtype=np.int64))
+                scores.append(np.asarray(neighbour_scores, dtype=np.float32))
+
+        if sources:
+            index = SimilarityIndex.from_edges(
+                np.concatenate(sources), np.concatenate(targets), np.concatenate(scores), version
+            )
+        else:
+            index = SimilarityIndex.from_edges([], [], [], version)
+        self.index = index
+        logger.info(
+            "Loaded %d SIMILAR_TO edges (%.1f MB) in %.2fs",
+            index.edges, index.nbytes / 2**20, time.perf_counter() - started,
+        )
+
+
+similarity_engine = SimilarityEngine()
+
+
+def init_similarity_engine(app):
+    similarity_engine.configure(
+        enabled=app.config["SIMILARITY_ENGINE_ENABLED"],
+        version_check=app.config["SIMILARITY_ENGINE_VERSION_CHECK"],
+    )
+    if similarity_engine.enabled:
+        similarity_engine.start()
@@ -70,10 +70,50 @@ function verifyPosters() {
 }
 
 
+/******************************************************
+ *  LOAD MORE (KEYSET CURSORS)
+ ******************************************************/
+const sectionCursors = {};  // section -> cursor of its next page, from /api/catalog
+
+function loadMoreButton(name, cursor) {
+    sectionCursors[name] = cursor;
+    if (!cursor) return "";
+    return `<button id="more-${name}" class="load-more" onclick="loadMore('${name}')">Load more</button>`;
+}
+
+async function loadMore(name) {
+    const button = document.getElementById(`more-${name}`);
+    const cursor = sectionCursors[name];
+    if (!cursor || button.disabled) return;
+    button.disabled = true;
+
+    try {
+        const res = await fetch(`/api/catalog?cursors=${cursor}&view=card`);
+        const data = await res.json();
+        const movies = data.sections[name] || [];
+
+        document.getElementById(button.dataset.grid).insertAdjacentHTML(
+            "beforeend", movies.map(movieCard).join("")
+        );
+        verifyPosters();
+
+        sectionCursors[name] = data.cursors[name] || null;
+    } catch (err) {
+        console.error("Error loading more of " + name, err);
+    }
+
+    if (sectionCursors[name]) {
+        button.disabled = false;
+    } else {
+        button.remove();
+    }
+}
+
+
 /******************************************************
  *  HOMEPAGE LOADING (DYNAMIC + CONDITIONAL)
  ******************************************************/
-function renderHomeSections(sections) {
+function renderHomeSections(sections, cursors = {}) {
     const container = document.getElementById("dynamic-sections");
     container.innerHTML = ""; // reset
 
@@ -87,10 +127,13 @@ function renderHomeSections(sections) {
                 <div id="section-${name}" class="movie-grid">
                     ${movies.map(movieCard).join("")}
                 </div>
+                ${loadMoreButton(name, cursors[name])}
             </div>
         `;
 
         container.insertAdjacentHTML("beforeend", sectionHtml);
+        const button = document.getElementById(`more-${name}`);
+        if (button) button.dataset.grid = `section-${name}`;
     });
 
     verifyPosters();
@@ -105,14 +148,14 @@ async function loadHomeSections() {
     const loading = document.getElementById("loading-placeholder");
 
     try {
-        const res = await fetch(`/api/catalog?sections=`);
+        const res = await fetch(`/api/catalog?sections=&view=card`);
         const data = await res.json();
 
         // hide loading skeleton
         loading.style.display = "none";
 
         // render dynamic sections
-        renderHomeSections(data.sections);
+        renderHomeSections(data.sections, data.cursors);
 
         // cache it
         sessionStorage.setItem("homepage_sections_cache", JSON.stringify(data.sections));
@@ -163,7 +206,7 @@ async function loadSearchResults(query) {
         return;
     }
 
-    const res = await fetch(`/api/catalog/search?q=${query}`);
+    const res = await fetch(`/api/catalog/search?q=${query}&view=card`);
     const data = await res.json();
 
     sessionStorage.setItem(cacheKey, JSON.stringify(data));
@@ -175,46 +218,63 @@ async function loadSearchResults(query) {
 /******************************************************
  *  DYNAMIC LAZY-SECTIONS (Action, Comedy, Drama…)
  ******************************************************/
-const dynamicSections = ["action", "comedy", "drama"];
+const homeSections = ["popular", "trending", "topRated"];
+let dynamicSections = null;  // [{name, title}], from /api/catalog/sections
 let nextSectionIndex = 0;
 let loadingMore = false;
 
+async function loadSectionIndex() {
+    try {
+        const res = await fetch(`/api/catalog/sections`);
+        const data = await res.json();
+        return data.sections.filter(s => !homeSections.includes(s.name));
+    } catch (err) {
+        console.error("Error loading section list", err);
+        return ["action", "comedy", "drama"].map(name => ({ name, title: name }));
+    }
+}
+
 async function loadNextSection() {
     if (loadingMore) return;
-    if (nextSectionIndex >= dynamicSections.length) return;
-
     loadingMore = true;
 
-    const section = dynamicSections[nextSectionIndex++];
+    if (dynamicSections === null) {
+        dynamicSections = await loadSectionIndex();
+    }
+    if (nextSectionIndex >= dynamicSections.length) {
+        loadingMore = false;
+        return;
+    }
+
+    const { name: section, title } = dynamicSections[nextSectionIndex++];
     const container = document.getElementById("dynamic-sections");
 
     const sectionHtml = `
         <div class="section-block">
-            <h2 class="section-title">${section}</h2>
+            <h2 class="section-title">${title}</h2>
             <div id="dynamic-${section}" class="movie-grid"></div>
         </div>
     `;
     container.insertAdjacentHTML("beforeend", sectionHtml);
 
     const cacheKey = "section_cache_" + section;
+    let page = JSON.parse(sessionStorage.getItem(cacheKey));
 
-    if (sessionStorage.getItem(cacheKey)) {
-        const movies = JSON.parse(sessionStorage.getItem(cacheKey));
-        document.getElementById(`dynamic-${section}`).innerHTML =
-            movies.map(movieCard).join("");
-        verifyPosters();
-        loadingMore = false;
-        return;
+    if (!page || Array.isArray(page)) {
+        const res = await fetch(`/api/catalog?sections=${section}&view=card`);
+        const data = await res.json();
+        page = {
+            movies: data.sections[section] || [],
+            cursor: (data.cursors || {})[section] || null,
+        };
+        sessionStorage.setItem(cacheKey, JSON.stringify(page));
     }
 
-    const res = await fetch(`/api/catalog?sections=${section}`);
-    const data = await res.json();
-    const movies = data.sections[section] || [];
-
-    sessionStorage.setItem(cacheKey, JSON.stringify(movies));
-
-    document.getElementById(`dynamic-${section}`).innerHTML =
-        movies.map(movieCard).join("");
+    const grid = document.getElementById(`dynamic-${section}`);
+    grid.innerHTML = page.movies.map(movieCard).join("");
+    grid.insertAdjacentHTML("afterend", loadMoreButton(section, page.cursor));
+    const button = document.getElementById(`more-${section}`);
+    if (button) button.dataset.grid = `dynamic-${section}`;
 
     verifyPosters();
     loadingMore = false;
@@ -1,8 +1,21 @@
+from app.models.projections import MovieProjection
+
+
 class MovieTransformer:
 
     @staticmethod
     def transform(node):
         if node is None:
             return None
+        if isinstance(node, MovieProjection):
+            return node.to_dict()
+        if isinstance(node, dict):
+            # Already properties, e.g. from the catalog snapshot.
+            return dict(node)
         data = dict(node.__properties__)
         return data
+
+    @staticmethod
+    def movie_id(node):
+        """movie_id of a node, projection record or property dict."""
+        return node.get("movie_id") if isinstance(node, dict) else node.movie_id
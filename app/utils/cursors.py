@@ -0,0 +1,32 @@
+import base64
+import json
+
+from app.exceptions.api_error import APIError
+from app.transformers.movie_transformer import MovieTransformer
+
+
+# A section cursor is opaque to clients: the section name and the movie_id
+# of the last movie they were sent, as unpadded URL-safe base64 JSON.
+
+def encode_cursor(section: str, movie_id: int) -> str:
+    raw = json.dumps([section, movie_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str):
+    """Returns (section, movie_id); raises APIError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        section, movie_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise APIError(f"Invalid cursor '{token}'")
+    if not isinstance(section, str) or not isinstance(movie_id, int):
+        raise APIError(f"Invalid cursor '{token}'")
+    return section, movie_id
+
+
+def next_cursor(section: str, movies: list, limit: int):
+    """Cursor of the page after ``movies``, or None when it was the last one."""
+    if not movies or len(movies) < limit:
+        return None
+    return encode_cursor(section, MovieTransformer.movie_id(movies[-1]))
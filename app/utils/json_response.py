@@ -0,0 +1,222 @@
+"""
+Catalog responses written straight to JSON bytes.
+
+The output is byte for byte what ``jsonify`` returns outside debug mode
+(sorted keys, compact separators, ASCII escapes, trailing newline), but:
+
+* each movie is encoded once per response, however many sections list it;
+* a section's encoded array is kept while the section cache keeps serving
+  the very same list object, so cached sections are not re-encoded on
+  every request;
+* bodies above ``compression_min_size`` bytes are compressed with brotli
+  (when installed) or gzip, as the client's Accept-Encoding allows; the
+  last few compressed bodies are kept, since warm responses repeat.
+"""
+import gzip
+import json
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+from app.transformers.movie_transformer import MovieTransformer
+from app.utils.cursors import next_cursor
+from app.utils.metrics import timed_serialization
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only
+    brotli = None
+
+# Same settings as Flask's DefaultJSONProvider with compact output.
+_encoder = json.JSONEncoder(
+    ensure_ascii=True, sort_keys=True, separators=(",", ":"), default=DefaultJSONProvider.default
+)
+
+# Set by init_json_response; 0 disables compression.
+compression_min_size = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def init_json_response(app):
+    global compression_min_size
+    compression_min_size = app.config["RESPONSE_COMPRESSION_MIN_SIZE"]
+
+
+def dumps(value) -> bytes:
+    return _encoder.encode(value).encode("ascii")
+
+
+class IdentityCache:
+    """
+    Bounded LRU of values derived from an object, valid only while the
+    same object (by identity) is passed again. The entry holds a reference
+    to it, so its id cannot be reused while it is cached.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, source, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is source:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        value = build()
+        with self._lock:
+            self._entries[key] = (source, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+# Encoded section arrays, keyed by (section, view).
+section_arrays = IdentityCache()
+
+# (encoding, body) -> compressed body, least recently used dropped first.
+COMPRESSED_BODIES = 32
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+
+
+class MovieEncoder:
+    """
+    Encodes movies for one response, remembering each movie's JSON by
+    movie_id. Every section of a response comes from the same catalog
+    version, so a movie listed by several sections encodes the same.
+    """
+
+    def __init__(self):
+        self._fragments = {}
+
+    def movie(self, movie) -> bytes:
+        if movie is None:
+            return b"null"
+        movie_id = MovieTransformer.movie_id(movie)
+        fragment = self._fragments.get(movie_id)
+        if fragment is None:
+            fragment = dumps(MovieTransformer.transform(movie))
+            if movie_id is not None:
+                self._fragments[movie_id] = fragment
+        return fragment
+
+    def movies(self, movies) -> bytes:
+        return b"[" + b",".join([self.movie(movie) for movie in movies]) + b"]"
+
+
+def encode_object(members: dict) -> bytes:
+    """``members`` maps keys to already encoded JSON values."""
+    return b"{" + b",".join(
+        [dumps(key) + b":" + members[key] for key in sorted(members)]
+    ) + b"}"
+
+
+def encode_movie_lists(lists: dict, view=None, encoder=None, reuse=True) -> bytes:
+    """
+    Encodes { name: [movies] } as a JSON object of movie arrays. With
+    ``reuse``, arrays of section lists still cached as the same object are
+    reused; pass False for one-off lists, such as later pages.
+    """
+    encoder = encoder or MovieEncoder()
+    if not reuse:
+        return encode_object({name: encoder.movies(movies) for name, movies in lists.items()})
+    return encode_object({
+        name: section_arrays.get((name, view), movies, lambda movies=movies: encoder.movies(movies))
+        for name, movies in lists.items()
+    })
+
+
+@timed_serialization
+def catalog_body(sections: dict, view=None, limit=None, cursors=None) -> bytes:
+    """/api/catalog: { sections, cursors }, with the next page's cursor per section."""
+    return encode_object({
+        "sections": encode_movie_lists(sections, view=view, reuse=not cursors),
+        "cursors": dumps({
+            section: next_cursor(section, movies, limit) for section, movies in sections.items()
+        }),
+    })
+
+
+@timed_serialization
+def search_body(result: dict) -> bytes:
+    """/api/catalog/search: { search_results, recommendations }."""
+    encoder = MovieEncoder()
+    return encode_object({
+        "search_results": encoder.movies(result["search_results"]),
+        "recommendations": encoder.movies(result["recommendations"]),
+    })
+
+
+@timed_serialization
+def similar_body(movies: list) -> bytes:
+    """/api/catalog/similar/<id>: { similar }."""
+    return encode_object({"similar": MovieEncoder().movies(movies)})
+
+
+@timed_serialization
+def sections_body(available: dict) -> bytes:
+    """/api/catalog/sections: { sections: [{ name, title }] }."""
+    return dumps({
+        "sections": [{"name": name, "title": title} for name, title in available.items()]
+    })
+
+
+def preferred_encoding(accepted):
+    """'br', 'gzip' or None for a parsed Accept-Encoding header."""
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+@timed_serialization
+def compress(body: bytes, encoding: str) -> bytes:
+    key = (encoding, body)
+    with _compressed_lock:
+        data = _compressed.get(key)
+        if data is not None:
+            _compressed.move_to_end(key)
+            return data
+
+    if encoding == "br":
+        data = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    with _compressed_lock:
+        _compressed[key] = data
+        while len(_compressed) > COMPRESSED_BODIES:
+            _compressed.popitem(last=False)
+    return data
+
+
+def json_response(body: bytes, status=200):
+    """
+    Response for a top-level JSON ``body`` built with the helpers above,
+    compressed when the client accepts it and it is worth it.
+    """
+    app = current_app
+    if app.json.compact is False or (app.json.compact is None and app.debug):
+        # jsonify pretty-prints here; so do we.
+        response = app.json.response(json.loads(body))
+        response.status_code = status
+        return response
+
+    body += b"\n"
+    response = app.response_class(body, status=status, mimetype=app.json.mimetype)
+    response.vary.add("Accept-Encoding")
+
+    encoding = None
+    if compression_min_size and len(body) >= compression_min_size:
+        encoding = preferred_encoding(request.accept_encodings)
+    if encoding is not None:
+        response.set_data(compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+    return response
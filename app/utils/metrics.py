@@ -0,0 +1,257 @@
+"""
+In-process request and query metrics.
+
+* Per endpoint: latency, database round trips, database time and JSON
+  serialization time per request, as histograms, and response statuses.
+* Per query name (the repository method): latency histogram, calls, rows
+  and errors. Queries slower than ``slow_query_ms`` are logged.
+
+Requests are tracked through a context variable, so queries made on the
+section pool (which runs them in the request's context) and in asyncio
+tasks count towards the request that made them; cache refreshes in the
+background count towards no request. Everything is kept in memory per
+process and served by ``GET /api/metrics``.
+"""
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets; one more bucket takes the rest.
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 34)
+
+
+class Histogram:
+    """Bucketed distribution with count, sum and max; not locked."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (max for the last one)."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": {
+                **{f"le_{bound:g}": count for bound, count in zip(self.buckets, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class RequestStats:
+    """What one request spent, filled in by the queries and encoders it runs."""
+
+    __slots__ = ("round_trips", "db_ms", "serialize_ms", "queries")
+
+    def __init__(self):
+        self.round_trips = 0
+        self.db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.queries = Counter()
+
+
+class EndpointStats:
+
+    def __init__(self):
+        self.latency_ms = Histogram()
+        self.round_trips = Histogram(ROUND_TRIP_BUCKETS)
+        self.db_ms = Histogram()
+        self.serialize_ms = Histogram()
+        self.statuses = Counter()
+        self.queries = Counter()
+
+    def to_dict(self):
+        return {
+            "latency_ms": self.latency_ms.to_dict(),
+            "round_trips": self.round_trips.to_dict(),
+            "db_ms": self.db_ms.to_dict(),
+            "serialize_ms": self.serialize_ms.to_dict(),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            # Query name -> calls per request, to spot N+1 patterns.
+            "queries_per_request": {
+                name: calls / self.latency_ms.count for name, calls in self.queries.most_common()
+            } if self.latency_ms.count else {},
+        }
+
+
+class QueryStats:
+
+    def __init__(self):
+        self.latency_ms = Histogram()
+        self.rows = 0
+        self.max_rows = 0
+        self.errors = 0
+
+    def to_dict(self):
+        return {
+            "calls": self.latency_ms.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            "rows_per_call": self.rows / self.latency_ms.count if self.latency_ms.count else None,
+            "max_rows": self.max_rows,
+            "latency_ms": self.latency_ms.to_dict(),
+        }
+
+
+_current = ContextVar("request_stats", default=None)
+
+
+class Metrics:
+    """Process-wide registry; thread safe."""
+
+    def __init__(self, enabled=True, slow_query_ms=0):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.endpoints = {}
+        self.queries = {}
+
+    def configure(self, enabled, slow_query_ms):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+
+    def reset(self):
+        with self.lock:
+            self.started_at = time.time()
+            self.endpoints = {}
+            self.queries = {}
+
+    def begin_request(self):
+        """Starts tracking a request in the current context; returns the token for end_request."""
+        if not self.enabled:
+            return None
+        return _current.set(RequestStats()), time.perf_counter()
+
+    def end_request(self, token, endpoint, status):
+        if token is None:
+            return
+        context_token, started = token
+        latency_ms = (time.perf_counter() - started) * 1e3
+        stats = _current.get()
+        try:
+            _current.reset(context_token)
+        except ValueError:  # ended in another context
+            _current.set(None)
+        with self.lock:
+            endpoint_stats = self.endpoints.get(endpoint)
+            if endpoint_stats is None:
+                endpoint_stats = self.endpoints[endpoint] = EndpointStats()
+            endpoint_stats.latency_ms.observe(latency_ms)
+            endpoint_stats.round_trips.observe(stats.round_trips)
+            endpoint_stats.db_ms.observe(stats.db_ms)
+            endpoint_stats.serialize_ms.observe(stats.serialize_ms)
+            endpoint_stats.statuses[status] += 1
+            endpoint_stats.queries.update(stats.queries)
+
+    def record_query(self, name, seconds, rows=0, error=False):
+        if not self.enabled:
+            return
+        elapsed_ms = seconds * 1e3
+        request_stats = _current.get()
+        with self.lock:
+            query_stats = self.queries.get(name)
+            if query_stats is None:
+                query_stats = self.queries[name] = QueryStats()
+            query_stats.latency_ms.observe(elapsed_ms)
+            query_stats.rows += rows
+            query_stats.max_rows = max(query_stats.max_rows, rows)
+            query_stats.errors += error
+            if request_stats is not None:
+                request_stats.round_trips += 1
+                request_stats.db_ms += elapsed_ms
+                request_stats.queries[name] += 1
+        if self.slow_query_ms and elapsed_ms >= self.slow_query_ms:
+            logger.warning("Slow query %s: %.1f ms, %d rows", name, elapsed_ms, rows)
+
+    def record_serialization(self, seconds):
+        request_stats = _current.get()
+        if request_stats is not None:
+            with self.lock:
+                request_stats.serialize_ms += seconds * 1e3
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "slow_query_ms": self.slow_query_ms or None,
+                "endpoints": {name: stats.to_dict() for name, stats in sorted(self.endpoints.items())},
+                "queries": {name: stats.to_dict() for name, stats in sorted(self.queries.items())},
+            }
+
+
+metrics = Metrics()
+
+
+def init_metrics(app):
+    metrics.configure(enabled=app.config["METRICS_ENABLED"], slow_query_ms=app.config["SLOW_QUERY_MS"])
+
+
+def result_rows(result):
+    """Rows in a repository result: list and dict lengths, summed over tuples."""
+    if isinstance(result, tuple):
+        return sum(result_rows(part) for part in result)
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 0
+
+
+@contextmanager
+def timed_query(name):
+    """
+    Times the database call in its block as query ``name``. Set
+    ``timer["rows"]`` to record the rows it returned.
+    """
+    timer = {"rows": 0}
+    started = time.perf_counter()
+    try:
+        yield timer
+    except BaseException:
+        metrics.record_query(name, time.perf_counter() - started, timer["rows"], error=True)
+        raise
+    metrics.record_query(name, time.perf_counter() - started, timer["rows"])
+
+
+def timed_serialization(encode):
+    """Counts calls of ``encode`` towards the request's serialization time."""
+    @wraps(encode)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return encode(*args, **kwargs)
+        finally:
+            metrics.record_serialization(time.perf_counter() - started)
+    return wrapper
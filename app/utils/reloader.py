@@ -0,0 +1,71 @@
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundReloader:
+    """
+    Runs ``task`` on one long-lived daemon thread, at most once every
+    ``interval`` seconds. Readers call ``poke()`` on every access; it only
+    compares a timestamp until a run is due, and never waits for one.
+
+    Runs never overlap: pokes while one is in flight are ignored. Failures
+    are logged as ``"<description> failed"`` and retried after the next
+    interval.
+    """
+
+    def __init__(self, task: Callable[[], None], name: str, description: str, interval: float = 60):
+        self.task = task
+        self.name = name
+        self.description = description
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pending = False
+        self._next_run = 0.0
+
+    def poke(self):
+        """Schedules a run when the interval has passed since the last one."""
+        now = time.monotonic()
+        if now < self._next_run:
+            return
+        with self._lock:
+            if self._pending or now < self._next_run:
+                return
+            self._pending = True
+            self._next_run = now + self.interval
+            # Also after a fork, which leaves the parent's thread behind.
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def run_soon(self):
+        """Schedules a run now, whatever the interval."""
+        self._next_run = 0.0
+        self.poke()
+
+    def defer(self, seconds: float):
+        """Holds off the next run for ``seconds``, e.g. after running it inline."""
+        self._next_run = time.monotonic() + seconds
+
+    @property
+    def pending(self):
+        """Whether a run is scheduled or in flight."""
+        return self._pending
+
+    def _loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self.task()
+            except Exception:
+                logger.warning("%s failed", self.description, exc_info=True)
+            finally:
+                self._pending = False
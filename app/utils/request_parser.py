@@ -1,11 +1,14 @@
-from app.constants.catalogs import ALLOWED_SECTIONS
+from app.constants.catalogs import ALLOWED_SECTIONS, SECTION_PAGE_MAX, SECTION_PAGE_SIZE
+from app.exceptions.api_error import APIError
+from app.models.projections import PROJECTIONS
+from app.utils.cursors import decode_cursor
 
 DEFAULT_SECTIONS = ["popular", "trending", "topRated"]
 
-def parse_sections(param_value: str | None):
+def parse_sections(param_value: str | None, allowed=ALLOWED_SECTIONS):
     """
     Converts ?sections=popular,action → ["popular", "action"]
-    Ensures only valid sections survive.
+    Ensures only sections in ``allowed`` survive.
     """
     if not param_value:
         return DEFAULT_SECTIONS
@@ -15,9 +18,51 @@ def parse_sections(param_value: str | None):
 
     raw = list(set(raw))
     
-    valid = [s for s in raw if s in ALLOWED_SECTIONS]
+    valid = [s for s in raw if s in allowed]
 
     if not valid:
         return DEFAULT_SECTIONS
 
     return valid
+
+
+def parse_view(param_value: str | None):
+    """
+    Converts ?view=card → the MovieCard projection.
+    Without a view, full Movie nodes are returned.
+    """
+    if not param_value:
+        return None
+
+    projection = PROJECTIONS.get(param_value.strip())
+    if projection is None:
+        raise APIError(f"Unknown view '{param_value}'. Use one of: {', '.join(PROJECTIONS)}")
+
+    return projection
+
+
+def parse_limit(param_value: str | None, default=SECTION_PAGE_SIZE, maximum=SECTION_PAGE_MAX):
+    """
+    Converts ?limit=50 → 50, between 1 and ``maximum``.
+    Without a limit, ``default`` is returned.
+    """
+    if not param_value:
+        return default
+
+    try:
+        limit = int(param_value)
+    except ValueError:
+        raise APIError(f"Invalid limit '{param_value}'")
+
+    return max(1, min(limit, maximum))
+
+
+def parse_cursors(param_value: str | None):
+    """
+    Converts ?cursors=<token>,<token> → { section: last movie_id }.
+    Without cursors, an empty dict is returned.
+    """
+    if not param_value:
+        return {}
+
+    return dict(decode_cursor(token.strip()) for token in param_value.split(",") if token.strip())
@@ -0,0 +1,210 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+# Returned by TTLCache.peek when nothing usable is cached.
+MISSING = object()
+
+# Version before the first check; any version, None included, differs from it.
+_UNCHECKED = object()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class TTLCache:
+    """
+    Thread-safe read-through cache with stale-while-revalidate.
+
+    * A fresh entry is returned as is.
+    * An expired entry younger than ``stale_ttl`` is still returned, while
+      one background thread reloads it.
+    * A miss calls the loader; concurrent misses for the same key wait on
+      that single call instead of each querying the database.
+    * At most ``max_entries`` are kept, least recently used go first.
+
+    ``watch_version`` makes the cache poll a cheap version stamp every few
+    seconds (in the background) and drop everything when it changes.
+    """
+
+    def __init__(self, max_entries=64, ttl=300, stale_ttl=3600, enabled=True,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.enabled = enabled
+        self.clock = clock
+
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ttl-cache")
+
+        self._version_loader = None
+        self._version_interval = 0
+        self._version = _UNCHECKED
+        self._next_version_check = 0.0
+        self._checking_version = False
+
+    def configure(self, **settings):
+        for name, value in settings.items():
+            if not hasattr(self, name):
+                raise AttributeError(f"Unknown cache setting: {name}")
+            setattr(self, name, value)
+
+    def get(self, key: Hashable, loader: Callable[[], Any], ttl: float | None = None):
+        """
+        Returns the cached value for ``key``, loading it with ``loader``
+        when missing. Loader errors reach every caller waiting on that
+        load and are never cached.
+        """
+        if not self.enabled:
+            return loader()
+
+        now = self.clock()
+        self._maybe_check_version(now)
+
+        with self._lock:
+            value = self._lookup(key, loader, ttl, now)
+            if value is not MISSING:
+                return value
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                generation = self._generation
+
+        if owner:
+            self._load(key, loader, ttl, future, generation, False)
+        return future.result()
+
+    def peek(self, key: Hashable, loader: Callable[[], Any], ttl: float | None = None):
+        """
+        Like get, but never waits: returns MISSING instead of loading.
+        A stale entry is still returned and refreshed with ``loader``.
+        """
+        if not self.enabled:
+            return MISSING
+
+        now = self.clock()
+        self._maybe_check_version(now)
+
+        with self._lock:
+            return self._lookup(key, loader, ttl, now)
+
+    @property
+    def generation(self):
+        """Changes on every invalidation; pass it to put from before a load."""
+        return self._generation
+
+    def put(self, key: Hashable, value, ttl: float | None = None, generation: int | None = None):
+        """
+        Stores a value loaded outside the cache (e.g. awaited). Dropped if
+        the cache was invalidated since ``generation``.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._store(key, value, ttl, self._generation if generation is None else generation)
+
+    def invalidate(self, key: Hashable | None = None):
+        """
+        Drops one entry, or everything. Loads already running still answer
+        their waiting callers but are not stored.
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+                self._inflight.clear()
+            else:
+                self._entries.pop(key, None)
+                self._inflight.pop(key, None)
+
+    def watch_version(self, loader: Callable[[], Any], interval: float):
+        """Invalidates everything whenever ``loader()`` returns a new value."""
+        self._version_loader = loader
+        self._version_interval = interval
+        self._version = _UNCHECKED
+        self._next_version_check = 0.0
+
+    def _lookup(self, key, loader, ttl, now):
+        """Fresh or stale value, starting a refresh when stale. Needs the lock."""
+        entry = self._entries.get(key)
+        if entry is None or now >= entry.stale_until:
+            return MISSING
+
+        self._entries.move_to_end(key)
+        if now >= entry.fresh_until and key not in self._inflight:
+            future = self._inflight[key] = Future()
+            self._executor.submit(self._load, key, loader, ttl, future, self._generation, True)
+        return entry.value
+
+    def _load(self, key, loader, ttl, future, generation, background):
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+            future.set_exception(e)
+            if background:
+                logger.warning("Background refresh of %r failed; serving stale copy", key,
+                               exc_info=True)
+            return
+
+        with self._lock:
+            self._store(key, value, ttl, generation)
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        future.set_result(value)
+
+    def _store(self, key, value, ttl, generation):
+        """Needs the lock."""
+        if generation != self._generation:
+            return
+        now = self.clock()
+        ttl = self.ttl if ttl is None else ttl
+        self._entries[key] = _Entry(value, now + ttl, now + max(ttl, self.stale_ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _maybe_check_version(self, now):
+        if self._version_loader is None or now < self._next_version_check:
+            return
+        with self._lock:
+            if self._checking_version or now < self._next_version_check:
+                return
+            self._checking_version = True
+            self._next_version_check = now + self._version_interval
+        self._executor.submit(self._check_version)
+
+    def _check_version(self):
+        try:
+            version = self._version_loader()
+        except Exception:
+            logger.warning("Catalog version check failed", exc_info=True)
+            return
+        finally:
+            self._checking_version = False
+
+        with self._lock:
+            # The first check only records the version; after it, None -> 1
+            # (the first seed of an unstamped graph) is a change like any other.
+            changed = self._version is not _UNCHECKED and version != self._version
+            self._version = version
+        if changed:
+            self.invalidate()
@@ -0,0 +1,6 @@
+from app.asgi import create_asgi_app
+import dotenv
+
+dotenv.load_dotenv()
+
+app = create_asgi_app()
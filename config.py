@@ -16,4 +16,67 @@ class Config:
     NEO4J_HOST = os.environ.get("NEO4J_HOST")
 
     SQLALCHEMY_DATABASE_URI = os.environ.get("SQLALCHEMY_DATABASE_URI", "sqlite:///movies.db")
-    SQLALCHEMY_TRACK_MODIFICATIONS = os.environ.get("SQLALCHEMY_TRACK_MODIFICATIONS", "False") == "True"
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = os.environ.get("SQLALCHEMY_TRACK_MODIFICATIONS", "False") == "True"
+
+    # In-process catalog section cache (seconds). Expired sections are served
+    # stale for up to SECTION_CACHE_STALE_TTL while they refresh in the
+    # background; the CatalogMeta version stamp is checked every
+    # SECTION_CACHE_VERSION_CHECK seconds (0 disables the check).
+    SECTION_CACHE_ENABLED = os.environ.get("SECTION_CACHE_ENABLED", "True") == "True"
+    SECTION_CACHE_TTL = int(os.environ.get("SECTION_CACHE_TTL", "300"))
+    SECTION_CACHE_STALE_TTL = int(os.environ.get("SECTION_CACHE_STALE_TTL", "3600"))
+    SECTION_CACHE_MAX_ENTRIES = int(os.environ.get("SECTION_CACHE_MAX_ENTRIES", "64"))
+    SECTION_CACHE_VERSION_CHECK = int(os.environ.get("SECTION_CACHE_VERSION_CHECK", "30"))
+
+    # Catalog sections missing from the cache are fetched concurrently by up
+    # to SECTION_FETCH_WORKERS threads; a section slower than
+    # SECTION_FETCH_TIMEOUT seconds is left out of the response (0 waits for
+    # every section).
+    SECTION_FETCH_WORKERS = int(os.environ.get("SECTION_FETCH_WORKERS", "6"))
+    SECTION_FETCH_TIMEOUT = float(os.environ.get("SECTION_FETCH_TIMEOUT", "3"))
+
+    # Serve SIMILAR_TO lookups from an in-memory CSR copy of the edges, reloaded
+    # when the catalog version stamp changes (checked every N seconds).
+    SIMILARITY_ENGINE_ENABLED = os.environ.get("SIMILARITY_ENGINE_ENABLED", "False") == "True"
+    SIMILARITY_ENGINE_VERSION_CHECK = int(os.environ.get("SIMILARITY_ENGINE_VERSION_CHECK", "60"))
+
+    # Serve search from an in-process BM25 index of titles and overviews instead
+    # of the movieSearch full-text index, rebuilt from the snapshot (or the graph)
+    # when the catalog version stamp changes (checked every N seconds).
+    SEARCH_ENGINE_ENABLED = os.environ.get("SEARCH_ENGINE_ENABLED", "False") == "True"
+    SEARCH_ENGINE_VERSION_CHECK = int(os.environ.get("SEARCH_ENGINE_VERSION_CHECK", "60"))
+
+    # Memory-mapped movie properties shared by every worker process; built by
+    # `flask catalog build-snapshot`, ignored while missing or older than the
+    # graph (checked every CATALOG_SNAPSHOT_CHECK seconds). Empty disables it.
+    CATALOG_SNAPSHOT_PATH = os.environ.get("CATALOG_SNAPSHOT_PATH", "artifacts/catalog_snapshot.bin")
+    CATALOG_SNAPSHOT_CHECK = int(os.environ.get("CATALOG_SNAPSHOT_CHECK", "30"))
+
+    # JSON responses of at least this many bytes are sent brotli (if
+    # installed) or gzip compressed to clients accepting it; 0 disables it.
+    RESPONSE_COMPRESSION_MIN_SIZE = int(os.environ.get("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+
+    # Catalog store: "neo4j", or "memory" to serve the seed CSVs in
+    # CATALOG_DATA_DIR without a database (benchmarks and load tests), each
+    # query delayed by CATALOG_MEMORY_LATENCY seconds.
+    CATALOG_BACKEND = os.environ.get("CATALOG_BACKEND", "neo4j")
+    CATALOG_DATA_DIR = os.environ.get("CATALOG_DATA_DIR", "data")
+    CATALOG_MEMORY_LATENCY = float(os.environ.get("CATALOG_MEMORY_LATENCY", "0"))
+
+    # Neo4j connection pool (both drivers). NEO4J_POOL_WARMUP connections are
+    # opened in create_app (and on ASGI startup) before traffic arrives.
+    NEO4J_MAX_POOL_SIZE = int(os.environ.get("NEO4J_MAX_POOL_SIZE", "50"))
+    NEO4J_MAX_CONNECTION_LIFETIME = int(os.environ.get("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+    NEO4J_ACQUISITION_TIMEOUT = float(os.environ.get("NEO4J_ACQUISITION_TIMEOUT", "10"))
+    NEO4J_CONNECTION_TIMEOUT = float(os.environ.get("NEO4J_CONNECTION_TIMEOUT", "15"))
+    NEO4J_KEEP_ALIVE = os.environ.get("NEO4J_KEEP_ALIVE", "True") == "True"
+    NEO4J_POOL_WARMUP = int(os.environ.get("NEO4J_POOL_WARMUP", "2"))
+
+    # Request and query metrics served on /api/metrics. Queries slower than
+    # SLOW_QUERY_MS milliseconds are logged (0 disables the log).
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "True") == "True"
+    SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "0"))
+
+    # Append every GET /api/ request to this JSONL file, to replay with
+    # scripts/benchmark_api.py. Empty disables it.
+    REQUEST_LOG_PATH = os.environ.get("REQUEST_LOG_PATH", "")
@@ -0,0 +1,264 @@
+"""
+The app's Neo4j drivers, with explicit pool settings and pool metrics.
+
+``neo4j_driver`` holds the blocking driver neomodel runs every query on;
+AsyncCatalogRepository opens its async driver with the same
+``driver_options``. Both pools are instrumented: each connection
+acquisition is counted and timed, including those that queued behind a
+full pool, and ``pool_state`` reports in-use and idle connections.
+
+``warm_up`` opens connections before traffic arrives, so the first
+requests after a deploy do not pay for TLS, authentication and routing.
+"""
+from collections import deque
+import inspect
+import logging
+import threading
+import time
+
+from neo4j import GraphDatabase, READ_ACCESS
+from neo4j.exceptions import ClientError, DriverError, Neo4jError
+
+logger = logging.getLogger(__name__)
+
+# Acquisitions kept for the latency percentiles.
+LATENCY_SAMPLES = 1024
+
+
+def neo4j_uri(config):
+    """NEO4J_HOST on the Aura port, else NEO4J_URI."""
+    if config["NEO4J_HOST"]:
+        return f'neo4j+ssc://{config["NEO4J_HOST"]}:7687'
+    return config["NEO4J_URI"]
+
+
+def driver_options(config):
+    """GraphDatabase.driver keyword arguments from the app config."""
+    return {
+        "auth": (config["NEO4J_USERNAME"], config["NEO4J_PASSWORD"]),
+        "max_connection_pool_size": config["NEO4J_MAX_POOL_SIZE"],
+        "max_connection_lifetime": config["NEO4J_MAX_CONNECTION_LIFETIME"],
+        "connection_acquisition_timeout": config["NEO4J_ACQUISITION_TIMEOUT"],
+        "connection_timeout": config["NEO4J_CONNECTION_TIMEOUT"],
+        "keep_alive": config["NEO4J_KEEP_ALIVE"],
+    }
+
+
+def _percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))]
+
+
+class PoolMetrics:
+    """Acquisition counters of one connection pool; thread safe."""
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.lock = threading.Lock()
+        self.acquisitions = 0
+        self.waited = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.routing_updates = 0
+        self.routing_failures = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.max_latency = 0.0
+        self.latencies = deque(maxlen=samples)
+
+    def begin(self, idle):
+        """Records an acquisition starting with ``idle`` free connections."""
+        with self.lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            if not idle:
+                self.waited += 1
+        return time.perf_counter()
+
+    def end(self, started, error=None):
+        latency = time.perf_counter() - started
+        with self.lock:
+            self.waiting -= 1
+            if error is None:
+                self.acquisitions += 1
+                self.latencies.append(latency)
+                self.max_latency = max(self.max_latency, latency)
+            elif isinstance(error, ClientError) and "failed to obtain a connection" in str(error):
+                self.timeouts += 1
+            else:
+                self.failures += 1
+
+    def routed(self, error=None):
+        with self.lock:
+            self.routing_updates += 1
+            if error is not None:
+                self.routing_failures += 1
+
+    def snapshot(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats = {
+                "acquisitions": self.acquisitions,
+                "waited": self.waited,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "routing_updates": self.routing_updates,
+                "routing_failures": self.routing_failures,
+            }
+            max_latency = self.max_latency
+        stats["acquire_ms"] = None if not latencies else {
+            "p50": _percentile(latencies, 50) * 1e3,
+            "p95": _percentile(latencies, 95) * 1e3,
+            "p99": _percentile(latencies, 99) * 1e3,
+            "max": max_latency * 1e3,
+        }
+        return stats
+
+
+def _connections(pool):
+    # The async pool's lock belongs to its event loop; a copy is enough there.
+    for _ in range(3):
+        try:
+            return [c for connections in list(pool.connections.values()) for c in list(connections)]
+        except RuntimeError:  # resized while copying
+            continue
+    return []
+
+
+def pool_state(driver, metrics, max_size):
+    """In-use and idle connections of ``driver``'s pool, with its acquisition metrics."""
+    connections = _connections(driver._pool)
+    in_use = sum(1 for connection in connections if connection.in_use)
+    return {
+        "max_size": max_size,
+        "in_use": in_use,
+        "idle": len(connections) - in_use,
+        **metrics.snapshot(),
+    }
+
+
+def instrument_pool(driver, metrics):
+    """
+    Times every connection acquisition of ``driver`` into ``metrics``.
+    Acquisition covers waiting for a free connection, opening a new one and,
+    on neo4j:// URIs, refreshing a stale routing table. Routing table
+    updates made to resolve the home database are only counted.
+    """
+    pool = getattr(driver, "_pool", None)
+    acquire = getattr(pool, "acquire", None)
+    if acquire is None:
+        logger.warning("Neo4j driver exposes no connection pool; pool metrics are disabled")
+        return
+
+    def idle():
+        return any(not connection.in_use for connection in _connections(pool))
+
+    update_routing_table = getattr(pool, "update_routing_table", None)
+
+    if inspect.iscoroutinefunction(acquire):
+        async def counted_update(*args, **kwargs):
+            try:
+                result = await update_routing_table(*args, **kwargs)
+            except BaseException as e:
+                metrics.routed(e)
+                raise
+            metrics.routed()
+            return result
+
+        async def timed_acquire(*args, **kwargs):
+            started = metrics.begin(idle())
+            try:
+                connection = await acquire(*args, **kwargs)
+            except BaseException as e:
+                metrics.end(started, e)
+                raise
+            metrics.end(started)
+            return connection
+    else:
+        def counted_update(*args, **kwargs):
+            try:
+                result = update_routing_table(*args, **kwargs)
+            except BaseException as e:
+                metrics.routed(e)
+                raise
+            metrics.routed()
+            return result
+
+        def timed_acquire(*args, **kwargs):
+            started = metrics.begin(idle())
+            try:
+                connection = acquire(*args, **kwargs)
+            except BaseException as e:
+                metrics.end(started, e)
+                raise
+            metrics.end(started)
+            return connection
+
+    pool.acquire = timed_acquire
+    if update_routing_table is not None:
+        pool.update_routing_table = counted_update
+
+
+class ManagedDriver:
+    """The blocking driver, built from the app config on ``configure``."""
+
+    def __init__(self):
+        self.driver = None
+        self.uri = None
+        self.database = None
+        self.max_size = None
+        self.metrics = PoolMetrics()
+
+    def configure(self, config):
+        self.close()
+        options = driver_options(config)
+        self.uri = neo4j_uri(config)
+        self.database = config["NEO4J_DATABASE"] or None
+        self.max_size = options["max_connection_pool_size"]
+        self.metrics = PoolMetrics()
+        if not self.uri:
+            logger.warning("Neither NEO4J_HOST nor NEO4J_URI is set; Neo4j queries will fail")
+            return None
+        self.driver = GraphDatabase.driver(self.uri, **options)
+        instrument_pool(self.driver, self.metrics)
+        return self.driver
+
+    def warm_up(self, connections):
+        """
+        Opens ``connections`` pooled connections by holding that many read
+        transactions at once. Failures are logged, not raised: the app
+        still starts, and connects on its first query instead.
+
+        Returns:
+            int: Connections opened.
+        """
+        if self.driver is None or connections <= 0:
+            return 0
+        started = time.perf_counter()
+        sessions = []
+        try:
+            for _ in range(connections):
+                session = self.driver.session(database=self.database, default_access_mode=READ_ACCESS)
+                sessions.append(session)
+                session.begin_transaction().run("RETURN 1").consume()
+        except (DriverError, Neo4jError, OSError) as e:
+            logger.warning("Neo4j pool warm-up failed after %d connections: %s", len(sessions) - 1, e)
+            return max(len(sessions) - 1, 0)
+        finally:
+            for session in sessions:
+                session.close()
+        logger.info("Opened %d Neo4j connections in %.0f ms", connections, (time.perf_counter() - started) * 1e3)
+        return connections
+
+    def state(self):
+        if self.driver is None:
+            return None
+        return pool_state(self.driver, self.metrics, self.max_size)
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.close()
+            self.driver = None
+
+
+neo4j_driver = ManagedDriver()
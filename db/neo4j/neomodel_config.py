@@ -1,5 +1,14 @@
-from neomodel import config
+import logging
+
+from neomodel import get_config
+
+from db.neo4j.driver import neo4j_driver
+
+logger = logging.getLogger(__name__)
 
 def init_neomodel(app):
-    config.DATABASE_URL = f'neo4j+ssc://{app.config["NEO4J_USERNAME"]}:{app.config["NEO4J_PASSWORD"]}@{app.config["NEO4J_HOST"]}:7687'
-    print("Connected to Neo4j:", config.DATABASE_URL)
+    config = get_config()
+    config.database_url = ""
+    config.database_name = app.config["NEO4J_DATABASE"] or None
+    config.driver = neo4j_driver.configure(app.config)
+    logger.info("Neo4j driver configured for %s", neo4j_driver.uri)
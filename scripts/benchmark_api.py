@@ -0,0 +1,325 @@
+"""
+Offline benchmark of the HTTP API: replays recorded requests against the
+Flask app on the in-memory catalog backend, without any database.
+
+The app is built by ``create_app`` with ``CATALOG_BACKEND=memory`` on the
+seed CSVs in ``--data-dir`` (a synthetic scale-1 catalog is generated
+under artifacts/benchmarks/data when they are missing), so every run sees
+the same catalog and the same answers.
+
+Requests come from a JSONL log, one ``{"path", "query"}`` object per line,
+as the API writes with ``REQUEST_LOG_PATH`` set. Without ``--log`` a seeded
+mix of ``/api/catalog?sections=...`` and ``/api/catalog/search?q=...``
+requests is generated (``--save-log`` keeps it, to replay the same traffic
+later). The replay runs in three passes:
+
+    warm-up      the first ``--warmup`` requests, one at a time, unmeasured
+    throughput   every request, in log order, from ``--concurrency`` threads
+    allocations  up to ``--alloc-requests`` requests, one at a time under
+                 tracemalloc: peak and retained bytes per request
+
+Per endpoint (the Flask route) the results give requests, errors,
+p50/p95/p99 latency, allocation peaks and database round trips per request
+(from app.utils.metrics); overall, requests/sec. They go to a JSON file;
+``--compare`` prints the change against an earlier one:
+
+    python scripts/benchmark_api.py --concurrency 8
+    python scripts/benchmark_api.py --log requests.jsonl --compare artifacts/benchmarks/<old>.json
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_synthetic_data import generate
+from load_test_async import configure, percentile, request_mix, wait_for_engines
+
+OUT_DIR = "artifacts/benchmarks"
+REGRESSION_RATIO = 1.2
+# Endpoints that report on the benchmark rather than serve traffic.
+SKIPPED_PATHS = ("/api/metrics", "/api/health")
+
+
+def read_log(path):
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if entry.get("method", "GET") != "GET" or entry["path"].rstrip("/") in SKIPPED_PATHS:
+                continue
+            entries.append({"path": entry["path"], "query": entry.get("query", "")})
+    return entries
+
+
+def write_log(path, entries):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps({"method": "GET", **entry}, separators=(",", ":")) + "\n")
+
+
+def resolve_endpoints(app, entries):
+    """
+    Tags each entry with its route (``GET /api/catalog/``) and follows the
+    app's slash redirects up front, so the replay measures the handlers.
+    """
+    from werkzeug.routing import RequestRedirect
+    from werkzeug.exceptions import HTTPException
+
+    adapter = app.url_map.bind("localhost")
+    for entry in entries:
+        try:
+            rule, _ = adapter.match(entry["path"], method="GET", return_rule=True)
+        except RequestRedirect as redirect:
+            entry["path"] = redirect.new_url.split("localhost", 1)[-1].split("?", 1)[0]
+            rule, _ = adapter.match(entry["path"], method="GET", return_rule=True)
+        except HTTPException:
+            entry["endpoint"] = "GET <unmatched>"
+            continue
+        entry["endpoint"] = f"GET {rule.rule}"
+    return entries
+
+
+def url(entry):
+    return f'{entry["path"]}?{entry["query"]}' if entry["query"] else entry["path"]
+
+
+def replay(client, entries, concurrency):
+    """Returns [(endpoint, seconds, status)] in completion order and the wall time."""
+    lock = threading.Lock()
+    timings = []
+
+    def call(entry):
+        started = time.perf_counter()
+        status = client.get(url(entry)).status_code
+        elapsed = time.perf_counter() - started
+        with lock:
+            timings.append((entry["endpoint"], elapsed, status))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, entries))
+    return timings, time.perf_counter() - started
+
+
+def allocations(client, entries):
+    """[(endpoint, peak bytes, retained bytes)] per request, one request at a time."""
+    samples = []
+    tracemalloc.start()
+    try:
+        for entry in entries:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            client.get(url(entry))
+            current, peak = tracemalloc.get_traced_memory()
+            samples.append((entry["endpoint"], peak - before, current - before))
+    finally:
+        tracemalloc.stop()
+    return samples
+
+
+def latency_stats(seconds):
+    seconds = sorted(seconds)
+    return {
+        "mean_ms": sum(seconds) / len(seconds) * 1e3,
+        "p50_ms": percentile(seconds, 50) * 1e3,
+        "p95_ms": percentile(seconds, 95) * 1e3,
+        "p99_ms": percentile(seconds, 99) * 1e3,
+        "max_ms": seconds[-1] * 1e3,
+    }
+
+
+def summarize(timings, wall_seconds, samples, app_metrics):
+    endpoints = {}
+    for endpoint in sorted({endpoint for endpoint, _, _ in timings}):
+        seconds = [elapsed for name, elapsed, _ in timings if name == endpoint]
+        stats = {
+            "requests": len(seconds),
+            "errors": sum(1 for name, _, status in timings if name == endpoint and status >= 500),
+            "rps": len(seconds) / wall_seconds,
+            **latency_stats(seconds),
+        }
+        peaks = sorted(peak for name, peak, _ in samples if name == endpoint)
+        retained = [kept for name, _, kept in samples if name == endpoint]
+        if peaks:
+            stats["alloc_peak_kb_mean"] = sum(peaks) / len(peaks) / 1024
+            stats["alloc_peak_kb_p95"] = percentile(peaks, 95) / 1024
+            stats["alloc_retained_kb_mean"] = sum(retained) / len(retained) / 1024
+        recorded = app_metrics["endpoints"].get(endpoint)
+        if recorded:
+            stats["round_trips_mean"] = recorded["round_trips"]["mean"]
+            stats["queries_per_request"] = recorded["queries_per_request"]
+        endpoints[endpoint] = stats
+
+    return {
+        "requests": len(timings),
+        "errors": sum(1 for _, _, status in timings if status >= 500),
+        "seconds": wall_seconds,
+        "rps": len(timings) / wall_seconds,
+        **latency_stats([elapsed for _, elapsed, _ in timings]),
+        "endpoints": endpoints,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(args):
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": vars(args),
+    }
+
+
+def compare(results, baseline):
+    """Prints the change of every endpoint against a previous result file."""
+    print(f"\nAgainst {baseline['environment'].get('commit') or 'baseline'}:")
+    rows = [("all", results["total"], baseline["total"])]
+    rows += [
+        (name, stats, baseline["total"]["endpoints"][name])
+        for name, stats in results["total"]["endpoints"].items()
+        if name in baseline["total"]["endpoints"]
+    ]
+    for name, now, before in rows:
+        changes = []
+        regression = False
+        for key in ("p50_ms", "p95_ms", "p99_ms", "alloc_peak_kb_mean"):
+            if now.get(key) is None or not before.get(key):
+                continue
+            ratio = now[key] / before[key]
+            regression |= ratio > REGRESSION_RATIO
+            changes.append(f"{key[:-3] if key.endswith('_ms') else 'alloc'} x{ratio:.2f}")
+        throughput = now["rps"] / before["rps"] if before.get("rps") else None
+        if throughput is not None:
+            regression |= throughput < 1 / REGRESSION_RATIO
+            changes.append(f"rps x{throughput:.2f}")
+        print(f"  {name:<40} {'  '.join(changes)}{'  REGRESSION' if regression else ''}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay API requests against the in-memory backend.")
+    parser.add_argument("--log", default=None, help="JSONL request log to replay (default: generated)")
+    parser.add_argument("--save-log", default=None, help="write the replayed requests to this JSONL file")
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="requests to generate, or the most to replay from --log")
+    parser.add_argument("--search-ratio", type=float, default=0.3, help="share of generated searches")
+    parser.add_argument("--data-dir", default="data", help="directory with movies.csv and genres.csv")
+    parser.add_argument("--concurrency", type=int, default=8, help="threads replaying requests")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests replayed first")
+    parser.add_argument("--alloc-requests", type=int, default=300,
+                        help="requests replayed under tracemalloc (0 skips the pass)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every catalog query")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="turn the section cache off")
+    parser.add_argument("--similarity-engine", action="store_true",
+                        help="serve recommendations from the in-memory similarity index")
+    parser.add_argument("--search-engine", action="store_true",
+                        help="serve search from the in-process BM25 index")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help=f"result file (default: {OUT_DIR}/api-<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="earlier result file to compare against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    data_dir = args.data_dir
+    if not os.path.exists(os.path.join(data_dir, "movies.csv")):
+        data_dir = os.path.join(OUT_DIR, "data", f"scale-1-seed-{args.seed}")
+        if not os.path.exists(os.path.join(data_dir, "movies.csv")):
+            print(f"No movies.csv in {args.data_dir}; generating a scale 1 catalog in {data_dir}...")
+            generate(data_dir, scale=1.0, seed=args.seed)
+    configure(argparse.Namespace(
+        data_dir=data_dir, latency=args.latency, cache=args.cache, similarity_engine=args.similarity_engine,
+        search_engine=args.search_engine,
+    ))
+
+    from app import create_app
+    from app.repositories.backend import catalog_backend
+    from app.utils.metrics import metrics
+
+    app = create_app()
+    wait_for_engines()
+    client = app.test_client()
+
+    if args.log:
+        entries = read_log(args.log)[:args.requests]
+    else:
+        entries = [
+            {"path": path, "query": query}
+            for path, query in request_mix(
+                catalog_backend.repository.catalog, args.requests, args.search_ratio, args.seed
+            )
+        ]
+    if not entries:
+        raise SystemExit("No requests to replay")
+    entries = resolve_endpoints(app, entries)
+    if args.save_log:
+        write_log(args.save_log, [{"path": e["path"], "query": e["query"]} for e in entries])
+
+    print(f"Warming up ({min(args.warmup, len(entries))} requests)...")
+    for entry in entries[:args.warmup]:
+        client.get(url(entry))
+
+    print(f"Replaying {len(entries)} requests on {args.concurrency} threads...")
+    metrics.reset()
+    timings, wall_seconds = replay(client, entries, args.concurrency)
+    app_metrics = metrics.snapshot()
+
+    samples = []
+    if args.alloc_requests:
+        print(f"Tracing allocations ({min(args.alloc_requests, len(entries))} requests)...")
+        samples = allocations(client, entries[:args.alloc_requests])
+
+    total = summarize(timings, wall_seconds, samples, app_metrics)
+    results = {
+        "environment": environment(args),
+        "data_dir": data_dir,
+        "total": total,
+    }
+
+    print(f"  {'all':<40} {total['rps']:8.1f} req/s  p50 {total['p50_ms']:7.2f} ms  "
+          f"p95 {total['p95_ms']:7.2f} ms  p99 {total['p99_ms']:7.2f} ms")
+    for name, stats in total["endpoints"].items():
+        alloc = stats.get("alloc_peak_kb_mean")
+        print(f"  {name:<40} {stats['requests']:6d} req  p50 {stats['p50_ms']:7.2f} ms  "
+              f"p95 {stats['p95_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms"
+              + (f"  peak {alloc:8.1f} KB" if alloc is not None else ""))
+
+    output = args.output or os.path.join(OUT_DIR, time.strftime("api-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
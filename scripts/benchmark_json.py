@@ -0,0 +1,149 @@
+"""
+Micro-benchmark of catalog response serialization: the MovieTransformer
+dicts + ``jsonify`` path against app.utils.json_response.
+
+A homepage-like response is built from synthetic movies (``--sections``
+sections of ``--per-section`` movies drawn from a small pool, so they
+overlap like popular/trending/genres do) as neomodel nodes and as card
+projections, and each path is timed per response:
+
+    jsonify       transform every movie to a dict, then jsonify
+    encoder_cold  json_response on fresh section lists (cache misses)
+    encoder_warm  json_response on the same list objects (cached sections)
+    gzip / br     compressing the encoded body (br only with brotli installed)
+    gzip_cached   json_response with gzip accepted, repeating a body
+
+Both paths must produce the same bytes, or the script fails. No database
+is needed; run it from the repo root:
+
+    python scripts/benchmark_json.py --sections 8 --per-section 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from neo4j.graph import Graph, Node
+
+from app.models.movie import Movie
+from app.models.projections import MovieCard
+from app.transformers.movie_transformer import MovieTransformer
+from app.utils import json_response as fast
+
+
+def synthetic_properties(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "movie_id": movie_id,
+            "title": f"Movie {movie_id} – {rng.choice(['Été', 'Night', 'Return', 'Zoë'])}",
+            "overview": " ".join(rng.choice(["a", "quiet", "town", "hero", "falls"]) for _ in range(60)),
+            "popularity": rng.random() * 100,
+            "vote_average": round(rng.random() * 10, 1),
+            "vote_count": rng.randrange(5000),
+            "release_year": rng.randrange(1950, 2025),
+            "runtime": rng.randrange(70, 200),
+            "poster_url": f"https://image.tmdb.org/t/p/w500/{movie_id}.jpg",
+        }
+        for movie_id in range(1, count + 1)
+    ]
+
+
+def sections_of(movies, sections, per_section, seed=0):
+    rng = random.Random(seed)
+    return {f"section{i}": rng.sample(movies, per_section) for i in range(sections)}
+
+
+def as_nodes(rows):
+    graph = Graph()
+    return [
+        Movie.inflate(Node(graph, f"4:bench:{row['movie_id']}", row["movie_id"], {"Movie"}, row))
+        for row in rows
+    ]
+
+
+def jsonify_response(lists):
+    return jsonify({
+        "sections": {
+            name: [MovieTransformer.transform(movie) for movie in movies]
+            for name, movies in lists.items()
+        }
+    })
+
+
+def encoder_response(lists, view):
+    return fast.json_response(fast.encode_object({
+        "sections": fast.encode_movie_lists(lists, view=view)
+    }))
+
+
+def per_call_us(fn, repeat):
+    number = max(1, repeat // 5)
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def bench(lists, view, repeat):
+    expected = jsonify_response(lists).get_data()
+    fast.compression_min_size = 0
+    actual = encoder_response(lists, view).get_data()
+    if actual != expected:
+        raise SystemExit(f"encoder output differs from jsonify ({view.__name__ if view else 'node'})")
+
+    def cold():
+        # New list objects, as after a cache refresh.
+        encoder_response({name: list(movies) for name, movies in lists.items()}, view)
+
+    result = {
+        "bytes": len(expected),
+        "jsonify_us": per_call_us(lambda: jsonify_response(lists), repeat),
+        "encoder_cold_us": per_call_us(cold, repeat),
+        "encoder_warm_us": per_call_us(lambda: encoder_response(lists, view), repeat),
+    }
+    result["gzip_us"] = per_call_us(
+        lambda: fast.gzip.compress(actual, compresslevel=fast.GZIP_LEVEL, mtime=0), repeat
+    )
+    result["gzip_bytes"] = len(fast.gzip.compress(actual, compresslevel=fast.GZIP_LEVEL, mtime=0))
+    with fast.current_app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        fast.compression_min_size = 1
+        result["gzip_cached_us"] = per_call_us(lambda: encoder_response(lists, view), repeat)
+    if fast.brotli is not None:
+        result["br_us"] = per_call_us(
+            lambda: fast.brotli.compress(actual, quality=fast.BROTLI_QUALITY), repeat
+        )
+        result["br_bytes"] = len(fast.brotli.compress(actual, quality=fast.BROTLI_QUALITY))
+    result["speedup_cold"] = result["jsonify_us"] / result["encoder_cold_us"]
+    result["speedup_warm"] = result["jsonify_us"] / result["encoder_warm_us"]
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare jsonify with the catalog JSON encoder.")
+    parser.add_argument("--sections", type=int, default=8, help="Sections per response")
+    parser.add_argument("--per-section", type=int, default=20, help="Movies per section")
+    parser.add_argument("--pool", type=int, default=60, help="Distinct movies the sections draw from")
+    parser.add_argument("--repeat", type=int, default=500, help="Responses timed per measurement")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rows = synthetic_properties(max(args.pool, args.per_section))
+    app = Flask(__name__)
+
+    results = {"sections": args.sections, "per_section": args.per_section, "pool": args.pool}
+    with app.test_request_context():
+        fast.section_arrays.max_entries = 2 * args.sections
+        results["node"] = bench(sections_of(as_nodes(rows), args.sections, args.per_section), None, args.repeat)
+        cards = [MovieCard.from_properties(row) for row in rows]
+        results["card"] = bench(sections_of(cards, args.sections, args.per_section), MovieCard, args.repeat)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
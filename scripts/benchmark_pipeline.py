@@ -0,0 +1,282 @@
+"""
+Offline benchmark of the data pipeline at several catalog sizes.
+
+For every scale a synthetic catalog is generated (see
+generate_synthetic_data.py) and each stage is timed with the peak resident
+memory of the process while it ran, without any database:
+
+    load        read the five CSVs (similarity.features.load_datasets)
+    featurize   build the sparse feature matrix
+    similarity  blockwise cosine products against the whole catalog
+    topk        per-block top-K selection (argpartition + ordering)
+    state       SimilarityState: id mapping and row fingerprints
+    serialize   SIMILAR_TO writer rows and batches, as sent to Neo4j
+    bulk_export streamed, deduplicated seeding of every node and
+                relationship into neo4j-admin import files
+
+``similarity`` and ``topk`` are the two halves of similarity.engine's
+score_rows, timed apart on one process; the production path fuses them
+per block and spreads blocks over workers. With ``--mode approx`` both are
+replaced by a single MinHash ``topk`` stage.
+
+Every scale runs in a fresh process, so memory left over from one scale
+never inflates the next. Memory is sampled from /proc/self/statm every
+few milliseconds, so timings carry no tracing overhead. Where /proc is missing, the process
+high-water mark (ru_maxrss) is recorded instead and only ever grows.
+
+Results go to a JSON file; ``--compare`` prints the change against an
+earlier one:
+
+    python scripts/benchmark_pipeline.py --scales 0.5 1 2
+    python scripts/benchmark_pipeline.py --scales 0.5 1 2 --compare artifacts/benchmarks/<old>.json
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import json
+import multiprocessing as mp
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+import pandas as pd
+import scipy
+
+from export_bulk_import import export
+from generate_synthetic_data import generate
+from similarity.ann import approximate_topk
+from similarity.engine import (
+    DEFAULT_MEMORY_BUDGET_MB, TOP_K, TopK, block_rows_for_budget, normalize_rows, select_topk
+)
+from similarity.features import DATASETS, build_features, load_datasets
+from similarity.incremental import SimilarityState
+from similarity.writer import SimilarityEdgeWriter, source_rows
+
+
+OUT_DIR = "artifacts/benchmarks"
+DEFAULT_SCALES = [0.5, 1.0, 2.0]
+REGRESSION_RATIO = 1.2
+
+MB = 1024 * 1024
+
+
+SAMPLE_INTERVAL = 0.005
+# Stages faster than this are too noisy to flag on time.
+MIN_COMPARED_SECONDS = 0.1
+
+
+def current_rss():
+    """Resident set size in bytes, or the high-water mark without /proc."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class StageTimer:
+    """Collects seconds and peak RSS per stage from a sampling thread."""
+
+    def __init__(self):
+        self.stages = {}
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @contextmanager
+    def stage(self, name):
+        before = self.peak = current_rss()
+        started = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - started
+        peak = max(self.peak, current_rss())
+
+        entry = self.stages.setdefault(name, {"seconds": 0.0, "peak_mb": 0.0, "peak_delta_mb": 0.0})
+        entry["seconds"] += seconds
+        entry["peak_mb"] = max(entry["peak_mb"], peak / MB)
+        entry["peak_delta_mb"] = max(entry["peak_delta_mb"], (peak - before) / MB)
+
+
+def exact_topk(X, k, timer, memory_budget_mb):
+    """score_rows, with the product and the selection timed separately."""
+    with timer.stage("similarity"):
+        Xn = normalize_rows(X)
+        XnT = Xn.T.tocsr()
+    n = Xn.shape[0]
+    k = min(k, n - 1)
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float64)
+
+    block = block_rows_for_budget(n, memory_budget_mb)
+    for start in range(0, n, block):
+        rows = np.arange(start, min(start + block, n))
+
+        with timer.stage("similarity"):
+            product = (Xn[rows] @ XnT).toarray()
+            product[np.arange(len(rows)), rows] = -np.inf
+
+        with timer.stage("topk"):
+            indices[rows], scores[rows] = select_topk(product, k)
+        del product
+
+    return TopK(indices, scores)
+
+
+def run_scale(label, data_dir, args):
+    with StageTimer() as timer:
+        with timer.stage("load"):
+            datasets = load_datasets(data_dir)
+
+        with timer.stage("featurize"):
+            features = build_features(datasets)
+        X = features.matrix
+
+        if args.mode == "approx":
+            with timer.stage("topk"):
+                topk = approximate_topk(
+                    X, k=args.top_k, n_label_columns=features.space.n_label_features,
+                    progress=False,
+                )
+        else:
+            topk = exact_topk(X, args.top_k, timer, args.memory_budget_mb)
+
+        with timer.stage("state"):
+            state = SimilarityState.from_run(features, topk)
+
+        with timer.stage("serialize"):
+            rows = source_rows(state)
+            batches = list(SimilarityEdgeWriter(None).batches(rows))
+
+        paths = {name: os.path.join(data_dir, f"{name}.csv") for name in DATASETS}
+        with tempfile.TemporaryDirectory() as tmp, timer.stage("bulk_export"):
+            export(paths, os.path.join(tmp, "import"), state=state, progress=False)
+
+    return {
+        "scale": label,
+        "rows": {name: len(df) for name, df in datasets.items()},
+        "features": {"shape": list(X.shape), "nnz": int(X.nnz)},
+        "edges": int((state.topk_ids >= 0).sum()),
+        "batches": len(batches),
+        "stages": timer.stages,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(args):
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "pandas": pd.__version__,
+        "args": vars(args),
+    }
+
+
+def compare(results, baseline):
+    """Prints the change of every stage against a previous result file."""
+    before = {(r["scale"], name): stats for r in baseline["runs"] for name, stats in r["stages"].items()}
+    print(f"\nAgainst {baseline['environment'].get('commit') or 'baseline'}:")
+    for run in results["runs"]:
+        for name, stats in run["stages"].items():
+            old = before.get((run["scale"], name))
+            if old is None:
+                continue
+            time_ratio = stats["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+            peak_ratio = stats["peak_mb"] / old["peak_mb"] if old["peak_mb"] else float("inf")
+            slower = time_ratio > REGRESSION_RATIO and old["seconds"] >= MIN_COMPARED_SECONDS
+            flag = "  REGRESSION" if slower or peak_ratio > REGRESSION_RATIO else ""
+            print(f"  scale {run['scale']:<6} {name:<12} time x{time_ratio:.2f}  "
+                  f"peak x{peak_ratio:.2f}{flag}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Time every offline pipeline stage at several scales.")
+    parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES,
+                        help="synthetic catalog sizes, as multiples of the current data set")
+    parser.add_argument("--data-dir", default=None,
+                        help="also benchmark this real data directory")
+    parser.add_argument("--work-dir", default=os.path.join(OUT_DIR, "data"),
+                        help="where generated catalogs are kept and reused")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=["exact", "approx"], default="exact")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--memory-budget-mb", type=int, default=DEFAULT_MEMORY_BUDGET_MB)
+    parser.add_argument("--output", default=None,
+                        help=f"result file (default: {OUT_DIR}/pipeline-<timestamp>.json)")
+    parser.add_argument("--compare", default=None,
+                        help="earlier result file to compare against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    targets = []
+    if args.data_dir:
+        targets.append(("data", args.data_dir))
+    for scale in args.scales:
+        data_dir = os.path.join(args.work_dir, f"scale-{scale:g}-seed-{args.seed}")
+        if not os.path.exists(os.path.join(data_dir, "directors.csv")):
+            print(f"Generating scale {scale:g} catalog in {data_dir}...")
+            generate(data_dir, scale=scale, seed=args.seed)
+        targets.append((scale, data_dir))
+
+    results = {"environment": environment(args), "runs": []}
+    for label, data_dir in targets:
+        print(f"Benchmarking scale {label}...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+            run = pool.submit(run_scale, label, data_dir, args).result()
+        results["runs"].append(run)
+        for name, stats in run["stages"].items():
+            print(f"  {name:<12} {stats['seconds']:8.2f}s  peak {stats['peak_mb']:8.1f} MB")
+
+    output = args.output or os.path.join(OUT_DIR, time.strftime("pipeline-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Version stamp of the catalog graph.
+
+The API keeps catalog sections in an in-process cache and polls
+(:CatalogMeta {name: "catalog"}).version every few seconds. Every script
+that changes the graph bumps the stamp when it is done, so running API
+processes drop their cached sections within one poll interval.
+"""
+
+
+def bump_catalog_version(tx):
+    tx.run("""
+        MERGE (c:CatalogMeta {name: 'catalog'})
+        SET c.version = coalesce(c.version, 0) + 1,
+            c.updated_at = datetime()
+    """)
+
+
+def publish_catalog_change(driver):
+    with driver.session() as session:
+        session.execute_write(bump_catalog_version)
+    print("Bumped the catalog version; API caches refresh on their next check.")
@@ -0,0 +1,250 @@
+"""
+Writes the whole graph as header-annotated CSVs for neo4j-admin's offline
+importer, so a first load is one offline step instead of hours of UNWIND
+batches:
+
+    python scripts/seed_similiarity.py --no-write   # optional, for SIMILAR_TO
+    python scripts/export_bulk_import.py            # prints the import command
+    neo4j-admin database import full ...            # with the database stopped
+    python scripts/seed_neo4j.py --indexes-only
+
+Nodes and relationships come from the same data/*.csv files as
+seed_neo4j.py and are deduplicated the same way as its --fresh mode.
+SIMILAR_TO comes from the state seed_similiarity.py leaves in
+artifacts/similarity. Movies are keyed by movie_id and Genre, Keyword and
+Person by name, their unique keys in the live graph.
+"""
+import argparse
+from itertools import chain
+import csv
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from seeding.stream import (
+    last_positions, last_values, latest_movies, new_nodes, new_pairs, read_chunks
+)
+from similarity.incremental import SimilarityState
+from similarity.pruning import SCORE_SCALE, prune_state, quantize_scores
+
+
+DATA_DIR = "data"
+DATASETS = ["movies", "genres", "keywords", "cast", "directors"]
+STATE_DIR = "artifacts/similarity"
+OUT_DIR = "artifacts/import"
+CHUNK = 10000
+
+
+# -------------------------------------------------------------------
+# FILE LAYOUTS
+# A bare :ID column keeps the id out of the properties, so movie_id
+# can be stored as a long alongside it.
+# -------------------------------------------------------------------
+MOVIE_HEADER = [
+    ":ID(Movie)", "movie_id:long", "title", "overview", "release_year:long",
+    "runtime:long", "vote_average:double", "vote_count:long", "popularity:double",
+    "poster_url", ":LABEL",
+]
+MOVIE_PROPERTIES = [
+    "movie_id", "title", "overview", "release_year", "runtime",
+    "vote_average", "vote_count", "popularity", "poster_url",
+]
+GENRE_HEADER = [":ID(Genre)", "name", ":LABEL"]
+KEYWORD_HEADER = [":ID(Keyword)", "name", ":LABEL"]
+PERSON_HEADER = [":ID(Person)", "name", "tmdb_id:long", ":LABEL"]
+
+HAS_GENRE_HEADER = [":START_ID(Movie)", ":END_ID(Genre)", ":TYPE"]
+HAS_KEYWORD_HEADER = [":START_ID(Movie)", ":END_ID(Keyword)", ":TYPE"]
+ACTED_IN_HEADER = [":START_ID(Person)", ":END_ID(Movie)", ":TYPE"]
+DIRECTED_HEADER = [":START_ID(Person)", ":END_ID(Movie)", ":TYPE"]
+SIMILAR_TO_HEADER = [":START_ID(Movie)", ":END_ID(Movie)", "score:double", ":TYPE"]
+SIMILAR_TO_QUANTIZED_HEADER = [":START_ID(Movie)", ":END_ID(Movie)", "score_q:long", ":TYPE"]
+
+
+def write_csv(path, header, chunks):
+    """Writes ``header`` and every chunk of row lists; returns the row count."""
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+
+def similar_to_chunks(state, movies, quantized):
+    """SIMILAR_TO rows from a SimilarityState, best neighbour first."""
+    valid = state.topk_ids >= 0
+    scores = quantize_scores(state.topk_scores, valid) if quantized else state.topk_scores
+
+    sources = np.repeat(state.movie_ids, valid.sum(axis=1))
+    targets = state.topk_ids[valid]
+    scores = scores[valid]
+
+    known = np.array(sorted(movies), dtype=np.int64)
+    keep = np.isin(sources, known) & np.isin(targets, known)
+    sources, targets, scores = sources[keep], targets[keep], scores[keep]
+
+    for i in range(0, len(sources), CHUNK):
+        yield [
+            [s, t, score, "SIMILAR_TO"]
+            for s, t, score in zip(
+                sources[i:i + CHUNK].tolist(),
+                targets[i:i + CHUNK].tolist(),
+                scores[i:i + CHUNK].tolist(),
+            )
+        ]
+
+
+def export(paths, out_dir, state=None, quantized=False, progress=True):
+    """
+    Writes every node and relationship file to ``out_dir``.
+
+    Returns:
+        list: ``(kind, path, rows)`` per file, kind being nodes or
+        relationships.
+    """
+    # Same key-only passes as seed_neo4j.py --fresh.
+    last = last_positions(paths["movies"], "movie_id", CHUNK)
+    movies = set(last)
+    person_ids = last_values(paths["cast"], "name", "person_id", CHUNK, movies)
+    people = set()
+
+    def read(name, columns=None):
+        return read_chunks(paths[name], CHUNK, columns)
+
+    def rows(chunks, to_row):
+        return ([to_row(r) for r in chunk] for chunk in chunks)
+
+    files = [
+        ("nodes", "movies.csv", MOVIE_HEADER, rows(
+            latest_movies(read("movies"), last),
+            lambda m: [m["movie_id"]] + [m[c] for c in MOVIE_PROPERTIES] + ["Movie"],
+        )),
+        ("nodes", "genres.csv", GENRE_HEADER, rows(
+            new_nodes(read("genres"), "genre", movies, set()),
+            lambda g: [g["name"], g["name"], "Genre"],
+        )),
+        ("nodes", "keywords.csv", KEYWORD_HEADER, rows(
+            new_nodes(read("keywords"), "keyword", movies, set()),
+            lambda k: [k["name"], k["name"], "Keyword"],
+        )),
+        ("nodes", "people.csv", PERSON_HEADER, rows(
+            chain(
+                new_nodes(read("cast"), "name", movies, people, person_ids),
+                new_nodes(read("directors"), "director", movies, people, {}),
+            ),
+            lambda p: [p["name"], p["name"], p["person_id"], "Person"],
+        )),
+        ("relationships", "has_genre.csv", HAS_GENRE_HEADER, rows(
+            new_pairs(read("genres", ["movie_id", "genre"]), ["movie_id", "genre"], movies),
+            lambda r: [r["movie_id"], r["genre"], "HAS_GENRE"],
+        )),
+        ("relationships", "has_keyword.csv", HAS_KEYWORD_HEADER, rows(
+            new_pairs(read("keywords", ["movie_id", "keyword"]), ["movie_id", "keyword"], movies),
+            lambda r: [r["movie_id"], r["keyword"], "HAS_KEYWORD"],
+        )),
+        ("relationships", "acted_in.csv", ACTED_IN_HEADER, rows(
+            new_pairs(read("cast", ["movie_id", "name"]), ["movie_id", "name"], movies),
+            lambda r: [r["name"], r["movie_id"], "ACTED_IN"],
+        )),
+        ("relationships", "directed.csv", DIRECTED_HEADER, rows(
+            new_pairs(read("directors", ["movie_id", "director"]), ["movie_id", "director"], movies),
+            lambda r: [r["director"], r["movie_id"], "DIRECTED"],
+        )),
+    ]
+    if state is not None:
+        files.append((
+            "relationships", "similar_to.csv",
+            SIMILAR_TO_QUANTIZED_HEADER if quantized else SIMILAR_TO_HEADER,
+            similar_to_chunks(state, movies, quantized),
+        ))
+
+    # Written next to the target and swapped in, so a failed export never
+    # leaves a half-written set of files behind.
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+    os.chmod(tmp, 0o755)  # neo4j-admin often runs as another user
+    try:
+        written = []
+        for kind, filename, header, chunks in files:
+            if progress:
+                print(f"Writing {filename}...")
+            count = write_csv(os.path.join(tmp, filename), header, chunks)
+            written.append((kind, os.path.join(out_dir, filename), count))
+
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.replace(tmp, out_dir)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    return written
+
+
+def import_command(files, database):
+    args = [f"neo4j-admin database import full {database}",
+            "--overwrite-destination", "--multiline-fields=true"]
+    args += [f"--{kind}={os.path.abspath(path)}" for kind, path, _ in files]
+    return " \\\n    ".join(args)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Write neo4j-admin bulk import files for the whole graph.")
+    parser.add_argument("--data-dir", default=DATA_DIR,
+                        help="directory holding the cleaned CSV files")
+    parser.add_argument("--state-dir", default=STATE_DIR,
+                        help="SIMILAR_TO lists saved by seed_similiarity.py")
+    parser.add_argument("--out-dir", default=OUT_DIR,
+                        help="where the import files are written (replaced)")
+    parser.add_argument("--database", default="neo4j",
+                        help="database name used in the printed import command")
+    parser.add_argument("--min-score", type=float, default=None,
+                        help="drop SIMILAR_TO edges scoring below this cosine similarity")
+    parser.add_argument("--relative-cutoff", type=float, default=None,
+                        help="per-movie K: drop neighbours below this fraction of the best score")
+    parser.add_argument("--min-k", type=int, default=1,
+                        help="neighbours always kept per movie by the cutoffs above")
+    parser.add_argument("--mutual", action="store_true",
+                        help="keep an edge only if the target also lists the source")
+    parser.add_argument("--quantize", action="store_true",
+                        help=f"store scores as integers (score_q = score * {SCORE_SCALE})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    paths = {name: os.path.join(args.data_dir, f"{name}.csv") for name in DATASETS}
+
+    state = SimilarityState.load(args.state_dir)
+    if state is None:
+        print(f"No similarity state in {args.state_dir}; SIMILAR_TO is not exported. "
+              "Run scripts/seed_similiarity.py --no-write first to include it.")
+    else:
+        state = prune_state(
+            state,
+            min_score=args.min_score,
+            relative_cutoff=args.relative_cutoff,
+            min_k=args.min_k,
+            mutual=args.mutual,
+        )
+
+    files = export(paths, args.out_dir, state=state, quantized=args.quantize)
+
+    for kind, path, rows in files:
+        print(f"{os.path.basename(path)}: {rows} {kind}")
+    print("\nWith the database stopped, run:\n")
+    print(import_command(files, args.database))
+    print("\nthen create constraints, indexes and section lists with:\n")
+    print("python scripts/seed_neo4j.py --indexes-only")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Writes synthetic movies/genres/keywords/cast/directors CSVs at any scale,
+shaped like the cleaned Kaggle export in data/:
+
+* genres follow the real genre mix, about 2.5 per movie,
+* keywords and actors are drawn from Zipf-like distributions, so a few
+  are everywhere and most appear once or twice,
+* cast lists are mostly capped at 10, most movies have one director and
+  some directors also act,
+* about 1% of the relationship rows are exact duplicates, as in the
+  real files.
+
+``--scale 1`` is roughly the size of the current data set (9.5k movies,
+92k cast rows, 57k keyword rows). Movies are generated in blocks and
+appended to the CSVs, so memory stays flat at 100x.
+
+    python scripts/generate_synthetic_data.py --scale 10 --out-dir artifacts/synthetic/x10
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+BASE_MOVIES = 9500
+BLOCK = 20000
+
+# Share of movies carrying each genre in the real data.
+GENRE_SHARES = {
+    "Drama": 0.510, "Comedy": 0.374, "Thriller": 0.260, "Action": 0.210,
+    "Romance": 0.183, "Horror": 0.145, "Crime": 0.137, "Adventure": 0.117,
+    "Science Fiction": 0.095, "Family": 0.091, "Fantasy": 0.075, "Mystery": 0.075,
+    "Animation": 0.061, "History": 0.040, "Music": 0.034, "War": 0.033,
+    "Documentary": 0.028, "Western": 0.023, "TV Movie": 0.015, "Foreign": 0.003,
+}
+
+# Zipf exponents fitted to the head of the real frequency tables, all
+# flatter than a classic s=1 Zipf.
+KEYWORD_ZIPF = 0.68
+ACTOR_ZIPF = 0.38
+DIRECTOR_ZIPF = 0.42
+
+# Distinct names per movie at scale 1. Keyword vocabularies grow
+# sublinearly with the catalog (Heaps' law), people roughly linearly.
+KEYWORDS_PER_MOVIE = 1.3
+KEYWORD_VOCAB_GROWTH = 0.7
+PEOPLE_PER_MOVIE = 4.2
+DIRECTORS_PER_MOVIE = 0.56
+DIRECTORS_WHO_ACT = 0.16
+
+KEYWORD_COVERAGE = 0.9
+MEAN_KEYWORDS = 6.7
+CAST_CAP = 10
+FULL_CAST_SHARE = 0.75
+DIRECTOR_COUNTS = {1: 0.928, 2: 0.062, 3: 0.006, 4: 0.004}
+DUPLICATE_RATE = 0.01
+MISSING_YEAR_RATE = 0.01
+
+
+def zipf_weights(n, s):
+    weights = 1.0 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+
+class Vocabulary:
+    """Names drawn by Zipf rank; rank order is shuffled against the name ids."""
+
+    def __init__(self, names, s, rng):
+        self.names = np.asarray(names, dtype=object)
+        self.p = zipf_weights(len(self.names), s)
+        rng.shuffle(self.names)
+
+    def sample(self, rng, size):
+        return self.names[rng.choice(len(self.names), size=size, p=self.p)]
+
+
+def sized_vocabularies(n_movies, rng):
+    scale = n_movies / BASE_MOVIES
+    n_keywords = max(int(BASE_MOVIES * KEYWORDS_PER_MOVIE * scale ** KEYWORD_VOCAB_GROWTH), 1)
+    n_people = max(int(n_movies * PEOPLE_PER_MOVIE), 1)
+    n_directors = max(int(n_movies * DIRECTORS_PER_MOVIE), 1)
+
+    keywords = Vocabulary([f"keyword {i}" for i in range(n_keywords)], KEYWORD_ZIPF, rng)
+    actors = Vocabulary(np.arange(n_people), ACTOR_ZIPF, rng)
+
+    # Directors are partly drawn from the actor pool, the rest are new people.
+    acting = int(n_directors * DIRECTORS_WHO_ACT)
+    directors = Vocabulary(
+        np.concatenate([
+            rng.choice(n_people, size=acting, replace=False),
+            np.arange(n_people, n_people + n_directors - acting),
+        ]),
+        DIRECTOR_ZIPF, rng,
+    )
+    return keywords, actors, directors
+
+
+def person_name(ids):
+    return [f"Person {i}" for i in ids]
+
+
+def with_duplicates(df, rng):
+    extra = df.sample(frac=DUPLICATE_RATE, random_state=int(rng.integers(2**31)))
+    return pd.concat([df, extra]).sort_index(kind="stable")
+
+
+def pairs(movie_ids, counts, vocabulary, rng):
+    """(movie_id, name) rows, ``counts[i]`` draws for movie i, repeats dropped."""
+    movies = np.repeat(movie_ids, counts)
+    df = pd.DataFrame({"movie_id": movies, "value": vocabulary.sample(rng, len(movies))})
+    return df.drop_duplicates().reset_index(drop=True)
+
+
+def movie_block(movie_ids, rng):
+    n = len(movie_ids)
+    year = np.clip(2024 - rng.exponential(30, n), 1950, 2024).round()
+    year[rng.random(n) < MISSING_YEAR_RATE] = np.nan
+    return pd.DataFrame({
+        "movie_id": movie_ids,
+        "title": [f"Movie {i}" for i in movie_ids],
+        "overview": [f"An overview of movie {i}" for i in movie_ids],
+        "release_year": year,
+        "runtime": np.clip(rng.normal(105, 25, n), 60, 240).round().astype(int),
+        "vote_average": np.clip(rng.normal(6.1, 1.2, n), 0, 10).round(1),
+        "vote_count": rng.lognormal(5, 1.8, n).astype(int),
+        "popularity": rng.lognormal(1, 1.1, n),
+        "poster_url": None,
+    })
+
+
+def genre_block(movie_ids, rng):
+    names = np.array(list(GENRE_SHARES))
+    has = rng.random((len(movie_ids), len(names))) < np.array(list(GENRE_SHARES.values()))
+    # Every movie gets at least one genre.
+    empty = ~has.any(axis=1)
+    shares = np.array(list(GENRE_SHARES.values()))
+    has[empty, rng.choice(len(names), size=empty.sum(), p=shares / shares.sum())] = True
+    rows, cols = np.nonzero(has)
+    return pd.DataFrame({"movie_id": movie_ids[rows], "genre": names[cols]})
+
+
+def keyword_block(movie_ids, keywords, rng):
+    counts = rng.geometric(1 / MEAN_KEYWORDS, len(movie_ids))
+    counts[rng.random(len(movie_ids)) > KEYWORD_COVERAGE] = 0
+    df = pairs(movie_ids, counts, keywords, rng)
+    return df.rename(columns={"value": "keyword"})
+
+
+def cast_block(movie_ids, actors, rng):
+    n = len(movie_ids)
+    counts = np.where(rng.random(n) < FULL_CAST_SHARE, CAST_CAP, rng.integers(4, CAST_CAP, n))
+    df = pairs(movie_ids, counts, actors, rng)
+    return pd.DataFrame({
+        "movie_id": df["movie_id"],
+        "person_id": df["value"].astype(np.int64) + 1,
+        "name": person_name(df["value"]),
+        "character": [f"Character {i}" for i in range(len(df))],
+    })
+
+
+def director_block(movie_ids, directors, rng):
+    sizes = np.array(list(DIRECTOR_COUNTS))
+    counts = rng.choice(sizes, size=len(movie_ids), p=np.array(list(DIRECTOR_COUNTS.values())))
+    df = pairs(movie_ids, counts, directors, rng)
+    return pd.DataFrame({"movie_id": df["movie_id"], "director": person_name(df["value"])})
+
+
+def generate(out_dir, scale=1.0, seed=0):
+    """
+    Writes the five CSVs to ``out_dir``.
+
+    Returns:
+        dict: Row count of every file.
+    """
+    rng = np.random.default_rng(seed)
+    n_movies = max(int(BASE_MOVIES * scale), 1)
+    keywords, actors, directors = sized_vocabularies(n_movies, rng)
+
+    os.makedirs(out_dir, exist_ok=True)
+    counts = dict.fromkeys(["movies", "genres", "keywords", "cast", "directors"], 0)
+
+    for start in range(0, n_movies, BLOCK):
+        movie_ids = np.arange(start, min(start + BLOCK, n_movies), dtype=np.int64) + 2
+        blocks = {
+            "movies": movie_block(movie_ids, rng),
+            "genres": with_duplicates(genre_block(movie_ids, rng), rng),
+            "keywords": with_duplicates(keyword_block(movie_ids, keywords, rng), rng),
+            "cast": with_duplicates(cast_block(movie_ids, actors, rng), rng),
+            "directors": with_duplicates(director_block(movie_ids, directors, rng), rng),
+        }
+        for name, df in blocks.items():
+            df.to_csv(os.path.join(out_dir, f"{name}.csv"), mode="w" if start == 0 else "a",
+                      header=start == 0, index=False)
+            counts[name] += len(df)
+
+    return counts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Write synthetic catalog CSVs at a chosen scale.")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help=f"catalog size as a multiple of {BASE_MOVIES} movies")
+    parser.add_argument("--out-dir", default=None,
+                        help="output directory (default: artifacts/synthetic/scale-<scale>)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    out_dir = args.out_dir or os.path.join("artifacts", "synthetic", f"scale-{args.scale:g}")
+
+    counts = generate(out_dir, scale=args.scale, seed=args.seed)
+    for name, rows in counts.items():
+        print(f"{name}: {rows} rows")
+    print(f"Wrote {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
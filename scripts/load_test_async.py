@@ -0,0 +1,225 @@
+"""
+Load test of the sync (Flask) and async (ASGI) serving paths against the
+in-memory catalog backend, with no database.
+
+Both paths serve the same seeded mix of requests — homepage catalogs with a
+few genre sections, and searches — from the seed CSVs in ``--data-dir``,
+every catalog query delayed by ``--latency`` seconds to stand in for the
+Neo4j round trip:
+
+    sync   the Flask WSGI app, called from ``--threads`` threads, as the
+           threaded server does
+    async  the ASGI app, called from ``--concurrency`` coroutines on one
+           event loop, as one uvicorn worker does
+
+Requests are made in process, so the numbers leave out the HTTP server and
+the network. The section cache is off unless ``--cache`` is given, so
+every request reaches the backend. Requests/sec and p50/p95/p99 latency
+are printed per mode and written to a JSON file:
+
+    python scripts/load_test_async.py --requests 2000 --latency 0.01 --threads 16 --concurrency 64
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+OUT_DIR = "artifacts/benchmarks"
+MODES = ("sync", "async")
+
+
+def configure(args):
+    """Points the app at the memory backend; must run before importing it."""
+    os.environ.update({
+        "CATALOG_BACKEND": "memory",
+        "CATALOG_DATA_DIR": args.data_dir,
+        "CATALOG_MEMORY_LATENCY": str(args.latency),
+        "CATALOG_SNAPSHOT_PATH": "",
+        "SECTION_CACHE_ENABLED": str(args.cache),
+        "SECTION_CACHE_VERSION_CHECK": "0",
+        "SIMILARITY_ENGINE_ENABLED": str(args.similarity_engine),
+        "SEARCH_ENGINE_ENABLED": str(args.search_engine),
+    })
+
+
+def wait_for_engines(timeout=60):
+    """Waits for the enabled in-memory indexes to finish their first build."""
+    from app.services.search_engine import search_engine
+    from app.services.similarity_engine import similarity_engine
+
+    deadline = time.monotonic() + timeout
+    for engine in (similarity_engine, search_engine):
+        while engine.enabled and engine.index is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+
+def request_mix(catalog, count, search_ratio, seed=0):
+    """``count`` seeded (path, query string) pairs."""
+    rng = random.Random(seed)
+    genres = [name for name in catalog.section_lists() if name not in ("popular", "trending", "topRated")]
+    words = sorted({
+        word for movie in rng.sample(list(catalog.movies.values()), min(200, len(catalog.movies)))
+        for word in (movie["title"] or "").split() if len(word) > 2
+    })
+
+    requests = []
+    for _ in range(count):
+        if rng.random() < search_ratio:
+            word = rng.choice(words)
+            requests.append(("/api/catalog/search", f"q={word[:rng.randint(3, len(word))]}"))
+        else:
+            sections = rng.sample(genres, min(len(genres), rng.randint(1, 4)))
+            requests.append(("/api/catalog/", f"sections={','.join(sections)}&view=card"))
+    return requests
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, seconds):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "rps": len(latencies) / seconds if seconds else None,
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p95_ms": percentile(latencies, 95) * 1e3,
+        "p99_ms": percentile(latencies, 99) * 1e3,
+    }
+
+
+def run_sync(flask_app, requests, threads):
+    client = flask_app.test_client()
+    lock = threading.Lock()
+    latencies, errors = [], 0
+
+    def call(request):
+        nonlocal errors
+        path, query = request
+        started = time.perf_counter()
+        response = client.get(f"{path}?{query}")
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            errors += response.status_code != 200
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, requests))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_async(asgi_app, requests, concurrency):
+    latencies, errors = [], 0
+    queue = iter(requests)
+
+    async def call(path, query):
+        status = None
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        scope = {
+            "type": "http", "method": "GET", "path": path,
+            "query_string": query.encode("ascii"), "headers": [],
+        }
+        await asgi_app(scope, receive, send)
+        return status
+
+    async def worker():
+        nonlocal errors
+        for path, query in queue:
+            started = time.perf_counter()
+            status = await call(path, query)
+            latencies.append(time.perf_counter() - started)
+            errors += status != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare the sync and async serving paths under load.")
+    parser.add_argument("--data-dir", default="data", help="directory with movies.csv and genres.csv")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per mode")
+    parser.add_argument("--latency", type=float, default=0.01,
+                        help="seconds added to every catalog query")
+    parser.add_argument("--threads", type=int, default=16, help="sync mode worker threads")
+    parser.add_argument("--concurrency", type=int, default=64, help="async mode concurrent requests")
+    parser.add_argument("--search-ratio", type=float, default=0.3, help="share of search requests")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--cache", action="store_true", help="keep the section cache on")
+    parser.add_argument("--similarity-engine", action="store_true",
+                        help="serve recommendations from the in-memory similarity index")
+    parser.add_argument("--search-engine", action="store_true",
+                        help="serve search from the in-process BM25 index")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help=f"result file (default: {OUT_DIR}/load-<timestamp>.json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(os.path.join(args.data_dir, "movies.csv")):
+        raise SystemExit(
+            f"No movies.csv in {args.data_dir}; generate a catalog with "
+            f"python scripts/generate_synthetic_data.py, then pass --data-dir"
+        )
+    configure(args)
+
+    from app.asgi import create_asgi_app
+    from app.repositories.backend import catalog_backend
+
+    asgi_app = create_asgi_app()
+    wait_for_engines()
+    requests = request_mix(catalog_backend.repository.catalog, args.requests, args.search_ratio, args.seed)
+
+    results = {
+        "environment": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args),
+        },
+        "modes": {},
+    }
+    for mode in args.modes:
+        print(f"Running {mode} ({len(requests)} requests)...")
+        if mode == "sync":
+            stats = run_sync(asgi_app.flask_app, requests, args.threads)
+        else:
+            stats = asyncio.run(run_async(asgi_app, requests, args.concurrency))
+        results["modes"][mode] = stats
+        print(f"  {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:7.1f} ms  "
+              f"p95 {stats['p95_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms  errors {stats['errors']}")
+
+    output = args.output or os.path.join(OUT_DIR, time.strftime("load-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
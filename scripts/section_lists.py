@@ -0,0 +1,141 @@
+"""
+Precomputed catalog sections.
+
+Ranks the top movies for popular, trending, top-rated and every genre in
+the graph once, and stores each ranking as a list of movie ids:
+
+    (:SectionList {name: "scienceFiction", title: "Science Fiction",
+                   kind: "genre", position: 11, movie_ids: [...]})
+
+The API serves /api/catalog sections from these lists, so a section read
+costs the same whatever the catalog size, and a new genre becomes a
+section (named by camelCasing the genre) as soon as the lists are rebuilt.
+seed_neo4j.py rebuilds them after every load; run this script directly
+after changing the graph any other way:
+
+    python scripts/section_lists.py
+"""
+import argparse
+import os
+import re
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase
+
+from catalog_version import publish_catalog_change
+
+load_dotenv()
+
+
+SECTION_LIST_SIZE = 100
+
+# name -> (title, query returning the ranked movie ids as `ids`). Ties are
+# broken by movie_id, as the API's keyset pages continue these lists.
+FIXED_SECTIONS = {
+    "popular": ("Popular", """
+        MATCH (m:Movie) WHERE m.popularity IS NOT NULL
+        WITH m ORDER BY m.popularity DESC, m.movie_id LIMIT $size
+        RETURN collect(m.movie_id) AS ids
+    """),
+    "trending": ("Trending", """
+        MATCH (m:Movie) WHERE m.release_year >= 2020 AND m.popularity IS NOT NULL
+        WITH m ORDER BY m.popularity DESC, m.movie_id LIMIT $size
+        RETURN collect(m.movie_id) AS ids
+    """),
+    "topRated": ("Top Rated", """
+        MATCH (m:Movie) WHERE m.vote_count > 500 AND m.vote_average IS NOT NULL
+        WITH m ORDER BY m.vote_average DESC, m.movie_id LIMIT $size
+        RETURN collect(m.movie_id) AS ids
+    """),
+}
+
+GENRE_SECTIONS = """
+    MATCH (g:Genre)
+    CALL {
+        WITH g
+        MATCH (g)<-[:HAS_GENRE]-(m:Movie) WHERE m.popularity IS NOT NULL
+        WITH m ORDER BY m.popularity DESC, m.movie_id LIMIT $size
+        RETURN collect(m.movie_id) AS ids
+    }
+    RETURN g.name AS genre, ids ORDER BY genre
+"""
+
+
+def section_slug(genre):
+    """'Science Fiction' -> 'scienceFiction', 'TV Movie' -> 'tvMovie'."""
+    words = [w for w in re.split(r"[^0-9A-Za-z]+", genre) if w]
+    if not words:
+        return None
+    return words[0].lower() + "".join(w[:1].upper() + w[1:].lower() for w in words[1:])
+
+
+def rank_sections(tx, size):
+    lists = []
+    for name, (title, query) in FIXED_SECTIONS.items():
+        ids = tx.run(query, size=size).single()["ids"]
+        lists.append({"name": name, "title": title, "kind": "fixed", "genre": None, "movie_ids": ids})
+
+    for record in tx.run(GENRE_SECTIONS, size=size):
+        slug = section_slug(record["genre"])
+        if slug is None or slug in FIXED_SECTIONS:
+            continue
+        lists.append({
+            "name": slug, "title": record["genre"], "kind": "genre",
+            "genre": record["genre"], "movie_ids": record["ids"],
+        })
+
+    for position, section in enumerate(lists):
+        section["position"] = position
+    return lists
+
+
+def store_sections(tx, lists):
+    """Replaces every SectionList with ``lists``."""
+    tx.run("""
+        UNWIND $lists AS l
+        MERGE (s:SectionList {name: l.name})
+        SET s.title = l.title,
+            s.kind = l.kind,
+            s.genre = l.genre,
+            s.position = l.position,
+            s.movie_ids = l.movie_ids,
+            s.updated_at = datetime()
+    """, lists=lists)
+    tx.run("""
+        MATCH (s:SectionList) WHERE NOT s.name IN $names
+        DETACH DELETE s
+    """, names=[l["name"] for l in lists])
+
+
+def build_section_lists(driver, size=SECTION_LIST_SIZE):
+    """Ranks and stores every section; returns the number of lists."""
+    with driver.session() as session:
+        lists = session.execute_read(rank_sections, size)
+        session.execute_write(store_sections, lists)
+    print(f"Stored {len(lists)} section lists (top {size} each).")
+    return len(lists)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rebuild the precomputed catalog sections.")
+    parser.add_argument("--size", type=int, default=SECTION_LIST_SIZE,
+                        help="movies kept per section")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+    )
+    driver.verify_connectivity()
+
+    build_section_lists(driver, args.size)
+    publish_catalog_change(driver)
+    driver.close()
+
+
+if __name__ == "__main__":
+    main()
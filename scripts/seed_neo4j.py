@@ -1,35 +1,24 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from neo4j import GraphDatabase
-import pandas as pd
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
-
-# -------------------------------------------------------------------
-# LOAD CLEANED CSV FILES (from your data/)
-# -------------------------------------------------------------------
-movies_df = pd.read_csv("data/movies.csv")
-genres_df = pd.read_csv("data/genres.csv")
-keywords_df = pd.read_csv("data/keywords.csv")
-cast_df = pd.read_csv("data/cast.csv")
-directors_df = pd.read_csv("data/directors.csv")
-
-# -------------------------------------------------------------------
-# CONNECT TO NEO4J
-# -------------------------------------------------------------------
-driver = GraphDatabase.driver(
-    os.getenv("NEO4J_URI"),
-    auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+from catalog_version import publish_catalog_change
+from section_lists import build_section_lists
+from seeding.pipeline import DEFAULT_CHECKPOINT, Checkpoint, input_signature, run_stage
+from seeding.stream import (
+    last_positions, last_values, latest_movies, new_nodes, new_pairs, read_chunks
 )
 
-driver.verify_connectivity()
-print("Connected to Neo4j database.")
+load_dotenv()
 
 
 # -------------------------------------------------------------------
 # CREATE INDEXES (USE YOUR WORKING FULLTEXT SYNTAX)
 # -------------------------------------------------------------------
-def create_indexes(tx):
+def create_fulltext_index(tx):
 
     # YOUR WORKING FULLTEXT SYNTAX (unchanged)
     tx.run("""
@@ -37,6 +26,19 @@ def create_indexes(tx):
         FOR (m:Movie) ON EACH [m.title, m.overview]
     """)
 
+
+def create_range_indexes(tx):
+    # Catalog sections sort and filter on these, and page with
+    # `m.<key> <= $anchor` range seeks (keyset pagination).
+    for prop in ["popularity", "vote_average", "vote_count", "release_year"]:
+        tx.run(f"""
+            CREATE INDEX movie_{prop} IF NOT EXISTS
+            FOR (m:Movie) ON (m.{prop})
+        """)
+
+
+def create_constraints(tx):
+
     tx.run("""
         CREATE CONSTRAINT movie_id_unique IF NOT EXISTS
         FOR (m:Movie) REQUIRE m.movie_id IS UNIQUE
@@ -57,6 +59,17 @@ def create_indexes(tx):
         FOR (p:Person) REQUIRE p.name IS UNIQUE
     """)
 
+    tx.run("""
+        CREATE CONSTRAINT section_list_unique IF NOT EXISTS
+        FOR (s:SectionList) REQUIRE s.name IS UNIQUE
+    """)
+
+
+def create_indexes(tx):
+    create_fulltext_index(tx)
+    create_range_indexes(tx)
+    create_constraints(tx)
+
 
 # -------------------------------------------------------------------
 # SEED MOVIES
@@ -127,48 +140,317 @@ def seed_directors(tx, rows):
 
 
 # -------------------------------------------------------------------
-# CHUNKING UTILITY
+# FRESH LOAD: CREATE-ONLY NODES AND RELATIONSHIPS
+# Only valid on an empty graph; nothing here checks for existing data.
 # -------------------------------------------------------------------
-CHUNK = 400
-SIM_CHUNK = 50
+def create_movies(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        CREATE (m:Movie {movie_id: row.movie_id})
+        SET m.title = row.title,
+            m.overview = row.overview,
+            m.release_year = row.release_year,
+            m.runtime = row.runtime,
+            m.vote_average = row.vote_average,
+            m.vote_count = row.vote_count,
+            m.popularity = row.popularity,
+            m.poster_url = row.poster_url
+    """, rows=rows)
 
-def chunkify(df):
-    for i in range(0, len(df), CHUNK):
-        yield df.iloc[i:i+CHUNK].to_dict("records")
 
-def chunkify_list(lst, size):
-    for i in range(0, len(lst), size):
-        yield lst[i:i + size]
+def create_genre_nodes(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        CREATE (:Genre {name: row.name})
+    """, rows=rows)
 
 
+def create_keyword_nodes(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        CREATE (:Keyword {name: row.name})
+    """, rows=rows)
+
+
+def create_person_nodes(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        CREATE (p:Person {name: row.name})
+        SET p.tmdb_id = row.person_id
+    """, rows=rows)
+
+
+def create_has_genre(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (m:Movie {movie_id: row.movie_id})
+        MATCH (g:Genre {name: row.genre})
+        CREATE (m)-[:HAS_GENRE]->(g)
+    """, rows=rows)
+
+
+def create_has_keyword(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (m:Movie {movie_id: row.movie_id})
+        MATCH (k:Keyword {name: row.keyword})
+        CREATE (m)-[:HAS_KEYWORD]->(k)
+    """, rows=rows)
+
+
+def create_acted_in(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (m:Movie {movie_id: row.movie_id})
+        MATCH (p:Person {name: row.name})
+        CREATE (p)-[:ACTED_IN]->(m)
+    """, rows=rows)
+
+
+def create_directed(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (m:Movie {movie_id: row.movie_id})
+        MATCH (p:Person {name: row.director})
+        CREATE (p)-[:DIRECTED]->(m)
+    """, rows=rows)
+
 
 # -------------------------------------------------------------------
-# RUN IMPORT PROCESS
+# FRESH LOAD REPLAYS: MERGE FORMS OF THE CREATES ABOVE
+# Used for the one chunk that may already have committed before a
+# resumed run's checkpoint caught up.
 # -------------------------------------------------------------------
-with driver.session() as session:
+def merge_genre_nodes(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        MERGE (:Genre {name: row.name})
+    """, rows=rows)
+
 
-    print("Creating indexes and constraints...")
-    session.execute_write(create_indexes)
+def merge_keyword_nodes(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        MERGE (:Keyword {name: row.name})
+    """, rows=rows)
 
-    print("Seeding movies...")
-    for chunk in chunkify(movies_df):
-        session.execute_write(seed_movies, chunk)
 
-    print("Seeding genres...")
-    for chunk in chunkify(genres_df):
-        session.execute_write(seed_genres, chunk)
+def merge_person_nodes(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        MERGE (p:Person {name: row.name})
+        SET p.tmdb_id = row.person_id
+    """, rows=rows)
 
-    print("Seeding keywords...")
-    for chunk in chunkify(keywords_df):
-        session.execute_write(seed_keywords, chunk)
 
-    print("Seeding cast...")
-    for chunk in chunkify(cast_df):
-        session.execute_write(seed_cast, chunk)
+def merge_acted_in(tx, rows):
+    tx.run("""
+        UNWIND $rows AS row
+        MATCH (m:Movie {movie_id: row.movie_id})
+        MATCH (p:Person {name: row.name})
+        MERGE (p)-[:ACTED_IN]->(m)
+    """, rows=rows)
 
-    print("Seeding directors...")
-    for chunk in chunkify(directors_df):
-        session.execute_write(seed_directors, chunk)
 
+# -------------------------------------------------------------------
+# CHUNKING UTILITY
+# -------------------------------------------------------------------
+DATA_DIR = "data"
+DATASETS = ["movies", "genres", "keywords", "cast", "directors"]
+
+CHUNK = 400
+SIM_CHUNK = 50
+NODE_CHUNK = 10000
+REL_WORKERS = 4
+
+def chunkify_list(lst, size):
+    for i in range(0, len(lst), size):
+        yield lst[i:i + size]
 
-print("Done! Graph imported successfully with advanced similarity.")
+
+# -------------------------------------------------------------------
+# FRESH LOAD
+# -------------------------------------------------------------------
+def partition_by_movie(rows, workers):
+    """
+    Splits relationship rows so that every movie belongs to exactly one
+    worker. The other endpoints (genres, popular keywords, prolific
+    people) are dense nodes, which Neo4j lets concurrent transactions
+    extend without taking the node lock.
+    """
+    lanes = [[] for _ in range(workers)]
+    for row in rows:
+        lanes[row["movie_id"] % workers].append(row)
+    return [lane for lane in lanes if lane]
+
+
+def write_parallel(pool, driver, work, rows, workers=REL_WORKERS):
+    def run(lane):
+        with driver.session() as session:
+            session.execute_write(work, lane)
+
+    for future in [pool.submit(run, lane) for lane in partition_by_movie(rows, workers)]:
+        future.result()
+
+
+def fresh_load(driver, paths, checkpoint, workers):
+    # Small key-only passes: which movies exist (and their last row),
+    # and the tmdb_id each person ends up with under MERGE + SET.
+    last = last_positions(paths["movies"], "movie_id", NODE_CHUNK)
+    movies = set(last)
+    person_ids = last_values(paths["cast"], "name", "person_id", NODE_CHUNK, movies)
+    people = set()
+
+    reports = []
+    with driver.session() as session:
+        reports.append(run_stage(
+            checkpoint, "movies",
+            latest_movies(read_chunks(paths["movies"], NODE_CHUNK), last),
+            partial(session.execute_write, create_movies),
+            replay=partial(session.execute_write, seed_movies),
+        ))
+        for name, path, column, create, merge, seen, ids in [
+            ("genre nodes", paths["genres"], "genre",
+             create_genre_nodes, merge_genre_nodes, set(), None),
+            ("keyword nodes", paths["keywords"], "keyword",
+             create_keyword_nodes, merge_keyword_nodes, set(), None),
+            ("actor nodes", paths["cast"], "name",
+             create_person_nodes, merge_person_nodes, people, person_ids),
+            ("director nodes", paths["directors"], "director",
+             create_person_nodes, merge_person_nodes, people, {}),
+        ]:
+            reports.append(run_stage(
+                checkpoint, name,
+                new_nodes(read_chunks(path, NODE_CHUNK), column, movies, seen, ids),
+                partial(session.execute_write, create),
+                replay=partial(session.execute_write, merge),
+                shared_state=seen is people,
+            ))
+
+        # Built on the loaded data in one pass; relationship MATCHes need them.
+        print("Creating constraints...")
+        session.execute_write(create_constraints)
+
+    # Each chunk gives every worker about CHUNK rows in its own transaction.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, path, columns, create, merge in [
+            ("HAS_GENRE", paths["genres"], ["movie_id", "genre"],
+             create_has_genre, seed_genres),
+            ("HAS_KEYWORD", paths["keywords"], ["movie_id", "keyword"],
+             create_has_keyword, seed_keywords),
+            ("ACTED_IN", paths["cast"], ["movie_id", "name"],
+             create_acted_in, merge_acted_in),
+            ("DIRECTED", paths["directors"], ["movie_id", "director"],
+             create_directed, seed_directors),
+        ]:
+            reports.append(run_stage(
+                checkpoint, name,
+                new_pairs(read_chunks(path, CHUNK * workers, columns), columns, movies),
+                partial(write_parallel, pool, driver, create, workers=workers),
+                replay=partial(write_parallel, pool, driver, merge, workers=workers),
+            ))
+
+    with driver.session() as session:
+        print("Creating full-text and range indexes...")
+        session.execute_write(create_fulltext_index)
+        session.execute_write(create_range_indexes)
+
+    return reports
+
+
+def merge_load(driver, paths, checkpoint):
+    # Every statement here is a MERGE, so replaying a chunk is harmless.
+    reports = []
+    with driver.session() as session:
+
+        print("Creating indexes and constraints...")
+        session.execute_write(create_indexes)
+
+        for name, work in [
+            ("movies", seed_movies),
+            ("genres", seed_genres),
+            ("keywords", seed_keywords),
+            ("cast", seed_cast),
+            ("directors", seed_directors),
+        ]:
+            reports.append(run_stage(
+                checkpoint, name, read_chunks(paths[name], CHUNK),
+                partial(session.execute_write, work),
+            ))
+
+    return reports
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the movie graph from data/*.csv.")
+    parser.add_argument("--data-dir", default=DATA_DIR,
+                        help="directory holding the cleaned CSV files")
+    parser.add_argument("--fresh", action="store_true",
+                        help="bulk CREATE into an EMPTY graph: deduplicated nodes, parallel "
+                             "relationship loading, constraints and indexes built afterwards")
+    parser.add_argument("--workers", type=int, default=REL_WORKERS,
+                        help="parallel sessions for relationship loading in --fresh mode")
+    parser.add_argument("--indexes-only", action="store_true",
+                        help="only create constraints, the full-text and range indexes and "
+                             "the section lists (after an offline bulk import)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                        help="progress file used to resume an interrupted load")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore an existing checkpoint and load everything again")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # -------------------------------------------------------------------
+    # CONNECT TO NEO4J
+    # -------------------------------------------------------------------
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+    )
+
+    driver.verify_connectivity()
+    print("Connected to Neo4j database.")
+
+    # -------------------------------------------------------------------
+    # RUN IMPORT PROCESS
+    # -------------------------------------------------------------------
+    if args.indexes_only:
+        with driver.session() as session:
+            print("Creating indexes and constraints...")
+            session.execute_write(create_indexes)
+        # Usually run right after a bulk import, which the API has not seen.
+        build_section_lists(driver)
+        publish_catalog_change(driver)
+        driver.close()
+        return
+
+    paths = {name: os.path.join(args.data_dir, f"{name}.csv") for name in DATASETS}
+    signature = {
+        "mode": "fresh" if args.fresh else "merge",
+        "chunk": CHUNK,
+        "node_chunk": NODE_CHUNK,
+        "workers": args.workers if args.fresh else None,
+        "inputs": input_signature(paths),
+    }
+    checkpoint = Checkpoint.open(args.checkpoint, signature, restart=args.restart)
+
+    if args.fresh:
+        reports = fresh_load(driver, paths, checkpoint, workers=args.workers)
+    else:
+        reports = merge_load(driver, paths, checkpoint)
+
+    build_section_lists(driver)
+    publish_catalog_change(driver)
+    driver.close()
+    checkpoint.clear()
+
+    for report in reports:
+        print(report)
+    print("Done! Graph imported successfully with advanced similarity.")
+
+
+if __name__ == "__main__":
+    main()
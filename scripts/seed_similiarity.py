@@ -1,181 +1,220 @@
-import pandas as pd
-import numpy as np
-from sklearn.preprocessing import MultiLabelBinarizer, StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
+import argparse
 from neo4j import GraphDatabase
-from tqdm import tqdm
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
-
-
-# ----------------------------------------------------------
-# LOAD YOUR PROCESSED DATA
-# ----------------------------------------------------------
-movies_df = pd.read_csv("data/movies.csv")
-genres_df = pd.read_csv("data/genres.csv")
-keywords_df = pd.read_csv("data/keywords.csv")
-cast_df = pd.read_csv("data/cast.csv")
-directors_df = pd.read_csv("data/directors.csv")
-
-print("Loaded datasets.")
-
-
-# ----------------------------------------------------------
-# PREP FEATURE TABLES
-# ----------------------------------------------------------
-print("Preparing feature lists...")
-
-movie_ids = movies_df["movie_id"].tolist()
-
-movie_to_genres = genres_df.groupby("movie_id")["genre"].apply(list)
-movie_to_keywords = keywords_df.groupby("movie_id")["keyword"].apply(list)
-movie_to_actors = cast_df.groupby("movie_id")["name"].apply(list)
-movie_to_directors = directors_df.groupby("movie_id")["director"].apply(list)
-
-
-# Ensure lists (avoid missing entries)
-def safe_get(mapping, movie_id):
-    return mapping[movie_id] if movie_id in mapping.index else []
-
-
-# ----------------------------------------------------------
-# BUILD STRUCTURED FEATURE TABLE
-# ----------------------------------------------------------
-data = []
-
-for _, row in movies_df.iterrows():
-    mid = row["movie_id"]
-
-    data.append({
-        "movie_id": mid,
-        "genres": safe_get(movie_to_genres, mid),
-        "keywords": safe_get(movie_to_keywords, mid),
-        "actors": safe_get(movie_to_actors, mid),
-        "directors": safe_get(movie_to_directors, mid),
-        "year": row["release_year"],
-        "rating": row["vote_average"],
-        "popularity": row["popularity"]
-    })
-
-features_df = pd.DataFrame(data)
-
-
-# ----------------------------------------------------------
-# LIMIT ACTORS TO TOP 2000 (avoid huge vectors)
-# ----------------------------------------------------------
-TOP_ACTORS = 2000
-
-actor_counts = cast_df["name"].value_counts().head(TOP_ACTORS).index
-features_df["actors"] = features_df["actors"].apply(
-    lambda lst: [a for a in lst if a in actor_counts]
+from catalog_version import publish_catalog_change
+from similarity.features import build_features, load_datasets
+from similarity.engine import DEFAULT_MEMORY_BUDGET_MB, TOP_K, topk_similar
+from similarity.ann import (
+    DEFAULT_TABLES, DEFAULT_WINDOW, approximate_topk, recall_at_k
 )
-
-
-# ----------------------------------------------------------
-# VECTORIZE MULTI-LABEL COLUMNS
-# ----------------------------------------------------------
-def binarize_column(column_values):
-    mlb = MultiLabelBinarizer()
-    return mlb.fit_transform(column_values), mlb
-
-
-genre_matrix, genre_mlb = binarize_column(features_df["genres"])
-keyword_matrix, keyword_mlb = binarize_column(features_df["keywords"])
-actor_matrix, actor_mlb = binarize_column(features_df["actors"])
-director_matrix, director_mlb = binarize_column(features_df["directors"])
-
-print("Vectorized multi-label features.")
-
-
-# ----------------------------------------------------------
-# NORMALIZE NUMERIC FEATURES
-# ----------------------------------------------------------
-numeric = features_df[["year", "rating", "popularity"]].fillna(0)
-scaler = StandardScaler()
-numeric_matrix = scaler.fit_transform(numeric)
-
-print("Normalized numeric features.")
-
-
-# ----------------------------------------------------------
-# CONCATENATE ALL FEATURES INTO FINAL VECTORS
-# ----------------------------------------------------------
-X = np.hstack([
-    genre_matrix * 5,         # weighted genres
-    keyword_matrix * 3,       # weighted keywords
-    actor_matrix * 8,         # weighted actors
-    director_matrix * 4,      # weighted directors
-    numeric_matrix            # year, rating, popularity
-])
-
-print("Final feature matrix shape:", X.shape)
-
-
-# ----------------------------------------------------------
-# COMPUTE COSINE SIMILARITY
-# ----------------------------------------------------------
-print("Computing cosine similarity...")
-
-cos_sim = cosine_similarity(X)
-
-print("Similarity matrix computed.")
-
-
-# ----------------------------------------------------------
-# SELECT TOP-K SIMILAR MOVIES
-# ----------------------------------------------------------
-TOP_K = 20
-similarity_results = []
-
-print("Selecting top-K similar movies...")
-
-for i, mid in enumerate(tqdm(movie_ids)):
-    sim_scores = cos_sim[i]
-    top_indices = sim_scores.argsort()[::-1][1:TOP_K + 1]
-
-    for idx in top_indices:
-        similarity_results.append({
-            "m1": mid,
-            "m2": movie_ids[idx],
-            "score": float(sim_scores[idx])
-        })
-
-print(f"Generated {len(similarity_results)} similarity pairs.")
-
-
-# ----------------------------------------------------------
-# WRITE SIMILARITY EDGES TO NEO4J
-# ----------------------------------------------------------
-print("Connecting to Neo4j...")
-
-driver = GraphDatabase.driver(
-    os.getenv("NEO4J_URI"),
-    auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+from similarity.artifacts import DEFAULT_ARTIFACT_DIR, ArtifactStore, feature_key
+from similarity.incremental import (
+    SimilarityState, detect_changes, edge_diff, needs_update, update_topk
+)
+from similarity.pruning import SCORE_SCALE, prune_state
+from similarity.writer import (
+    DEFAULT_WORKERS, EDGES_PER_BATCH, SimilarityEdgeWriter, source_rows
 )
 
-driver.verify_connectivity()
-print("Connected.")
-
-
-def write_similarity_batch(tx, batch):
-    tx.run("""
-        UNWIND $rows AS row
-        MATCH (m1:Movie {movie_id: row.m1})
-        MATCH (m2:Movie {movie_id: row.m2})
-        MERGE (m1)-[s:SIMILAR_TO]->(m2)
-        SET s.score = row.score
-    """, rows=batch)
-
-
-BATCH = 500
-
-print("Writing SIMILAR_TO edges...")
+load_dotenv()
 
-for i in range(0, len(similarity_results), BATCH):
-    batch = similarity_results[i:i + BATCH]
-    with driver.session() as session:
-        session.execute_write(write_similarity_batch, batch)
 
-print("DONE. Vector-based SIMILAR_TO edges created!")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compute and write SIMILAR_TO edges.")
+    parser.add_argument("--top-k", type=int, default=TOP_K,
+                        help="similar movies kept per movie")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="similarity worker processes (default: CPU count)")
+    parser.add_argument("--memory-budget-mb", type=int, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help="scratch memory for similarity blocks across all workers")
+    parser.add_argument("--mode", choices=["exact", "approx"], default="exact",
+                        help="exact blockwise top-K or MinHash candidates + exact re-scoring")
+    parser.add_argument("--ann-tables", type=int, default=DEFAULT_TABLES,
+                        help="MinHash tables in approx mode (more = better recall)")
+    parser.add_argument("--ann-window", type=int, default=DEFAULT_WINDOW,
+                        help="neighbours paired per movie in each MinHash bucket")
+    parser.add_argument("--recall-sample", type=int, default=500,
+                        help="rows checked against the exact path in approx mode (0 = skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rescore movies added/changed since the last run "
+                             "and write the SIMILAR_TO diff")
+    parser.add_argument("--state-dir", default="artifacts/similarity",
+                        help="where each run leaves its state for the next incremental run")
+    parser.add_argument("--artifact-dir", default=DEFAULT_ARTIFACT_DIR,
+                        help="content-addressed cache of feature matrices and vocabularies")
+    parser.add_argument("--rebuild-features", action="store_true",
+                        help="ignore cached feature artifacts")
+    parser.add_argument("--min-score", type=float, default=None,
+                        help="drop SIMILAR_TO edges scoring below this cosine similarity")
+    parser.add_argument("--relative-cutoff", type=float, default=None,
+                        help="per-movie K: drop neighbours below this fraction of the best score")
+    parser.add_argument("--min-k", type=int, default=1,
+                        help="neighbours always kept per movie by the cutoffs above")
+    parser.add_argument("--mutual", action="store_true",
+                        help="keep an edge only if the target also lists the source")
+    parser.add_argument("--quantize", action="store_true",
+                        help=f"store scores as integers (score_q = score * {SCORE_SCALE})")
+    parser.add_argument("--write-workers", type=int, default=DEFAULT_WORKERS,
+                        help="concurrent Neo4j sessions writing SIMILAR_TO edges")
+    parser.add_argument("--edges-per-batch", type=int, default=EDGES_PER_BATCH)
+    parser.add_argument("--no-write", action="store_true",
+                        help="only save the state in --state-dir, e.g. for "
+                             "scripts/export_bulk_import.py; Neo4j is not touched")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    state = SimilarityState.load(args.state_dir) if args.incremental else None
+    if args.incremental and state is None:
+        print(f"No previous state in {args.state_dir}, running a full build.")
+
+
+    # ----------------------------------------------------------
+    # BUILD SPARSE FEATURE MATRIX (OR LOAD IT FROM THE ARTIFACT CACHE)
+    # genres ×5, keywords ×3, top 2000 actors ×8, directors ×4,
+    # plus standardized year, rating, popularity
+    # ----------------------------------------------------------
+    # Incremental runs reuse the previous vocabularies and scaler so that
+    # untouched movies keep identical vectors.
+    space = state.space if state else None
+    store = ArtifactStore(args.artifact_dir)
+    key, meta = feature_key("data", space=space)
+
+    features = None if args.rebuild_features else store.load(key)
+
+    if features is not None:
+        print(f"Loaded cached features {key[:12]}.")
+    else:
+        datasets = load_datasets("data")
+        print("Loaded datasets.")
+
+        print("Building sparse feature matrix...")
+        features = build_features(datasets, space=space)
+        store.save(key, features, meta)
+        print(f"Saved feature artifacts {key[:12]}.")
+
+    X = features.matrix
+
+    print("Final feature matrix shape:", X.shape, "nnz:", X.nnz)
+
+
+    # ----------------------------------------------------------
+    # COSINE SIMILARITY + TOP-K (INCREMENTAL, EXACT OR MINHASH)
+    # ----------------------------------------------------------
+    if state is not None:
+        changes = detect_changes(state, features)
+        print(
+            f"{len(changes.added)} added, {len(changes.changed)} changed, "
+            f"{len(changes.removed)} removed since the last run."
+        )
+        if not needs_update(state, changes, args.top_k):
+            print("Nothing to update.")
+            return
+
+        topk, recomputed = update_topk(
+            features, state, changes, args.top_k,
+            workers=args.workers, memory_budget_mb=args.memory_budget_mb,
+        )
+        print(f"Rescored {recomputed} movies against the full catalog.")
+
+    elif args.mode == "approx":
+        print("Selecting top-K similar movies (approx)...")
+
+        topk = approximate_topk(
+            X,
+            k=args.top_k,
+            n_label_columns=features.space.n_label_features,
+            n_tables=args.ann_tables,
+            window=args.ann_window,
+            seed=args.seed,
+        )
+        if args.recall_sample:
+            report = recall_at_k(topk, X, sample_size=args.recall_sample, seed=args.seed)
+            print(
+                f"recall@{report['k']} on {report['sample']} movies: "
+                f"{report['recall']:.3f} (score ratio {report['score_ratio']:.3f})"
+            )
+    else:
+        print("Selecting top-K similar movies (exact)...")
+        topk = topk_similar(
+            X,
+            k=args.top_k,
+            workers=args.workers,
+            memory_budget_mb=args.memory_budget_mb,
+        )
+    new_state = SimilarityState.from_run(features, topk)
+
+    # State keeps the full lists; pruning only shapes what is written.
+    # Changing pruning options calls for a full run.
+    pruning = {
+        "min_score": args.min_score,
+        "relative_cutoff": args.relative_cutoff,
+        "min_k": args.min_k,
+        "mutual": args.mutual,
+    }
+    written = prune_state(new_state, **pruning)
+    score_scale = SCORE_SCALE if args.quantize else None
+
+    if state is not None:
+        diff = edge_diff(prune_state(state, **pruning), written)
+        upserts = diff["creates"] + diff["updates"]
+        touched = sorted({r["m1"] for r in upserts + diff["deletes"]})
+        rows = source_rows(written, sources=touched, upserts=upserts, score_scale=score_scale)
+        print(
+            f"Edge diff: {len(diff['creates'])} creates, "
+            f"{len(diff['updates'])} score updates, {len(diff['deletes'])} deletes "
+            f"across {len(touched)} movies."
+        )
+    else:
+        rows = source_rows(written, score_scale=score_scale)
+        total = int((new_state.topk_ids >= 0).sum())
+        kept = sum(len(r["edges"]) for r in rows)
+        print(f"Generated {total} similarity pairs, writing {kept} after pruning.")
+
+
+    if args.no_write:
+        new_state.save(args.state_dir)
+        print(f"Saved state to {args.state_dir} without writing to Neo4j.")
+        return
+
+
+    # ----------------------------------------------------------
+    # WRITE SIMILARITY EDGES TO NEO4J
+    # ----------------------------------------------------------
+    print("Connecting to Neo4j...")
+
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+    )
+
+    driver.verify_connectivity()
+    print("Connected.")
+
+    print("Writing SIMILAR_TO edges...")
+
+    writer = SimilarityEdgeWriter(
+        driver,
+        workers=args.write_workers,
+        edges_per_batch=args.edges_per_batch,
+        quantized=args.quantize,
+    )
+    report = writer.write(rows)
+    publish_catalog_change(driver)
+    driver.close()
+
+    print("Wrote", report)
+
+    # Only a successfully written run becomes the baseline for the next one.
+    new_state.save(args.state_dir)
+
+    print("DONE. Vector-based SIMILAR_TO edges created!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Building blocks for the streaming, resumable loader in scripts/seed_neo4j.py.
+"""
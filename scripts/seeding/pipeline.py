@@ -0,0 +1,163 @@
+"""
+Checkpointed seeding stages.
+
+A stage is a generator of row chunks plus a ``write`` function that
+commits one chunk in one transaction. After every commit the number of
+chunks done is saved to a JSON checkpoint file, and a rerun skips that
+many chunks of the same stage:
+
+    {"signature": {...}, "stages": {"cast": {"chunks": 117, "rows": 46800, "finished": false}}}
+
+The signature covers the mode, chunk sizes and input file stats. If it no
+longer matches, the checkpoint is ignored and the load starts over.
+
+A run can die after a chunk committed but before the checkpoint caught
+up. The first chunk written after resuming therefore goes through the
+stage's ``replay`` function, which must be idempotent (for example the
+MERGE form of a CREATE statement). Stages without one must be
+idempotent already.
+"""
+from dataclasses import dataclass
+import json
+import os
+import time
+
+from tqdm import tqdm
+
+
+DEFAULT_CHECKPOINT = "artifacts/seed_checkpoint.json"
+
+
+def input_signature(paths):
+    """Size and mtime of every input, enough to notice a replaced file."""
+    signature = {}
+    for name, path in paths.items():
+        stat = os.stat(path)
+        signature[name] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+class Checkpoint:
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        self.stages = {}
+
+    @classmethod
+    def open(cls, path, signature, restart=False):
+        """Loads the checkpoint at ``path`` if it matches ``signature``."""
+        checkpoint = cls(path, signature)
+        if restart:
+            return checkpoint
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return checkpoint
+
+        if data.get("signature") != signature:
+            print("Checkpoint was written for other inputs or settings; starting over.")
+            return checkpoint
+
+        checkpoint.stages = data["stages"]
+        return checkpoint
+
+    def started(self, stage):
+        return stage in self.stages
+
+    def chunks_done(self, stage):
+        return self.stages.get(stage, {}).get("chunks", 0)
+
+    def finished(self, stage):
+        return self.stages.get(stage, {}).get("finished", False)
+
+    def commit(self, stage, chunks, rows):
+        entry = self.stages.setdefault(stage, {"chunks": 0, "rows": 0, "finished": False})
+        entry["chunks"] = chunks
+        entry["rows"] += rows
+        self._save()
+
+    def finish(self, stage):
+        self.stages.setdefault(stage, {"chunks": 0, "rows": 0})["finished"] = True
+        self._save()
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"signature": self.signature, "stages": self.stages}, f)
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class StageReport:
+    name: str
+    rows: int = 0
+    chunks: int = 0
+    skipped_chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        if self.skipped_chunks and not self.chunks:
+            return f"{self.name}: loaded by an earlier run"
+        resumed = f", resumed after {self.skipped_chunks} chunks" if self.skipped_chunks else ""
+        return (
+            f"{self.name}: {self.rows} rows in {self.chunks} chunks, "
+            f"{self.seconds:.1f}s ({self.rows_per_sec:,.0f} rows/sec){resumed}"
+        )
+
+
+def run_stage(checkpoint, name, chunks, write, replay=None, shared_state=False, progress=True):
+    """
+    Writes every chunk of ``chunks`` that the checkpoint has not seen yet.
+
+    Args:
+        checkpoint: The run's Checkpoint.
+        name: Stage name, the checkpoint key.
+        chunks: Iterable of row lists, identical from run to run.
+        write: Commits one chunk.
+        replay: Idempotent ``write`` used for the first chunk after a resume.
+        shared_state: ``chunks`` builds state that later stages read (a seen
+            set, say), so it is drained even when the stage is finished.
+        progress: Show a tqdm bar for the stage.
+    """
+    done = checkpoint.chunks_done(name)
+    report = StageReport(name, skipped_chunks=done)
+    if checkpoint.finished(name):
+        print(f"{name}: already loaded, skipping.")
+        if shared_state:
+            for _ in chunks:
+                pass
+        return report
+
+    uncertain = done if checkpoint.started(name) else None
+    if uncertain is None:
+        checkpoint.commit(name, 0, 0)
+
+    started = time.perf_counter()
+    with tqdm(desc=name, unit="rows", disable=not progress) as bar:
+        for i, rows in enumerate(chunks):
+            if i < done:
+                continue
+            if rows:
+                writer = replay if i == uncertain and replay else write
+                writer(rows)
+            checkpoint.commit(name, i + 1, len(rows))
+            report.chunks += 1
+            report.rows += len(rows)
+            bar.update(len(rows))
+
+    checkpoint.finish(name)
+    report.seconds = time.perf_counter() - started
+    return report
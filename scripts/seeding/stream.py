@@ -0,0 +1,119 @@
+"""
+Chunked CSV reading for the seeder.
+
+Files are never loaded whole: ``read_chunks`` yields lists of row dicts,
+``size`` rows at a time. Column types are pinned rather than inferred per
+chunk, so a value is sent to Neo4j with the same type wherever it falls
+in the file. Integer properties arrive as ints and gaps as None (an unset
+property) instead of NaN.
+
+The ``latest_movies``/``new_nodes``/``new_pairs`` filters deduplicate
+chunk streams on the fly for loaders that create every node and
+relationship exactly once. Memory grows with the number of distinct
+names and pairs, never with the row payload. Only rows whose movie
+exists are kept, as the MERGE path's MATCH would.
+"""
+import pandas as pd
+
+
+COLUMN_TYPES = {
+    "movie_id": "Int64",
+    "person_id": "Int64",
+    "release_year": "Int64",
+    "runtime": "Int64",
+    "vote_count": "Int64",
+    "vote_average": "float64",
+    "popularity": "float64",
+    "title": str,
+    "overview": str,
+    "poster_url": str,
+    "genre": str,
+    "keyword": str,
+    "name": str,
+    "character": str,
+    "director": str,
+}
+
+
+def records(df):
+    """Row dicts with native Python values and None for missing cells."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def read_chunks(path, size, columns=None):
+    """Yields ``path`` as lists of at most ``size`` row dicts."""
+    for chunk in pd.read_csv(path, chunksize=size, usecols=columns, dtype=COLUMN_TYPES):
+        yield records(chunk)
+
+
+def last_positions(path, key, size):
+    """
+    Maps every ``key`` value to the file position of its last row, reading
+    only that column.
+    """
+    positions, offset = {}, 0
+    for rows in read_chunks(path, size, columns=[key]):
+        for pos, row in enumerate(rows, start=offset):
+            if row[key] is not None:
+                positions[row[key]] = pos
+        offset += len(rows)
+    return positions
+
+
+def last_values(path, key, value, size, movies=None):
+    """
+    Maps every ``key`` value to the ``value`` of its last row, optionally
+    only counting rows whose movie_id is in ``movies``.
+    """
+    columns = [key, value] + (["movie_id"] if movies is not None else [])
+    values = {}
+    for rows in read_chunks(path, size, columns=columns):
+        for row in rows:
+            if row[key] is None or (movies is not None and row["movie_id"] not in movies):
+                continue
+            values[row[key]] = row[value]
+    return values
+
+
+def latest_movies(chunks, last):
+    """Movie rows, keeping only the last row of every movie_id."""
+    offset = 0
+    for rows in chunks:
+        yield [
+            row for pos, row in enumerate(rows, start=offset)
+            if last.get(row["movie_id"]) == pos
+        ]
+        offset += len(rows)
+
+
+def new_nodes(chunks, column, movies, seen, person_ids=None):
+    """
+    ``{"name"}`` rows for names not in ``seen`` yet; person rows also
+    carry the tmdb_id from ``person_ids``.
+    """
+    for rows in chunks:
+        nodes = []
+        for row in rows:
+            name = row[column]
+            if name is None or name in seen or row["movie_id"] not in movies:
+                continue
+            seen.add(name)
+            node = {"name": name}
+            if person_ids is not None:
+                node["person_id"] = person_ids.get(name)
+            nodes.append(node)
+        yield nodes
+
+
+def new_pairs(chunks, columns, movies):
+    """Relationship rows with both ends set, each (movie_id, name) pair once."""
+    seen = set()
+    for rows in chunks:
+        pairs = []
+        for row in rows:
+            key = tuple(row[c] for c in columns)
+            if None in key or key in seen or key[0] not in movies:
+                continue
+            seen.add(key)
+            pairs.append(dict(zip(columns, key)))
+        yield pairs
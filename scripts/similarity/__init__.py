@@ -0,0 +1,3 @@
+"""
+Building blocks for the SIMILAR_TO pipeline driven by scripts/seed_similiarity.py.
+"""
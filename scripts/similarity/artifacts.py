@@ -0,0 +1,131 @@
+"""
+Content-addressed storage for featurization output.
+
+A feature build is keyed by a SHA-256 over the raw bytes of the input CSVs
+plus the settings that shape the vectors (weights, actor cap and, for
+incremental runs, the frozen feature space). When nothing changed the
+matrix, movie ids, vocabularies and scaler load straight from disk and
+featurization is skipped:
+
+    artifacts/features/<key>/matrix.npz     sparse CSR feature matrix
+    artifacts/features/<key>/movie_ids.npy  row -> movie_id
+    artifacts/features/<key>/space.json     vocabularies, weights, scaler
+    artifacts/features/<key>/meta.json      inputs and settings that made it
+    artifacts/features/LATEST               key of the last saved build
+
+Tools that only need the latest vectors (online scoring, exports) can use
+``ArtifactStore().load_latest()`` without touching the CSVs.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from scipy import sparse
+
+from similarity.features import (
+    DATASETS, DEFAULT_WEIGHTS, TOP_ACTORS, FeatureMatrix, FeatureSpace
+)
+
+
+DEFAULT_ARTIFACT_DIR = "artifacts/features"
+
+# Bump when the on-disk layout or the featurization itself changes.
+FORMAT_VERSION = 1
+
+_READ_CHUNK = 1024 * 1024
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def feature_key(data_dir="data", weights=None, top_actors=TOP_ACTORS,
+                space: FeatureSpace | None = None):
+    """
+    Returns (key, meta): the content address of a feature build and the
+    description stored next to it.
+    """
+    if space is not None:
+        weights, top_actors = space.weights, space.top_actors
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "inputs": {
+            name: _file_digest(os.path.join(data_dir, f"{name}.csv"))
+            for name in DATASETS
+        },
+        "weights": dict(sorted((weights or DEFAULT_WEIGHTS).items())),
+        "top_actors": top_actors,
+        "space": (
+            hashlib.sha256(json.dumps(space.to_dict(), sort_keys=True).encode()).hexdigest()
+            if space is not None else None
+        ),
+    }
+    key = hashlib.sha256(json.dumps(meta, sort_keys=True).encode()).hexdigest()
+    return key, meta
+
+
+class ArtifactStore:
+
+    def __init__(self, root=DEFAULT_ARTIFACT_DIR):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def load(self, key):
+        """Returns the FeatureMatrix stored under ``key`` or None."""
+        path = self.path(key)
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return None
+
+        matrix = sparse.load_npz(os.path.join(path, "matrix.npz")).tocsr()
+        movie_ids = np.load(os.path.join(path, "movie_ids.npy"))
+        with open(os.path.join(path, "space.json")) as f:
+            space = FeatureSpace.from_dict(json.load(f))
+
+        return FeatureMatrix(movie_ids=movie_ids, matrix=matrix, space=space)
+
+    def load_latest(self):
+        """Most recently saved build, or None."""
+        try:
+            with open(os.path.join(self.root, "LATEST")) as f:
+                key = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return self.load(key)
+
+    def save(self, key, features: FeatureMatrix, meta=None):
+        """
+        Writes a build under ``key``. Files go to a temporary directory
+        first so readers never see a half-written artifact.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            sparse.save_npz(os.path.join(tmp, "matrix.npz"), features.matrix, compressed=False)
+            np.save(os.path.join(tmp, "movie_ids.npy"), np.asarray(features.movie_ids))
+            with open(os.path.join(tmp, "space.json"), "w") as f:
+                json.dump(features.space.to_dict(), f)
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({**(meta or {}), "key": key, "created_at": time.time()}, f, indent=2)
+
+            target = self.path(key)
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            os.replace(tmp, target)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        with open(os.path.join(self.root, "LATEST"), "w") as f:
+            f.write(key)
+        return self.path(key)
@@ -0,0 +1,173 @@
+"""
+Blockwise exact top-K cosine similarity.
+
+Rows are L2-normalized once, then processed in row blocks: each block is
+multiplied against the whole catalog and reduced to its K best neighbours
+with ``argpartition`` before the next block is touched. Peak memory is the
+N x K result plus one block of scores per worker, never the full N x N
+matrix. Blocks can be spread over a process pool; on platforms with
+``fork`` the workers share the parent's normalized matrix copy-on-write.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+import multiprocessing as mp
+import os
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from tqdm import tqdm
+
+
+TOP_K = 20
+DEFAULT_MEMORY_BUDGET_MB = 512
+
+# Bytes held per (row, column) cell of a block while it is reduced:
+# dense float64 scores, the sparse product (value + index) and the
+# argpartition indices.
+_BYTES_PER_CELL = 8 + 12 + 8
+
+
+@dataclass
+class TopK:
+    """Row-aligned neighbour lists: ``indices[i]`` are row numbers, best first."""
+    indices: np.ndarray
+    scores: np.ndarray
+
+    def __len__(self):
+        return self.indices.shape[0]
+
+
+def normalize_rows(X):
+    """L2-normalizes rows once so a dot product is the cosine similarity."""
+    return normalize(sparse.csr_matrix(X, dtype=np.float64), norm="l2", copy=True)
+
+
+def block_rows_for_budget(n_rows, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, workers=1):
+    """How many rows each worker may score at once within the budget."""
+    budget = memory_budget_mb * 1024 * 1024 / max(workers, 1)
+    return int(max(1, min(n_rows, budget // (_BYTES_PER_CELL * max(n_rows, 1)))))
+
+
+def select_topk(scores, k):
+    """
+    Returns (indices, values) of the k largest entries per row, ordered by
+    score descending and then by column index.
+    """
+    n_cols = scores.shape[1]
+    if k < n_cols:
+        cand = np.argpartition(scores, n_cols - k, axis=1)[:, n_cols - k:]
+    else:
+        cand = np.broadcast_to(np.arange(n_cols), scores.shape).copy()
+    vals = np.take_along_axis(scores, cand, axis=1)
+
+    order = np.lexsort((cand, -vals), axis=1)
+    return (
+        np.take_along_axis(cand, order, axis=1),
+        np.take_along_axis(vals, order, axis=1),
+    )
+
+
+def score_rows(Xn, XnT, rows, k):
+    """
+    Exact top-k for the given row numbers against every row of ``Xn``.
+    A row is never its own neighbour.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    scores = (Xn[rows] @ XnT).toarray()
+    scores[np.arange(len(rows)), rows] = -np.inf
+    return select_topk(scores, k)
+
+
+# ----------------------------------------------------------
+# PROCESS POOL PLUMBING
+# ----------------------------------------------------------
+_shared = {}
+
+
+def _init_worker(Xn, XnT):
+    _shared["Xn"] = Xn
+    _shared["XnT"] = XnT
+
+
+def _score_block(start, stop, k):
+    idx, vals = score_rows(_shared["Xn"], _shared["XnT"], np.arange(start, stop), k)
+    return start, idx, vals
+
+
+def _pool_context():
+    if "fork" in mp.get_all_start_methods():
+        return mp.get_context("fork")
+    return mp.get_context()
+
+
+def topk_similar(X, k=TOP_K, workers=None, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                 block_size=None, progress=True):
+    """
+    Exact cosine top-k neighbours for every row of ``X``.
+
+    Args:
+        X: Feature matrix (sparse or dense), one row per movie.
+        k (int): Neighbours kept per row.
+        workers (int): Worker processes, defaults to the CPU count.
+        memory_budget_mb (int): Total scratch memory shared by all workers.
+        block_size (int): Rows per block; derived from the budget when None.
+        progress (bool): Show a tqdm bar over the blocks.
+
+    Returns:
+        TopK: ``indices`` (int32) and ``scores`` (float64), shape (N, k').
+        k' is ``min(k, N - 1)``.
+    """
+    Xn = normalize_rows(X)
+    XnT = Xn.T.tocsr()
+    n = Xn.shape[0]
+    k = min(k, n - 1)
+
+    indices = np.empty((n, max(k, 0)), dtype=np.int32)
+    scores = np.empty((n, max(k, 0)), dtype=np.float64)
+    if k <= 0:
+        return TopK(indices, scores)
+
+    workers = workers or os.cpu_count() or 1
+    block_size = block_size or block_rows_for_budget(n, memory_budget_mb, workers)
+    blocks = [(s, min(s + block_size, n)) for s in range(0, n, block_size)]
+    bar = tqdm(total=n, disable=not progress, unit="movies")
+
+    if workers == 1 or len(blocks) == 1:
+        _init_worker(Xn, XnT)
+        try:
+            for start, stop in blocks:
+                _, idx, vals = _score_block(start, stop, k)
+                indices[start:stop], scores[start:stop] = idx, vals
+                bar.update(stop - start)
+        finally:
+            _shared.clear()
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=_pool_context(),
+            initializer=_init_worker,
+            initargs=(Xn, XnT),
+        ) as pool:
+            futures = [pool.submit(_score_block, s, e, k) for s, e in blocks]
+            for future in as_completed(futures):
+                start, idx, vals = future.result()
+                indices[start:start + len(idx)], scores[start:start + len(idx)] = idx, vals
+                bar.update(len(idx))
+
+    bar.close()
+    return TopK(indices, scores)
+
+
+def to_pairs(movie_ids, topk: TopK):
+    """Flattens neighbour lists into ``{"m1", "m2", "score"}`` rows."""
+    movie_ids = np.asarray(movie_ids)
+    valid = topk.indices >= 0
+    src = np.broadcast_to(np.arange(len(topk))[:, None], topk.indices.shape)[valid]
+    dst = topk.indices[valid]
+    return [
+        {"m1": int(m1), "m2": int(m2), "score": float(score)}
+        for m1, m2, score in zip(
+            movie_ids[src].tolist(), movie_ids[dst].tolist(), topk.scores[valid].tolist()
+        )
+    ]
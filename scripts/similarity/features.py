@@ -0,0 +1,224 @@
+"""
+Sparse feature-matrix builder for movie similarity.
+
+Every multi-label block (genres, keywords, actors, directors) is built
+straight from the long ``(movie_id, label)`` CSV tables with categorical
+codes, so there is no per-movie Python loop and no dense intermediate.
+The resulting vectors are the same as the ones the old
+MultiLabelBinarizer + np.hstack pipeline produced.
+"""
+from dataclasses import dataclass, field
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import StandardScaler
+
+
+TOP_ACTORS = 2000
+
+DEFAULT_WEIGHTS = {
+    "genres": 5,
+    "keywords": 3,
+    "actors": 8,
+    "directors": 4,
+}
+
+# block name -> (dataset name, label column)
+LABEL_BLOCKS = {
+    "genres": ("genres", "genre"),
+    "keywords": ("keywords", "keyword"),
+    "actors": ("cast", "name"),
+    "directors": ("directors", "director"),
+}
+
+# year, rating, popularity
+NUMERIC_COLUMNS = ["release_year", "vote_average", "popularity"]
+
+DATASETS = ["movies", "genres", "keywords", "cast", "directors"]
+
+
+@dataclass
+class FeatureSpace:
+    """
+    Everything needed to turn raw rows into vectors: the per-block label
+    vocabularies (column order), the block weights and the numeric scaler.
+    """
+    vocabularies: dict[str, list[str]]
+    weights: dict[str, float]
+    numeric_mean: np.ndarray
+    numeric_scale: np.ndarray
+    top_actors: int = TOP_ACTORS
+
+    @property
+    def n_label_features(self):
+        """Leading binary label columns; the numeric columns follow them."""
+        return sum(len(v) for v in self.vocabularies.values())
+
+    @property
+    def n_features(self):
+        return self.n_label_features + len(NUMERIC_COLUMNS)
+
+    def to_dict(self):
+        return {
+            "vocabularies": self.vocabularies,
+            "weights": self.weights,
+            "numeric_mean": self.numeric_mean.tolist(),
+            "numeric_scale": self.numeric_scale.tolist(),
+            "top_actors": self.top_actors,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            vocabularies={k: list(v) for k, v in data["vocabularies"].items()},
+            weights=dict(data["weights"]),
+            numeric_mean=np.asarray(data["numeric_mean"], dtype=np.float64),
+            numeric_scale=np.asarray(data["numeric_scale"], dtype=np.float64),
+            top_actors=int(data["top_actors"]),
+        )
+
+
+@dataclass
+class FeatureMatrix:
+    movie_ids: np.ndarray
+    matrix: sparse.csr_matrix
+    space: FeatureSpace
+    row_of: dict[int, int] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.row_of is None:
+            self.row_of = {int(mid): i for i, mid in enumerate(self.movie_ids)}
+
+
+def load_datasets(data_dir="data"):
+    """Reads the five processed CSVs into a dict keyed by dataset name."""
+    return {
+        name: pd.read_csv(os.path.join(data_dir, f"{name}.csv"))
+        for name in DATASETS
+    }
+
+
+def _label_codes(labels, vocabulary=None):
+    """
+    Returns (codes, vocabulary). Vocabulary is sorted exactly like
+    MultiLabelBinarizer sorts its classes; unknown labels get code -1.
+    """
+    if vocabulary is None:
+        vocabulary = sorted(pd.unique(labels))
+    codes = pd.Categorical(labels, categories=vocabulary).codes
+    return codes, vocabulary
+
+
+def label_block(movie_index: pd.Index, labels_df, column, vocabulary=None,
+                allowed=None, weight=1.0):
+    """
+    Builds one weighted binary CSR block of shape (len(movie_index), |vocab|).
+
+    Args:
+        movie_index: Unique movie ids, one per output row.
+        labels_df: Long table with ``movie_id`` and ``column``.
+        vocabulary: Fixed column order; fitted from the data when None.
+        allowed: Optional whitelist applied before fitting (top actors).
+        weight: Value stored for every present label.
+    """
+    rows = movie_index.get_indexer(labels_df["movie_id"])
+    labels = labels_df[column]
+
+    keep = (rows >= 0) & labels.notna().to_numpy()
+    if allowed is not None:
+        keep &= labels.isin(allowed).to_numpy()
+
+    rows = rows[keep]
+    codes, vocabulary = _label_codes(labels[keep].to_numpy(), vocabulary)
+
+    known = codes >= 0
+    rows, codes = rows[known], codes[known].astype(np.int64)
+
+    # A label listed twice for the same movie is still a single 1.
+    n_cols = len(vocabulary)
+    flat = np.unique(rows.astype(np.int64) * max(n_cols, 1) + codes)
+    rows, codes = np.divmod(flat, max(n_cols, 1))
+
+    block = sparse.csr_matrix(
+        (np.full(len(flat), float(weight)), (rows, codes)),
+        shape=(len(movie_index), n_cols),
+    )
+    return block, vocabulary
+
+
+def top_actor_names(cast_df, top_actors=TOP_ACTORS):
+    """Most credited actors across the whole cast table."""
+    return cast_df["name"].value_counts().head(top_actors).index
+
+
+def build_features(datasets, space: FeatureSpace | None = None,
+                   weights=None, top_actors=TOP_ACTORS):
+    """
+    Builds the weighted sparse feature matrix for ``datasets["movies"]``.
+
+    Args:
+        datasets (dict): DataFrames as returned by ``load_datasets``.
+        space (FeatureSpace): Reuse fitted vocabularies/scaler instead of
+            fitting new ones. Labels outside the vocabularies are ignored.
+        weights (dict): Per-block weights, defaults to DEFAULT_WEIGHTS.
+        top_actors (int): Actor vocabulary cap when fitting.
+
+    Returns:
+        FeatureMatrix: ids, CSR matrix (float64) and the feature space.
+    """
+    movies_df = datasets["movies"]
+    movie_index = pd.Index(movies_df["movie_id"])
+    if not movie_index.is_unique:
+        raise ValueError("movies.csv contains duplicate movie_id values")
+
+    if space is not None:
+        weights = space.weights
+        top_actors = space.top_actors
+    weights = dict(weights or DEFAULT_WEIGHTS)
+
+    blocks = []
+    vocabularies = {}
+    for name, (dataset, column) in LABEL_BLOCKS.items():
+        allowed = None
+        if name == "actors" and space is None:
+            allowed = top_actor_names(datasets[dataset], top_actors)
+
+        block, vocab = label_block(
+            movie_index,
+            datasets[dataset],
+            column,
+            vocabulary=space.vocabularies[name] if space is not None else None,
+            allowed=allowed,
+            weight=weights[name],
+        )
+        blocks.append(block)
+        vocabularies[name] = list(vocab)
+
+    numeric = movies_df[NUMERIC_COLUMNS].fillna(0).to_numpy(dtype=np.float64)
+    if space is None:
+        scaler = StandardScaler()
+        numeric_matrix = scaler.fit_transform(numeric)
+        mean, scale = scaler.mean_, scaler.scale_
+    else:
+        mean, scale = space.numeric_mean, space.numeric_scale
+        numeric_matrix = (numeric - mean) / scale
+    blocks.append(sparse.csr_matrix(numeric_matrix))
+
+    X = sparse.hstack(blocks, format="csr", dtype=np.float64)
+
+    if space is None:
+        space = FeatureSpace(
+            vocabularies=vocabularies,
+            weights=weights,
+            numeric_mean=np.asarray(mean, dtype=np.float64),
+            numeric_scale=np.asarray(scale, dtype=np.float64),
+            top_actors=top_actors,
+        )
+
+    return FeatureMatrix(
+        movie_ids=movie_index.to_numpy(),
+        matrix=X,
+        space=space,
+    )
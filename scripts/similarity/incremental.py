@@ -0,0 +1,279 @@
+"""
+Incremental SIMILAR_TO maintenance.
+
+Every run leaves a ``SimilarityState`` behind: the feature space it used,
+one fingerprint per movie vector and each movie's top-K list. The next
+incremental run featurizes the catalog in that frozen space, so unchanged
+movies keep bit-identical vectors, and only has to:
+
+* score added/changed movies against the whole catalog,
+* check whether they now beat the K-th neighbour of everyone else,
+* fully recompute the few lists that lost a neighbour they cannot refill,
+* emit the edge diff (creates, score updates, deletes).
+
+Labels that are not in the frozen vocabularies are ignored until the next
+full run refits the feature space.
+"""
+from dataclasses import dataclass
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from similarity.engine import (
+    DEFAULT_MEMORY_BUDGET_MB, TopK, normalize_rows, score_rows, select_topk, topk_similar
+)
+from similarity.features import FeatureSpace
+
+
+STATE_FILE = "state.npz"
+SPACE_FILE = "space.json"
+
+# Rows of unaffected movies merged per block.
+_MERGE_BLOCK = 4096
+
+
+@dataclass
+class SimilarityState:
+    """What the last run wrote, keyed by movie id rather than row number."""
+    movie_ids: np.ndarray
+    fingerprints: np.ndarray
+    topk_ids: np.ndarray
+    topk_scores: np.ndarray
+    space: FeatureSpace
+
+    def save(self, state_dir):
+        os.makedirs(state_dir, exist_ok=True)
+        np.savez(
+            os.path.join(state_dir, STATE_FILE),
+            movie_ids=self.movie_ids,
+            fingerprints=self.fingerprints,
+            topk_ids=self.topk_ids,
+            topk_scores=self.topk_scores,
+        )
+        with open(os.path.join(state_dir, SPACE_FILE), "w") as f:
+            json.dump(self.space.to_dict(), f)
+
+    @classmethod
+    def load(cls, state_dir):
+        """Returns the saved state, or None when there is no previous run."""
+        state_path = os.path.join(state_dir, STATE_FILE)
+        space_path = os.path.join(state_dir, SPACE_FILE)
+        if not (os.path.exists(state_path) and os.path.exists(space_path)):
+            return None
+
+        with np.load(state_path) as data:
+            arrays = {name: data[name] for name in data.files}
+        with open(space_path) as f:
+            space = FeatureSpace.from_dict(json.load(f))
+
+        return cls(space=space, **arrays)
+
+    @classmethod
+    def from_run(cls, features, topk: TopK):
+        ids = np.asarray(features.movie_ids, dtype=np.int64)
+        topk_ids = np.where(topk.indices >= 0, ids[np.maximum(topk.indices, 0)], -1)
+        return cls(
+            movie_ids=ids,
+            fingerprints=row_fingerprints(features.matrix),
+            topk_ids=topk_ids.astype(np.int64),
+            topk_scores=topk.scores,
+            space=features.space,
+        )
+
+
+@dataclass
+class ChangeSet:
+    added: np.ndarray
+    removed: np.ndarray
+    changed: np.ndarray
+
+    def __bool__(self):
+        return bool(len(self.added) or len(self.removed) or len(self.changed))
+
+
+def _mix64(x):
+    """splitmix64 finalizer, vectorized over uint64."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def row_fingerprints(X):
+    """
+    64-bit fingerprint of every CSR row: the wrapping sum of a hash of each
+    (column, exact float bits) entry, so equal rows give equal fingerprints.
+    """
+    X = X.tocsr()
+    owner = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+    with np.errstate(over="ignore"):
+        entry = _mix64(
+            X.indices.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+            ^ X.data.astype(np.float64).view(np.uint64)
+        )
+        fingerprints = np.zeros(X.shape[0], dtype=np.uint64)
+        np.add.at(fingerprints, owner, entry)
+    return fingerprints
+
+
+def detect_changes(state: SimilarityState, features, fingerprints=None):
+    """Movie ids added, removed or re-vectorized since ``state`` was saved."""
+    if fingerprints is None:
+        fingerprints = row_fingerprints(features.matrix)
+
+    old = pd.Series(state.fingerprints, index=state.movie_ids)
+    new = pd.Series(fingerprints, index=np.asarray(features.movie_ids, dtype=np.int64))
+
+    common = new.index.intersection(old.index)
+    changed = common[new[common].to_numpy() != old[common].to_numpy()]
+
+    return ChangeSet(
+        added=new.index.difference(old.index).to_numpy(),
+        removed=old.index.difference(new.index).to_numpy(),
+        changed=changed.to_numpy(),
+    )
+
+
+def topk_width(k, n):
+    """Neighbours kept per movie for a top-k of ``k`` over ``n`` movies."""
+    return max(min(k, n - 1), 0)
+
+
+def needs_update(state: SimilarityState, changes: ChangeSet, k):
+    """Whether movies changed since ``state`` or it was built for another K."""
+    return bool(changes) or state.topk_ids.shape[1] != topk_width(k, len(state.movie_ids))
+
+
+def update_topk(features, state: SimilarityState, changes: ChangeSet, k, workers=None,
+                memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """
+    Brings ``state``'s neighbour lists up to date with ``features``.
+    ``workers`` and ``memory_budget_mb`` size the full topk_similar run
+    a K wider than the saved lists falls back to.
+
+    Returns:
+        (TopK, recomputed): lists aligned to ``features`` rows and the
+        number of rows that were scored against the full catalog.
+    """
+    ids = np.asarray(features.movie_ids, dtype=np.int64)
+    n = len(ids)
+    k = topk_width(k, n)
+
+    if k == 0:
+        empty = np.empty((n, 0))
+        return TopK(empty.astype(np.int32), empty), 0
+
+    # Lists narrower than k say nothing about the neighbours they left
+    # out, so a larger K is a full run.
+    width = state.topk_ids.shape[1]
+    if k > width:
+        topk = topk_similar(
+            features.matrix, k=k, workers=workers, memory_budget_mb=memory_budget_mb, progress=False
+        )
+        return topk, n
+
+    Xn = normalize_rows(features.matrix)
+    XnT = Xn.T.tocsr()
+
+    row_index = pd.Index(ids)
+    affected = np.sort(row_index.get_indexer(np.concatenate([changes.added, changes.changed])))
+    is_affected = np.zeros(n, dtype=bool)
+    is_affected[affected] = True
+
+    # Previous lists, re-expressed as current row numbers (-1 = gone/padding).
+    old_rows = pd.Index(state.movie_ids).get_indexer(ids)
+    known = old_rows >= 0
+    prev_ids = np.full((n, width), -1, dtype=np.int64)
+    prev_scores = np.full((n, width), -np.inf)
+    prev_ids[known] = state.topk_ids[old_rows[known]]
+    prev_scores[known] = state.topk_scores[old_rows[known]]
+    prev_idx = row_index.get_indexer(prev_ids.ravel()).reshape(n, width)
+
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float64)
+    recompute = [affected]
+
+    XaT = Xn[affected].T.tocsr() if len(affected) else None
+    unaffected = np.flatnonzero(~is_affected)
+
+    for start in range(0, len(unaffected), _MERGE_BLOCK):
+        rows = unaffected[start:start + _MERGE_BLOCK]
+
+        kept_idx = prev_idx[rows].copy()
+        kept_scores = prev_scores[rows].copy()
+        stale = (kept_idx < 0) | is_affected[np.maximum(kept_idx, 0)]
+        kept_idx[stale] = -1
+        kept_scores[stale] = -np.inf
+
+        # The last score of the previous list bounds every unaffected
+        # movie outside it, so a merged list that stays above it is exact.
+        threshold = prev_scores[rows, -1] if width else np.full(len(rows), np.inf)
+
+        if XaT is not None:
+            fresh_scores = (Xn[rows] @ XaT).toarray()
+            cand_idx = np.hstack([kept_idx, np.broadcast_to(affected, fresh_scores.shape)])
+            cand_scores = np.hstack([kept_scores, fresh_scores])
+        else:
+            cand_idx, cand_scores = kept_idx, kept_scores
+
+        pos, vals = select_topk(cand_scores, k)
+        picked = np.take_along_axis(cand_idx, pos, axis=1)
+
+        # Same tie order as score_rows: score descending, then row number.
+        order = np.lexsort((picked, -vals), axis=1)
+        picked = np.take_along_axis(picked, order, axis=1)
+        vals = np.take_along_axis(vals, order, axis=1)
+        picked[np.isneginf(vals)] = -1
+
+        ok = vals[:, -1] >= threshold
+        indices[rows[ok]] = picked[ok]
+        scores[rows[ok]] = vals[ok]
+        recompute.append(rows[~ok])
+
+    recompute = np.concatenate(recompute)
+    if len(recompute) and k:
+        idx, vals = score_rows(Xn, XnT, recompute, k)
+        indices[recompute], scores[recompute] = idx, vals
+
+    return TopK(indices, scores), int(len(recompute))
+
+
+def edge_diff(state: SimilarityState, new_state: SimilarityState):
+    """
+    Splits the change between two states into SIMILAR_TO writes.
+
+    Returns:
+        dict: ``creates`` and ``updates`` as ``{"m1", "m2", "score"}`` rows,
+        ``deletes`` as ``{"m1", "m2"}`` rows.
+    """
+    def edges(s):
+        src = np.repeat(s.movie_ids, s.topk_ids.shape[1])
+        frame = pd.DataFrame({
+            "m1": src,
+            "m2": s.topk_ids.ravel(),
+            "score": s.topk_scores.ravel(),
+        })
+        return frame[frame["m2"] >= 0]
+
+    merged = edges(state).merge(
+        edges(new_state), on=["m1", "m2"], how="outer",
+        suffixes=("_old", "_new"), indicator=True,
+    )
+
+    creates = merged[merged["_merge"] == "right_only"]
+    deletes = merged[merged["_merge"] == "left_only"]
+    both = merged[merged["_merge"] == "both"]
+    updates = both[both["score_old"] != both["score_new"]]
+
+    def rows(frame, with_score=True):
+        out = frame[["m1", "m2"]].astype("int64")
+        if with_score:
+            out = out.assign(score=frame["score_new"].astype(float))
+        return out.to_dict("records")
+
+    return {
+        "creates": rows(creates),
+        "updates": rows(updates),
+        "deletes": rows(deletes, with_score=False),
+    }
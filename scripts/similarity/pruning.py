@@ -0,0 +1,92 @@
+"""
+SIMILAR_TO pruning and compact score storage.
+
+Pruning is applied to what gets written, never to the saved state, so
+incremental runs still see the full top-K lists they need.
+
+* ``min_score`` drops neighbours below an absolute cosine score.
+* ``relative_cutoff`` adapts K per movie: neighbours scoring below that
+  fraction of the movie's best score are dropped (``min_k`` are kept).
+* ``mutual`` keeps an edge only if the target also lists the source.
+
+``quantize_scores`` turns float scores into integers scaled by
+SCORE_SCALE. Scores are forced to strictly decrease along each list, so
+reading the edges back ordered by the integer score keeps the written order.
+"""
+import numpy as np
+
+from similarity.incremental import SimilarityState
+
+
+# Must match SIMILARITY_SCORE_SCALE in app/constants/catalogs.py, which the
+# app reads score_q with; tests/test_similarity_pruning.py checks they agree.
+SCORE_SCALE = 1_000_000
+
+
+def _compact(neighbours, scores, keep):
+    """Moves kept entries to the front of each row, preserving their order."""
+    order = np.argsort(~keep, axis=1, kind="stable")
+    neighbours = np.take_along_axis(np.where(keep, neighbours, -1), order, axis=1)
+    scores = np.take_along_axis(np.where(keep, scores, -np.inf), order, axis=1)
+    return neighbours, scores
+
+
+def prune(ids, neighbours, scores, min_score=None, relative_cutoff=None,
+          min_k=1, mutual=False):
+    """
+    Returns pruned copies of ``neighbours``/``scores`` (best first, -1/-inf
+    padding at the tail).
+
+    Args:
+        ids: Id of each row, in the same id space as ``neighbours``.
+        neighbours: (N, K) neighbour ids, -1 for padding.
+        scores: (N, K) scores, sorted descending per row.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    keep = neighbours >= 0
+
+    if min_score is not None:
+        keep &= scores >= min_score
+
+    if relative_cutoff is not None:
+        best = scores[:, :1]
+        keep &= scores >= best * relative_cutoff
+
+    if min_k:
+        # Never drop below min_k valid neighbours because of the cutoffs.
+        rank = np.arange(neighbours.shape[1])
+        keep |= (rank < min_k) & (neighbours >= 0)
+
+    if mutual:
+        src = np.broadcast_to(ids[:, None], neighbours.shape)
+        forward = (src[keep] << 32) | neighbours[keep]
+        backward = (neighbours << 32) | src
+        keep &= np.isin(backward, forward)
+
+    return _compact(neighbours, scores, keep)
+
+
+def prune_state(state: SimilarityState, **options):
+    """A copy of ``state`` whose lists hold only the edges to write."""
+    if not any(options.get(k) for k in ("min_score", "relative_cutoff", "mutual")):
+        return state
+
+    topk_ids, topk_scores = prune(state.movie_ids, state.topk_ids, state.topk_scores, **options)
+    return SimilarityState(
+        movie_ids=state.movie_ids,
+        fingerprints=state.fingerprints,
+        topk_ids=topk_ids,
+        topk_scores=topk_scores,
+        space=state.space,
+    )
+
+
+def quantize_scores(scores, valid, scale=SCORE_SCALE):
+    """
+    Integer scores, strictly decreasing along every row's valid prefix.
+    """
+    q = np.round(np.where(valid, scores, 0) * scale).astype(np.int64)
+    rank = np.arange(q.shape[1], dtype=np.int64)
+    # q'[j] = min(q[j], q'[j-1] - 1)  <=>  q'[j] + j = cummin(q[j] + j)
+    q = np.minimum.accumulate(q + rank, axis=1) - rank
+    return np.where(valid, q, 0)
@@ -0,0 +1,169 @@
+"""
+Parallel SIMILAR_TO writer.
+
+Rows are grouped per source movie and every batch owns a disjoint set of
+sources, so concurrent transactions never touch the same outgoing
+relationship chain. Each source's outgoing edges are replaced in one
+statement: edges to movies outside its new list are deleted and the new
+ones upserted, so stale neighbours no longer accumulate. Every worker
+thread keeps one session open for all of its batches.
+
+Scores are written either as float ``s.score`` or, when quantized, as
+the integer ``s.score_q`` (see similarity.pruning.quantize_scores).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import time
+
+import numpy as np
+from tqdm import tqdm
+
+from similarity.pruning import quantize_scores
+
+
+DEFAULT_WORKERS = 4
+EDGES_PER_BATCH = 1000
+
+
+@dataclass
+class WriteReport:
+    sources: int
+    edges: int
+    batches: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self):
+        return self.edges / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.edges} edges for {self.sources} movies in {self.batches} batches, "
+            f"{self.seconds:.1f}s ({self.rows_per_sec:,.0f} rows/sec)"
+        )
+
+
+REPLACE_OUTGOING = """
+    UNWIND $rows AS row
+    MATCH (m1:Movie {movie_id: row.source})
+    CALL {
+        WITH m1, row
+        MATCH (m1)-[old:SIMILAR_TO]->(t:Movie)
+        WHERE NOT t.movie_id IN row.keep
+        DELETE old
+    }
+    WITH m1, row
+    UNWIND row.edges AS e
+    MATCH (m2:Movie {movie_id: e.target})
+    MERGE (m1)-[s:SIMILAR_TO]->(m2)
+"""
+
+
+def replace_outgoing_batch(tx, rows):
+    tx.run(REPLACE_OUTGOING + "SET s.score = e.score REMOVE s.score_q", rows=rows)
+
+
+def replace_outgoing_quantized_batch(tx, rows):
+    tx.run(REPLACE_OUTGOING + "SET s.score_q = e.score REMOVE s.score", rows=rows)
+
+
+def source_rows(state, sources=None, upserts=None, score_scale=None):
+    """
+    Builds one ``{"source", "keep", "edges"}`` row per source movie.
+
+    Args:
+        state: The SimilarityState being written.
+        sources: Movie ids to write; every movie in ``state`` when None.
+            Ids missing from ``state`` get an empty list, which clears
+            their outgoing edges.
+        upserts: Optional ``{"m1", "m2", ...}`` rows. When given, only
+            these edges are upserted and the rest of each list is kept.
+        score_scale: Write integer scores quantized with this scale.
+    """
+    row_of = {int(mid): i for i, mid in enumerate(state.movie_ids)}
+    if sources is None:
+        sources = state.movie_ids
+
+    valid_all = state.topk_ids >= 0
+    scores_all = state.topk_scores
+    if score_scale is not None:
+        scores_all = quantize_scores(scores_all, valid_all, score_scale)
+
+    # Quantized lists are strictly decreasing as a whole, so a touched
+    # source always rewrites every edge to keep that invariant.
+    only = None
+    if upserts is not None and score_scale is None:
+        only = {}
+        for r in upserts:
+            only.setdefault(r["m1"], set()).add(r["m2"])
+
+    rows = []
+    for source in np.asarray(sources).tolist():
+        i = row_of.get(source)
+        if i is None:
+            rows.append({"source": source, "keep": [], "edges": []})
+            continue
+
+        valid = valid_all[i]
+        targets = state.topk_ids[i][valid].tolist()
+        wanted = None if only is None else only.get(source, set())
+        edges = [
+            {"target": t, "score": s}
+            for t, s in zip(targets, scores_all[i][valid].tolist())
+            if wanted is None or t in wanted
+        ]
+        rows.append({"source": source, "keep": targets, "edges": edges})
+
+    return rows
+
+
+class SimilarityEdgeWriter:
+
+    def __init__(self, driver, workers=DEFAULT_WORKERS, edges_per_batch=EDGES_PER_BATCH,
+                 database=None, quantized=False):
+        self.driver = driver
+        self.work = replace_outgoing_quantized_batch if quantized else replace_outgoing_batch
+        self.workers = max(1, workers)
+        self.edges_per_batch = edges_per_batch
+        self.database = database
+
+    def batches(self, rows):
+        """Packs whole sources into batches of about ``edges_per_batch`` edges."""
+        batch, size = [], 0
+        for row in rows:
+            batch.append(row)
+            size += max(len(row["edges"]), 1)
+            if size >= self.edges_per_batch:
+                yield batch
+                batch, size = [], 0
+        if batch:
+            yield batch
+
+    def _worker(self, batches, bar):
+        with self.driver.session(database=self.database) as session:
+            for batch in batches:
+                session.execute_write(self.work, batch)
+                bar.update(sum(len(r["edges"]) for r in batch))
+
+    def write(self, rows, progress=True):
+        """Replaces the outgoing SIMILAR_TO edges of every source in ``rows``."""
+        batches = list(self.batches(rows))
+        edges = sum(len(r["edges"]) for r in rows)
+
+        # Round-robin so every worker gets a similar share of the edges.
+        lanes = [batches[i::self.workers] for i in range(self.workers)]
+        lanes = [lane for lane in lanes if lane]
+
+        bar = tqdm(total=edges, disable=not progress, unit="edges")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(len(lanes), 1)) as pool:
+            for future in [pool.submit(self._worker, lane, bar) for lane in lanes]:
+                future.result()
+        bar.close()
+
+        return WriteReport(
+            sources=len(rows),
+            edges=edges,
+            batches=len(batches),
+            seconds=time.perf_counter() - started,
+        )
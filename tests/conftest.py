@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app imports from the repo root, the seed scripts from scripts/.
+sys.path[:0] = [ROOT, os.path.join(ROOT, "scripts")]
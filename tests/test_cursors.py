@@ -0,0 +1,159 @@
+import base64
+import csv
+import re
+
+import pytest
+
+from app.exceptions.api_error import APIError
+from app.repositories.catalog_repository import CatalogRepository
+from app.utils.cursors import decode_cursor, encode_cursor, next_cursor
+
+
+def b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+# popularity: many ties, and two movies without one (never in a section).
+MOVIES = [
+    {"movie_id": movie_id, "popularity": None if movie_id in (13, 27) else float(movie_id * 7 % 5)}
+    for movie_id in range(1, 41)
+]
+EXPECTED = [
+    m["movie_id"] for m in sorted(
+        (m for m in MOVIES if m["popularity"] is not None), key=lambda m: (-m["popularity"], m["movie_id"])
+    )
+]
+
+
+def test_cursor_round_trip():
+    token = encode_cursor("scienceFiction", 123456)
+
+    assert "=" not in token
+    assert decode_cursor(token) == ("scienceFiction", 123456)
+
+
+@pytest.mark.parametrize("token", [
+    "!!!",
+    b64(b"not json"),
+    b64(b'["popular"]'),
+    b64(b'["popular", 1, 2]'),
+    b64(b'{"popular": 1}'),
+    b64(b'["popular", "12"]'),
+    b64(b"[1, 12]"),
+    b64(b'["popular", 1.5]'),
+])
+def test_malformed_cursor_is_a_400(token):
+    with pytest.raises(APIError) as error:
+        decode_cursor(token)
+    assert error.value.status_code == 400
+
+
+def test_next_cursor():
+    page = [{"movie_id": 5}, {"movie_id": 9}]
+
+    assert next_cursor("popular", page, limit=3) is None
+    assert next_cursor("popular", [], limit=3) is None
+    assert decode_cursor(next_cursor("popular", page, limit=2)) == ("popular", 9)
+
+
+def cypher_predicate(where):
+    """The generated WHERE clause as a Python expression over dicts m and a."""
+    expression = re.sub(r"\b([ma])\.(\w+)", r'\1["\2"]', where)
+    expression = expression.replace(" IS NOT NULL", " is not None")
+    expression = expression.replace(" AND ", " and ").replace(" OR ", " or ")
+    return lambda m, a: eval(expression, {}, {"m": m, "a": a})
+
+
+def run_ranked_page(after, limit):
+    """Evaluates ranked_page_query for the popular section over MOVIES."""
+    query, params = CatalogRepository.section_page_query("popular", after=after, limit=limit)
+    where = re.search(r"WHERE (.*?)\n\s*RETURN", query, re.S).group(1)
+    assert re.search(r"ORDER BY m\.popularity DESC, m\.movie_id LIMIT \$limit", query)
+
+    anchor = next((m for m in MOVIES if m["movie_id"] == params["after"]), None)
+    if after is not None:
+        assert "MATCH (a:Movie {movie_id: $after})" in query
+        if anchor is None:  # the anchor MATCH finds nothing
+            return []
+    matches = cypher_predicate(where)
+    rows = sorted((m for m in MOVIES if matches(m, anchor)), key=lambda m: (-m["popularity"], m["movie_id"]))
+    return [m["movie_id"] for m in rows[:params["limit"]]]
+
+
+def test_anchor_predicate_breaks_sort_key_ties_by_movie_id():
+    query, _ = CatalogRepository.section_page_query("popular", after=7, limit=5)
+
+    assert "m.popularity <= a.popularity" in query
+    assert "(m.popularity < a.popularity OR m.movie_id > a.movie_id)" in query
+    # No anchor and no anchor conditions on the first page.
+    first, _ = CatalogRepository.section_page_query("popular", limit=5)
+    assert "a.popularity" not in first and "$after" not in first
+
+
+def test_genre_page_carries_the_anchor_through_with():
+    query, params = CatalogRepository.section_page_query("action", after=7, limit=5)
+
+    assert "WITH a, coalesce(s.genre, $genre) AS genre" in query
+    assert params["genre"] == "Action"
+
+
+@pytest.mark.parametrize("limit", [1, 4, 7, 19])
+def test_ranked_page_query_walk_has_no_duplicates_or_gaps(limit):
+    seen, after = [], None
+    # Bounded, so an anchor that repeats rows fails instead of looping forever.
+    for _ in range(len(MOVIES) + 1):
+        page = run_ranked_page(after, limit)
+        seen += page
+        if len(page) < limit:
+            break
+        after = page[-1]
+
+    assert seen == EXPECTED
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from config import Config
+
+    with open(tmp_path / "movies.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["movie_id", "title", "popularity", "vote_average", "vote_count"])
+        writer.writeheader()
+        for movie in MOVIES:
+            writer.writerow({**movie, "title": f"Movie {movie['movie_id']}", "vote_average": 5, "vote_count": 10})
+    with open(tmp_path / "genres.csv", "w", newline="") as f:
+        f.write("movie_id,genre\n")
+
+    for name, value in {
+        "CATALOG_BACKEND": "memory", "CATALOG_DATA_DIR": str(tmp_path), "CATALOG_SNAPSHOT_PATH": "",
+        "SECTION_CACHE_ENABLED": False, "SECTION_CACHE_VERSION_CHECK": 0,
+    }.items():
+        monkeypatch.setattr(Config, name, value)
+
+    from app import create_app
+    return create_app().test_client()
+
+
+@pytest.mark.parametrize("limit", [3, 7, 19])
+def test_memory_backend_page_walk_has_no_duplicates_or_gaps(client, limit):
+    response = client.get(f"/api/catalog/?sections=popular&view=card&limit={limit}")
+    body = response.get_json()
+    seen = [movie["movie_id"] for movie in body["sections"]["popular"]]
+    cursor = body["cursors"]["popular"]
+
+    for _ in range(len(MOVIES) + 1):
+        if cursor is None:
+            break
+        response = client.get(f"/api/catalog/?cursors={cursor}&view=card&limit={limit}")
+        assert response.status_code == 200
+        body = response.get_json()
+        assert list(body["sections"]) == ["popular"]
+        seen += [movie["movie_id"] for movie in body["sections"]["popular"]]
+        cursor = body["cursors"]["popular"]
+
+    assert seen == EXPECTED
+
+
+def test_malformed_cursor_request_is_a_400(client):
+    response = client.get("/api/catalog/?cursors=!!!")
+
+    assert response.status_code == 400
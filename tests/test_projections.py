@@ -0,0 +1,14 @@
+import os
+import re
+
+from app.models.projections import MovieCard
+
+from conftest import ROOT
+
+
+def test_card_view_has_every_field_the_card_template_reads():
+    with open(os.path.join(ROOT, "app", "static", "js", "main.js")) as f:
+        script = f.read()
+    template = script[script.index("function movieCard("):script.index("POSTER VALIDATION")]
+
+    assert set(re.findall(r"movie\.(\w+)", template)) <= set(MovieCard.FIELDS)
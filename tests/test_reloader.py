@@ -0,0 +1,55 @@
+import threading
+import time
+
+from app.utils.reloader import BackgroundReloader
+
+
+def wait_idle(reloader, timeout=5):
+    deadline = time.monotonic() + timeout
+    while reloader.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not reloader.pending
+
+
+def test_runs_on_one_worker_at_most_once_per_interval():
+    ran = threading.Event()
+    threads = []
+
+    def task():
+        threads.append(threading.current_thread())
+        ran.set()
+
+    reloader = BackgroundReloader(task, name="test-reloader", description="Test task", interval=3600)
+    reloader.poke()
+    assert ran.wait(5)
+    wait_idle(reloader)
+    ran.clear()
+
+    reloader.poke()  # within the interval
+    assert not ran.wait(0.2)
+
+    reloader.run_soon()
+    assert ran.wait(5)
+    assert len(threads) == 2 and threads[0] is threads[1]
+
+
+def test_failures_are_logged_and_retried(caplog):
+    attempts = []
+    done = threading.Event()
+
+    def task():
+        attempts.append(1)
+        done.set()
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+
+    reloader = BackgroundReloader(task, name="test-reloader", description="Test task", interval=3600)
+    reloader.poke()
+    assert done.wait(5)
+    wait_idle(reloader)
+    done.clear()
+
+    reloader.run_soon()
+    assert done.wait(5)
+    assert len(attempts) == 2
+    assert "Test task failed" in caplog.text
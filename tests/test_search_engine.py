@@ -0,0 +1,54 @@
+import pytest
+
+from app.services.search_engine import MAX_EXPANSIONS, VOTE_BOOST, SearchIndex
+
+
+def index_of(movies):
+    """movies: (movie_id, title, overview, vote_average) tuples."""
+    return SearchIndex.build(*(list(column) for column in zip(*movies)))
+
+
+def test_last_word_matches_the_words_it_prefixes():
+    index = index_of([
+        (1, "Inception", "A thief in dreams", 8.0),
+        (2, "Incendies", "Twins find their past", 8.0),
+        (3, "Interstellar", "Astronauts leave earth", 8.0),
+    ])
+
+    assert {movie_id for movie_id, _ in index.search("inc")} == {1, 2}
+    assert [movie_id for movie_id, _ in index.search("incep")] == [1]
+    # Earlier words must match whole words.
+    assert index.search("inc dreams") == index.search("dreams")
+
+
+def test_prefix_expansions_keep_the_most_frequent_words():
+    rare = [(i, f"x{i:03d}", "", 5.0) for i in range(1, 101)]
+    common = [(1000 + i, "xa", "", 5.0) for i in range(5)]
+    index = index_of(rare + common)
+
+    hits = {movie_id for movie_id, _ in index.search("x", limit=1000)}
+
+    assert len(hits) == 5 + MAX_EXPANSIONS - 1
+    assert {1000, 1001, 1002, 1003, 1004} <= hits
+
+
+def test_ties_at_the_limit_go_to_the_lowest_movie_ids():
+    index = index_of([(movie_id, "Same title", "", 5.0) for movie_id in (40, 7, 93, 12, 58, 3)]
+                     + [(99, "Same title", "", 9.0)])
+
+    assert [movie_id for movie_id, _ in index.search("same", limit=3)] == [99, 3, 7]
+    assert [movie_id for movie_id, _ in index.search("same", limit=6)] == [99, 3, 7, 12, 40, 58]
+
+
+def test_vote_average_boost():
+    index = index_of([
+        (1, "Heat", "A crew of thieves", 8.0),
+        (2, "Heat", "A crew of thieves", 2.0),
+        (3, "Other", "Nothing alike", 10.0),
+    ])
+
+    (first, high), (second, low) = index.search("heat")
+
+    assert (first, second) == (1, 2)
+    assert high - low == pytest.approx(6.0 * VOTE_BOOST)
+    assert index.search("heat", limit=5) == [(1, high), (2, low)]
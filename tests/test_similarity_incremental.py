@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import numpy as np
+import scipy.sparse as sp
+
+from similarity.engine import topk_similar
+from similarity.incremental import SimilarityState, detect_changes, needs_update, update_topk
+
+
+def features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = sp.random(n, 40, density=0.2, format="csr", random_state=rng)
+    return SimpleNamespace(movie_ids=np.arange(1, n + 1) * 10, matrix=matrix, space=None)
+
+
+def state_for(f, k):
+    return SimilarityState.from_run(f, topk_similar(f.matrix, k=k, workers=1, progress=False))
+
+
+def test_larger_k_than_the_state_is_a_full_run():
+    full = features(100)
+    old = SimpleNamespace(movie_ids=full.movie_ids[:97], matrix=full.matrix[:97], space=None)
+    state = state_for(old, k=20)
+
+    changes = detect_changes(state, full)
+    topk, recomputed = update_topk(full, state, changes, k=30)
+
+    expected = topk_similar(full.matrix, k=30, workers=1, progress=False)
+    assert recomputed == 100
+    np.testing.assert_array_equal(topk.indices, expected.indices)
+    np.testing.assert_allclose(topk.scores, expected.scores)
+
+
+def test_changed_k_needs_an_update():
+    f = features(50)
+    state = state_for(f, k=20)
+    changes = detect_changes(state, f)
+
+    assert not changes
+    assert not needs_update(state, changes, 20)
+    assert needs_update(state, changes, 30)
+    assert needs_update(state, changes, 10)
+    # K beyond the catalog is capped the same way the state was.
+    small = state_for(features(10), k=20)
+    assert not needs_update(small, detect_changes(small, features(10)), 30)
+
+
+def test_full_run_fallback_keeps_the_worker_and_memory_settings(monkeypatch):
+    import similarity.incremental as incremental
+
+    calls = []
+
+    def recording_topk_similar(X, **options):
+        calls.append(options)
+        return topk_similar(X, **options)
+
+    monkeypatch.setattr(incremental, "topk_similar", recording_topk_similar)
+    f = features(60)
+    state = state_for(f, k=5)
+
+    update_topk(f, state, detect_changes(state, f), k=10, workers=1, memory_budget_mb=1)
+
+    assert calls and calls[0]["workers"] == 1 and calls[0]["memory_budget_mb"] == 1
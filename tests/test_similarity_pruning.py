@@ -0,0 +1,19 @@
+import numpy as np
+
+from app.constants.catalogs import SIMILARITY_SCORE_SCALE
+from similarity.pruning import SCORE_SCALE, quantize_scores
+
+
+def test_score_scale_matches_the_app():
+    # The seed scripts don't import app; the app divides score_q by its own copy.
+    assert SCORE_SCALE == SIMILARITY_SCORE_SCALE
+
+
+def test_quantized_scores_read_back_with_the_app_scale():
+    scores = np.array([[0.9, 0.5, 0.25], [0.75, 0.75, 0.0]])
+    valid = np.array([[True, True, True], [True, True, False]])
+
+    q = quantize_scores(scores, valid)
+
+    np.testing.assert_allclose(q[valid] / SIMILARITY_SCORE_SCALE, scores[valid], atol=2 / SIMILARITY_SCORE_SCALE)
+    assert (np.diff(q[0]) < 0).all() and q[1, 0] > q[1, 1]
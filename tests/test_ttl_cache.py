@@ -0,0 +1,28 @@
+from app.utils.ttl_cache import MISSING, TTLCache
+
+
+def watched_cache(versions):
+    cache = TTLCache(ttl=300, stale_ttl=300)
+    versions = iter(versions)
+    cache.watch_version(lambda: next(versions), interval=60)
+    return cache
+
+
+def test_first_stamp_on_an_unstamped_graph_invalidates():
+    cache = watched_cache([None, 1])
+    cache._check_version()
+    cache.put("popular", ["unseeded"])
+
+    cache._check_version()
+
+    assert cache.peek("popular", lambda: ["seeded"]) is MISSING
+
+
+def test_first_check_only_records_the_version():
+    cache = watched_cache([1, 1])
+    cache.put("popular", ["seeded"])
+
+    cache._check_version()
+    cache._check_version()
+
+    assert cache.peek("popular", lambda: ["reloaded"]) == ["seeded"]